@@ -29,9 +29,7 @@ const ParametersForm = ({ onParametersUpdated }) => {
     affiliate_commission: 5,
     marketing_percentage: 0.15,
     infrastructure_cost_per_user: 2,
-    other_expenses_percentage: 0.10,
-    base_salary: 7000,
-    salary_increase: 0.05
+    other_expenses_percentage: 0.10
   });
   
   const [notification, setNotification] = useState({
@@ -92,6 +90,13 @@ const ParametersForm = ({ onParametersUpdated }) => {
         if (onParametersUpdated && result.yearly_summary) {
           onParametersUpdated(result.yearly_summary);
         }
+      } else if (result.status === 'accepted') {
+        // Queued update: the server recalculates in the background
+        setNotification({
+          open: true,
+          message: 'Parameters saved, recalculating...',
+          severity: 'info'
+        });
       } else {
         setNotification({
           open: true,
@@ -289,37 +294,6 @@ const ParametersForm = ({ onParametersUpdated }) => {
                   InputProps={{ inputProps: { min: 0, step: 0.01 } }}
                 />
               </Grid>
-              <Grid item xs={12} sm={6}>
-                <TextField
-                  label="Base Salary ($)"
-                  name="base_salary"
-                  type="number"
-                  value={params.base_salary}
-                  onChange={handleChange}
-                  fullWidth
-                  variant="outlined"
-                  size="small"
-                  InputProps={{ inputProps: { min: 0 } }}
-                />
-              </Grid>
-              <Grid item xs={12} sm={6}>
-                <TextField
-                  label="Annual Salary Increase (%)"
-                  name="salary_increase"
-                  type="number"
-                  value={params.salary_increase * 100}
-                  onChange={(e) => handleChange({
-                    target: {
-                      name: 'salary_increase',
-                      value: parseFloat(e.target.value) / 100
-                    }
-                  })}
-                  fullWidth
-                  variant="outlined"
-                  size="small"
-                  InputProps={{ inputProps: { min: 0, max: 100, step: 0.1 } }}
-                />
-              </Grid>
             </Grid>
           </AccordionDetails>
         </Accordion>
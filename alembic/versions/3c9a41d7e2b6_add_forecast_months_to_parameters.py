@@ -0,0 +1,28 @@
+"""add forecast_months to parameters
+
+Revision ID: 3c9a41d7e2b6
+Revises: b5ffec15da30
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a41d7e2b6'
+down_revision: Union[str, None] = 'b5ffec15da30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('parameters', sa.Column('forecast_months', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('parameters', 'forecast_months')
@@ -0,0 +1,42 @@
+"""add projection_snapshots
+
+Revision ID: 8f2d6b0c4a19
+Revises: 3c9a41d7e2b6
+Create Date: 2026-10-17 14:03:27.118540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d6b0c4a19'
+down_revision: Union[str, None] = '3c9a41d7e2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('projection_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scenario_id', sa.Integer(), nullable=True),
+    sa.Column('parameter_hash', sa.String(length=64), nullable=True),
+    sa.Column('months', sa.Integer(), nullable=True),
+    sa.Column('data', sa.LargeBinary(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['scenario_id'], ['forecast_scenarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scenario_id', 'parameter_hash')
+    )
+    op.create_index(op.f('ix_projection_snapshots_id'), 'projection_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_projection_snapshots_scenario_id'), 'projection_snapshots', ['scenario_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_projection_snapshots_scenario_id'), table_name='projection_snapshots')
+    op.drop_index(op.f('ix_projection_snapshots_id'), table_name='projection_snapshots')
+    op.drop_table('projection_snapshots')
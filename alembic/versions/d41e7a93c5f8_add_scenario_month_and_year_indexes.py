@@ -0,0 +1,33 @@
+"""add scenario month and year indexes
+
+Revision ID: d41e7a93c5f8
+Revises: 8f2d6b0c4a19
+Create Date: 2026-10-17 16:41:09.772354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e7a93c5f8'
+down_revision: Union[str, None] = '8f2d6b0c4a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built without blocking writes on PostgreSQL, which needs to run outside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_monthly_data_scenario_id_month_number', 'monthly_data', ['scenario_id', 'month_number'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_yearly_summaries_scenario_id_year', 'yearly_summaries', ['scenario_id', 'year'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_yearly_summaries_scenario_id_year', table_name='yearly_summaries', postgresql_concurrently=True)
+        op.drop_index('ix_monthly_data_scenario_id_month_number', table_name='monthly_data', postgresql_concurrently=True)
@@ -1,12 +1,13 @@
 # app/auth/service.py
 from typing import Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
-from sqlalchemy import func  # Added for case-insensitive query
-from app.database import get_db
+from sqlalchemy import func, select  # Added for case-insensitive query
+from app.database import get_async_db, route_reads
 from app.models.user import User
 from app.schemas.auth import TokenData, UserCreate, UserInDB, OAuthUserInfo
 from app.auth.utils import (
@@ -22,7 +23,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Decode JWT token and return the current user."""
     credentials_exception = HTTPException(
@@ -40,8 +41,12 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    route_reads(db, token_data.username)
+    
     # Case-insensitive query for username
-    user = db.query(User).filter(func.lower(User.username) == func.lower(token_data.username)).first()
+    user = (await db.execute(
+        select(User).where(func.lower(User.username) == func.lower(token_data.username))
+    )).unique().scalars().first()
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -6,9 +6,10 @@ import os
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, route_reads
 from app.models.user import User
 
 # Load environment variables
@@ -76,7 +77,7 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """Get current user from JWT token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,8 +93,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if username is None:
         raise credentials_exception
     
+    route_reads(db, username)
+    
     # Get user from database
-    user = db.query(User).filter(User.username == username).first()
+    # unique() because the user's scenarios are joined in
+    user = (await db.execute(select(User).where(User.username == username))).unique().scalars().first()
     if user is None:
         raise credentials_exception
     
@@ -1,15 +1,17 @@
 # app/main.py
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from fastapi.routing import APIRoute 
+from sqlalchemy.exc import TimeoutError as PoolTimeout
 
 # Load environment variables
 load_dotenv()
 
 # Import database connection
-from app.database import Base, engine
+from app.database import Base, engine, async_engine, replica_async_engine, pool_metrics, read_your_writes
 
 # Import models to register them with SQLAlchemy
 from app.models.database import ForecastScenario, Parameters, MonthlyData, YearlySummary
@@ -17,6 +19,10 @@ from app.models.user import User
 
 # Import all routes
 from app.routes import router
+from app.services.bulk import write_stats
+from app.services.cache import projection_cache
+from app.services.executor import compute_executor, ComputeBusy, ComputeTimeout
+from app.services.jobs import recompute_queue
 
 # Initialize FastAPI app
 app = FastAPI(title="RYZE.ai Financial Forecast API")
@@ -36,6 +42,57 @@ Base.metadata.create_all(bind=engine)
 # Include all routes
 app.include_router(router)
 
+# Add up how long each request waited for database connections
+class PoolCheckoutMiddleware:
+    """Plain ASGI middleware, so the request is not run in a separate task."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tracking = pool_metrics.track_request()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool_metrics.finish_request(tracking)
+
+app.add_middleware(PoolCheckoutMiddleware)
+
+# Close the request handlers' database connections on shutdown
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+
+# A full compute queue or a slow calculation is reported instead of piling up requests
+@app.exception_handler(ComputeBusy)
+async def compute_busy_handler(request: Request, exc: ComputeBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+# No free database connection within DB_POOL_TIMEOUT
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database connection pool exhausted"},
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(ComputeTimeout)
+async def compute_timeout_handler(request: Request, exc: ComputeTimeout):
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc)}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to RYZE.ai Financial Forecast API"}
@@ -51,4 +108,34 @@ async def get_routes():
                 "methods": methods,
                 "name": route.name
             })
-    return {"routes": route_info}
\ No newline at end of file
+    return {"routes": route_info}
+
+@app.get("/metrics/projection-cache", tags=["Utility"])
+async def get_projection_cache_metrics():
+    """Hit/miss counters and memory use of the projection cache"""
+    return projection_cache.stats()
+
+@app.get("/metrics/compute", tags=["Utility"])
+async def get_compute_metrics():
+    """Queue depth and counters of the compute executor"""
+    return compute_executor.stats()
+
+@app.get("/metrics/writes", tags=["Utility"])
+async def get_write_metrics():
+    """Rows inserted, updated, deleted and left unchanged by recalculations"""
+    return write_stats.stats()
+
+@app.get("/metrics/recompute", tags=["Utility"])
+async def get_recompute_metrics():
+    """Queued, coalesced and finished background recalculations"""
+    return recompute_queue.stats()
+
+@app.get("/metrics/pool", tags=["Utility"])
+async def get_pool_metrics():
+    """Connections checked out and in, overflow, and checkout wait histograms of each database pool"""
+    return pool_metrics.stats()
+
+@app.get("/metrics/replica", tags=["Utility"])
+async def get_replica_metrics():
+    """Reads sent to the replica or the primary, and users currently kept on the primary"""
+    return read_your_writes.stats()
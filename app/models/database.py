@@ -1,5 +1,5 @@
 # app/models/database.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Boolean, ARRAY
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Boolean, ARRAY, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -25,6 +25,9 @@ class ForecastScenario(Base):
     
     # Relationship with YearlySummary table
     yearly_summaries = relationship("YearlySummary", back_populates="scenario", cascade="all, delete-orphan")
+    
+    # Relationship with ProjectionSnapshot table
+    projection_snapshot = relationship("ProjectionSnapshot", back_populates="scenario", uselist=False, cascade="all, delete-orphan")
 
 
 class Parameters(Base):
@@ -73,6 +76,9 @@ class Parameters(Base):
     infrastructure_cost_per_user = Column(Float)
     other_expenses_percentage = Column(Float)
     
+    # Forecast horizon in months
+    forecast_months = Column(Integer, default=72)
+    
     # Relationship
     scenario = relationship("ForecastScenario", back_populates="parameters")
 
@@ -80,6 +86,8 @@ class Parameters(Base):
 class MonthlyData(Base):
     """Model for storing monthly forecast data for each scenario"""
     __tablename__ = "monthly_data"
+    # Every read is one scenario's months in order, or a range of them
+    __table_args__ = (Index("ix_monthly_data_scenario_id_month_number", "scenario_id", "month_number"),)
 
     id = Column(Integer, primary_key=True, index=True)
     scenario_id = Column(Integer, ForeignKey("forecast_scenarios.id", ondelete="CASCADE"))
@@ -127,6 +135,7 @@ class MonthlyData(Base):
 class YearlySummary(Base):
     """Model for storing yearly summary data for each scenario"""
     __tablename__ = "yearly_summaries"
+    __table_args__ = (Index("ix_yearly_summaries_scenario_id_year", "scenario_id", "year"),)
 
     id = Column(Integer, primary_key=True, index=True)
     scenario_id = Column(Integer, ForeignKey("forecast_scenarios.id", ondelete="CASCADE"))
@@ -149,4 +158,24 @@ class YearlySummary(Base):
     total_staff = Column(Integer)
     
     # Relationship
-    scenario = relationship("ForecastScenario", back_populates="yearly_summaries")
\ No newline at end of file
+    scenario = relationship("ForecastScenario", back_populates="yearly_summaries")
+
+
+class ProjectionSnapshot(Base):
+    """Model for storing a scenario's whole projection as one compressed columnar blob"""
+    __tablename__ = "projection_snapshots"
+    __table_args__ = (UniqueConstraint("scenario_id", "parameter_hash"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    scenario_id = Column(Integer, ForeignKey("forecast_scenarios.id", ondelete="CASCADE"), index=True)
+    
+    # Hash of the parameters the projection was computed from
+    parameter_hash = Column(String(64))
+    months = Column(Integer)
+    
+    # Encoded by app.services.snapshots
+    data = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    scenario = relationship("ForecastScenario", back_populates="projection_snapshot")
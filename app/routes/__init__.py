@@ -1,9 +1,10 @@
 # app/routes/__init__.py
 from fastapi import APIRouter
-from app.routes import auth, financial
+from app.routes import auth, financial, analysis
 
 router = APIRouter()
 
 # Include all route modules
 router.include_router(auth.router)
-router.include_router(financial.router)
\ No newline at end of file
+router.include_router(financial.router)
+router.include_router(analysis.router)
\ No newline at end of file
@@ -0,0 +1,141 @@
+# app/routes/analysis.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.user import User
+from app.services.financial import get_scenario_by_id_async, get_parameters_from_scenario
+from app.services.simulation import run_simulation
+from app.services.analysis import sensitivity_analysis, goal_seek, sweep_grid
+from app.services.executor import compute_executor
+from app.auth.utils import get_current_user
+
+from app.schemas.financial import SimulationRequest, GoalSeekRequest, SweepRequest
+
+router = APIRouter(tags=["analysis"])
+
+@router.post("/api/scenarios/{scenario_id}/simulation")
+async def simulate_scenario(
+    scenario_id: int,
+    request: SimulationRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Monte Carlo bands (P10/P50/P90) of monthly income, expenses and EBITDA"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
+
+    # Check if user has access to this scenario
+    if scenario not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+
+    params = get_parameters_from_scenario(scenario)
+    distributions = {
+        name: spec.model_dump(exclude_none=True)
+        for name, spec in request.distributions.items()
+    }
+    try:
+        simulation = await compute_executor.run(run_simulation, params, distributions, request.paths, request.seed)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {"scenario_id": scenario_id, **simulation}
+
+@router.get("/api/scenarios/{scenario_id}/sensitivity")
+async def get_scenario_sensitivity(
+    scenario_id: int,
+    percent: float = 10.0,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tornado analysis: each parameter moved by -percent and +percent"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
+
+    # Check if user has access to this scenario
+    if scenario not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+
+    params = get_parameters_from_scenario(scenario)
+    try:
+        sensitivity = await compute_executor.run(sensitivity_analysis, params, percent)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {"scenario_id": scenario_id, **sensitivity}
+
+@router.post("/api/scenarios/{scenario_id}/goal-seek")
+async def goal_seek_scenario(
+    scenario_id: int,
+    request: GoalSeekRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Solve one parameter so a metric reaches a target in a given month, without saving"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
+
+    # Check if user has access to this scenario
+    if scenario not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+
+    params = get_parameters_from_scenario(scenario)
+    try:
+        result = await compute_executor.run(
+            goal_seek,
+            params,
+            request.parameter,
+            request.metric,
+            request.month,
+            request.target,
+            request.lower,
+            request.upper
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {"scenario_id": scenario_id, **result}
+
+@router.post("/api/scenarios/{scenario_id}/sweep")
+async def sweep_scenario(
+    scenario_id: int,
+    request: SweepRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """KPI heatmaps over a grid of two parameters"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
+
+    # Check if user has access to this scenario
+    if scenario not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+
+    params = get_parameters_from_scenario(scenario)
+    try:
+        sweep = await compute_executor.run(sweep_grid, params, request.x.model_dump(), request.y.model_dump(), request.kpis)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {"scenario_id": scenario_id, **sweep}
@@ -1,13 +1,14 @@
 # app/routes/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
 import os
 from jose import jwt, JWTError
 import httpx
 
-from app.database import get_db
+from app.database import get_async_db, route_reads
 from app.models.user import User
 from app.schemas.auth import UserCreate, User as UserSchema, Token, OAuthUserInfo
 from app.auth.service import (
@@ -34,18 +35,20 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post("/register", response_model=UserSchema)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Register a new user."""
-    return create_user(db, user_data)
+    # The new user reads from the primary until the replica has them
+    route_reads(db, user_data.username)
+    return await db.run_sync(create_user, user_data)
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Authenticate and login a user."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await db.run_sync(authenticate_user, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,7 +61,7 @@ async def login(
 @router.post("/refresh-token", response_model=Token)
 async def refresh_token(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Refresh an access token using a refresh token."""
     credentials_exception = HTTPException(
@@ -86,7 +89,7 @@ async def refresh_token(
             raise credentials_exception
             
         # Get the user
-        user = db.query(User).filter(User.username == username).first()
+        user = (await db.execute(select(User).where(User.username == username))).unique().scalars().first()
         if not user:
             raise credentials_exception
         
@@ -115,7 +118,7 @@ async def login_google() -> dict:
 @router.get("/callback/google")
 async def google_callback(
     code: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """Handle the callback from Google OAuth."""
     # Exchange code for token
@@ -152,7 +155,7 @@ async def google_callback(
             provider_user_id=google_user["sub"]
         )
         
-        user = find_or_create_oauth_user(db, oauth_user)
+        user = await db.run_sync(find_or_create_oauth_user, oauth_user)
         
         # Create tokens
         tokens = create_tokens_for_user(user)
@@ -172,7 +175,7 @@ async def login_github() -> dict:
 @router.get("/callback/github")
 async def github_callback(
     code: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """Handle the callback from GitHub OAuth."""
     # Exchange code for token
@@ -221,7 +224,7 @@ async def github_callback(
             provider_user_id=str(github_user["id"])
         )
         
-        user = find_or_create_oauth_user(db, oauth_user)
+        user = await db.run_sync(find_or_create_oauth_user, oauth_user)
         
         # Create tokens
         tokens = create_tokens_for_user(user)
@@ -241,7 +244,7 @@ async def login_linkedin() -> dict:
 @router.get("/callback/linkedin")
 async def linkedin_callback(
     code: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """Handle the callback from LinkedIn OAuth."""
     # Exchange code for token
@@ -293,7 +296,7 @@ async def linkedin_callback(
             provider_user_id=linkedin_user["id"]
         )
         
-        user = find_or_create_oauth_user(db, oauth_user)
+        user = await db.run_sync(find_or_create_oauth_user, oauth_user)
         
         # Create tokens
         tokens = create_tokens_for_user(user)
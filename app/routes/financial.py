@@ -1,18 +1,29 @@
 # app/routes/financial.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, read_your_writes
 from app.models.database import ForecastScenario, Parameters, MonthlyData, YearlySummary
 from app.models.user import User
 from app.services.financial import (
-    get_scenario_by_id,
-    get_default_scenario,
+    clone_scenario,
+    get_scenario_by_id_async,
+    get_default_scenario_async,
     get_parameters_from_scenario,
-    recalculate_scenario
+    get_period_summary_async,
+    get_yearly_summary,
+    load_projection_async,
+    month_number_range,
+    recalculate_scenario_job
 )
+from app.services.executor import compute_executor
+from app.services.jobs import PARAMETER_UPDATES, recompute_queue
+from app.services.projection import ForecastParams
+from app.services.snapshots import projection_records
 from app.auth.utils import get_current_user  # Import the auth dependency
 
 from app.schemas.financial import (
@@ -25,9 +36,26 @@ from app.schemas.financial import (
 
 router = APIRouter(tags=["financials"])
 
+# Longest a job status request may wait for the job to finish, in seconds
+MAX_JOB_WAIT = 30
+
+# Response keys of the monthly endpoints, mapped to the projection columns they are read from
+MONTHLY_FIELDS = {key: key for key in [
+    "year", "month", "month_number", "date", "income", "expenses", "ebitda",
+    "client_count", "new_clients", "paying_clients", "developer_count", "affiliate_count",
+    "sales_staff", "jr_devs", "admin_staff", "cto_count", "total_staff",
+    "cto_cost", "sales_cost", "jr_dev_cost", "admin_cost", "infrastructure_cost",
+    "marketing_cost", "affiliate_cost", "other_expenses"
+]}
+EXPENSE_BREAKDOWN_FIELDS = {key: key for key in [
+    "year", "month", "date", "cto_cost", "sales_cost", "jr_dev_cost", "admin_cost",
+    "infrastructure_cost", "marketing_cost", "affiliate_cost", "other_expenses"
+]}
+EXPENSE_BREAKDOWN_FIELDS["total_expenses"] = "expenses"
+
 @router.get("/api/scenarios", response_model=List[Scenario])
 async def get_scenarios(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Get all forecast scenarios for the current user"""
@@ -37,11 +65,11 @@ async def get_scenarios(
 @router.get("/api/scenarios/{scenario_id}", response_model=Scenario)
 async def get_scenario(
     scenario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Get a specific forecast scenario by ID"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -55,25 +83,10 @@ async def get_scenario(
 @router.post("/api/scenarios", response_model=Scenario)
 async def create_scenario(
     scenario: ScenarioCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Create a new forecast scenario for the current user"""
-    # Create new scenario
-    db_scenario = ForecastScenario(
-        name=scenario.name,
-        description=scenario.description,
-        is_default=False
-    )
-    db.add(db_scenario)
-    db.flush()  # Flush to get the ID before committing
-    
-    # Associate with current user
-    current_user.scenarios.append(db_scenario)
-    
-    db.commit()
-    db.refresh(db_scenario)
-    
     # Get a default scenario to copy parameters from
     # First try user's default scenario, then any scenario
     user_default = None
@@ -84,37 +97,54 @@ async def create_scenario(
     
     default_scenario = user_default or (current_user.scenarios[0] if current_user.scenarios else None)
     
-    # If no existing scenarios, use system default or basic parameters
-    if default_scenario:
-        default_params = get_parameters_from_scenario(default_scenario)
-    else:
-        # Use system default
-        system_default = get_default_scenario(db)
-        default_params = get_parameters_from_scenario(system_default)
-    
-    # Create parameters
-    params = Parameters(
-        scenario_id=db_scenario.id,
-        **{k: v for k, v in default_params.items()}
-    )
-    db.add(params)
-    
-    # Calculate and store projections
-    recalculate_scenario(db, db_scenario.id, default_params)
-    
-    db.commit()
-    db.refresh(db_scenario)
+    # If no existing scenarios, use system default
+    if not default_scenario:
+        default_scenario = await get_default_scenario_async(db)
+    
+    # The new scenario starts as a copy of its parameters and projections
+    db_scenario = await db.run_sync(clone_scenario, default_scenario.id, scenario.name, scenario.description)
+    
+    # Associate with current user
+    current_user.scenarios.append(db_scenario)
+    
+    await db.commit()
+    await db.refresh(db_scenario)
+    return db_scenario
+
+@router.post("/api/scenarios/{scenario_id}/clone", response_model=Scenario)
+async def clone_existing_scenario(
+    scenario_id: int,
+    scenario: ScenarioCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)  # Add auth dependency
+):
+    """Create a new scenario for the current user as a copy of an existing one"""
+    source = await get_scenario_by_id_async(db, scenario_id)
+    
+    # Check if user has access to this scenario
+    if source not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+    
+    # Parameters and stored projections are copied in the database, in one transaction
+    db_scenario = await db.run_sync(clone_scenario, source.id, scenario.name, scenario.description)
+    current_user.scenarios.append(db_scenario)
+    
+    await db.commit()
+    await db.refresh(db_scenario)
     return db_scenario
 
 @router.put("/api/scenarios/{scenario_id}", response_model=Scenario)
 async def update_scenario(
     scenario_id: int, 
     scenario_update: ScenarioUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Update a forecast scenario"""
-    db_scenario = get_scenario_by_id(db, scenario_id)
+    db_scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if db_scenario not in current_user.scenarios:
@@ -137,18 +167,18 @@ async def update_scenario(
         
         db_scenario.is_default = True
     
-    db.commit()
-    db.refresh(db_scenario)
+    await db.commit()
+    await db.refresh(db_scenario)
     return db_scenario
 
 @router.delete("/api/scenarios/{scenario_id}")
 async def delete_scenario(
     scenario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Delete a forecast scenario"""
-    db_scenario = get_scenario_by_id(db, scenario_id)
+    db_scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if db_scenario not in current_user.scenarios:
@@ -170,25 +200,28 @@ async def delete_scenario(
         other_scenario = next(s for s in current_user.scenarios if s.id != scenario_id)
         other_scenario.is_default = True
     
+    # Load the scenario's users first; an async session cannot load them lazily
+    await db.refresh(db_scenario, ["users"])
+    
     # Remove the association between user and scenario
     current_user.scenarios.remove(db_scenario)
     
     # Check if any other users have this scenario
     if not db_scenario.users:
         # No other users have this scenario, safe to delete it
-        db.delete(db_scenario)
+        await db.delete(db_scenario)
     
-    db.commit()
+    await db.commit()
     return {"status": "success", "message": f"Scenario '{db_scenario.name}' deleted"}
 
 @router.put("/api/scenarios/{scenario_id}/set-default")
 async def set_default_scenario(
     scenario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Set a scenario as the default for the current user"""
-    db_scenario = get_scenario_by_id(db, scenario_id)
+    db_scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if db_scenario not in current_user.scenarios:
@@ -205,18 +238,18 @@ async def set_default_scenario(
     # Set this one as default
     db_scenario.is_default = True
     
-    db.commit()
-    db.refresh(db_scenario)
+    await db.commit()
+    await db.refresh(db_scenario)
     return {"status": "success", "message": f"Scenario '{db_scenario.name}' set as default"}
 
 @router.get("/api/scenarios/{scenario_id}/parameters")
 async def get_scenario_parameters(
     scenario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Get parameters for a specific scenario"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -226,17 +259,17 @@ async def get_scenario_parameters(
         )
     
     parameters = get_parameters_from_scenario(scenario)
-    return parameters
+    return parameters.to_dict()
 
 @router.post("/api/scenarios/{scenario_id}/parameters/update")
 async def update_scenario_parameters(
     scenario_id: int, 
-    params: dict, 
-    db: Session = Depends(get_db),
+    params: ParameterUpdate, 
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Update parameters for a specific scenario and recalculate projections"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -245,13 +278,43 @@ async def update_scenario_parameters(
             detail="Not authorized to modify this scenario"
         )
     
-    current_params = get_parameters_from_scenario(scenario)
+    # Updates still waiting in the queue are the latest state, so build on them
+    current_params = None
+    if PARAMETER_UPDATES == "queued":
+        current_params = recompute_queue.latest_params(scenario_id)
+    if current_params is None:
+        current_params = get_parameters_from_scenario(scenario)
+    
+    # Merge the fields given into the current parameters, validated once before the projection engine
+    try:
+        updated_params = ForecastParams.from_update(current_params, params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Merge current parameters with updated ones
-    updated_params = {**current_params, **params}
+    # Queued updates are coalesced per scenario and recalculated in the background
+    # The recalculation writes through the sync engine, so mark the user for the replica
+    # router here: now, and again once a queued recalculation lands
+    username = current_user.username
+    read_your_writes.mark(username)
+    if PARAMETER_UPDATES == "queued":
+        job = recompute_queue.submit(scenario_id, updated_params)
+        recompute_queue.add_listener(job.id, lambda _job: read_your_writes.mark(username))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": "accepted",
+                "message": "Parameters update queued",
+                "job_id": job.id,
+                "status_url": f"/api/scenarios/{scenario_id}/jobs/{job.id}"
+            }
+        )
     
-    # Recalculate scenario
-    yearly_summary = recalculate_scenario(db, scenario_id, updated_params)
+    # Recalculate scenario on a compute worker
+    yearly_summary = await compute_executor.run(recalculate_scenario_job, scenario_id, updated_params)
+    read_your_writes.mark(username)
     
     return {
         "status": "success", 
@@ -259,14 +322,44 @@ async def update_scenario_parameters(
         "yearly_summary": yearly_summary
     }
 
+@router.get("/api/scenarios/{scenario_id}/jobs/{job_id}")
+async def get_recompute_job(
+    scenario_id: int,
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT)
+):
+    """Status of a queued parameter update; with ?wait=seconds, respond as soon as it finishes"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
+    
+    # Check if user has access to this scenario
+    if scenario not in current_user.scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scenario"
+        )
+    
+    job = recompute_queue.get(job_id)
+    if job is None or job.scenario_id != scenario_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    job = await recompute_queue.wait(job_id, wait)
+    return job.to_dict()
+
 @router.get("/api/scenarios/{scenario_id}/financials/yearly")
 async def get_scenario_yearly_financials(
     scenario_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    period: str = "year",
+    fiscal_year_start: int = 1
 ):
-    """Get yearly financial data for a specific scenario"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    """Get yearly financial data for a specific scenario, or quarterly / fiscal-year data with ?period="""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -275,9 +368,24 @@ async def get_scenario_yearly_financials(
             detail="Not authorized to access this scenario"
         )
     
-    yearly_data = db.query(YearlySummary).filter(
-        YearlySummary.scenario_id == scenario_id
-    ).order_by(YearlySummary.year).all()
+    # Other periods are rolled up from the stored months
+    if period != "year":
+        try:
+            return await get_period_summary_async(db, scenario_id, period, fiscal_year_start)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    # A snapshot, or the projection computed from the parameters, stands in for the rows
+    projection = await load_projection_async(db, scenario)
+    if projection is not None:
+        return get_yearly_summary(projection)
+    
+    yearly_data = (await db.execute(
+        select(YearlySummary).where(YearlySummary.scenario_id == scenario_id).order_by(YearlySummary.year)
+    )).scalars().all()
     
     result = []
     for year in yearly_data:
@@ -303,11 +411,13 @@ async def get_scenario_yearly_financials(
 @router.get("/api/scenarios/{scenario_id}/financials/monthly")
 async def get_scenario_monthly_financials(
     scenario_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to")
 ):
-    """Get monthly financial data for a specific scenario"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    """Get monthly financial data for a specific scenario, optionally limited to ?from=YYYY-MM&to=YYYY-MM"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -316,9 +426,29 @@ async def get_scenario_monthly_financials(
             detail="Not authorized to access this scenario"
         )
     
-    monthly_data = db.query(MonthlyData).filter(
-        MonthlyData.scenario_id == scenario_id
-    ).order_by(MonthlyData.month_number).all()
+    # Month numbers of the requested range
+    try:
+        first_month, stop_month = month_number_range(scenario, from_month, to_month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # A snapshot, or the projection computed from the parameters, stands in for the rows
+    projection = await load_projection_async(db, scenario)
+    if projection is not None:
+        if first_month or stop_month is not None:
+            projection = projection[first_month:stop_month]
+        return projection_records(projection, MONTHLY_FIELDS)
+    
+    # Range scan on the (scenario_id, month_number) index
+    query = select(MonthlyData).where(MonthlyData.scenario_id == scenario_id)
+    if first_month:
+        query = query.where(MonthlyData.month_number >= first_month)
+    if stop_month is not None:
+        query = query.where(MonthlyData.month_number < stop_month)
+    monthly_data = (await db.execute(query.order_by(MonthlyData.month_number))).scalars().all()
     
     result = []
     for month in monthly_data:
@@ -355,11 +485,13 @@ async def get_scenario_monthly_financials(
 @router.get("/api/scenarios/{scenario_id}/staff/yearly")
 async def get_scenario_staff_summary(
     scenario_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    period: str = "year",
+    fiscal_year_start: int = 1
 ):
-    """Get yearly staff data for a specific scenario"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    """Get yearly staff data for a specific scenario, or quarterly / fiscal-year data with ?period="""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -368,9 +500,32 @@ async def get_scenario_staff_summary(
             detail="Not authorized to access this scenario"
         )
     
-    yearly_data = db.query(YearlySummary).filter(
-        YearlySummary.scenario_id == scenario_id
-    ).order_by(YearlySummary.year).all()
+    # Other periods are rolled up from the stored months
+    if period != "year":
+        try:
+            summary = await get_period_summary_async(db, scenario_id, period, fiscal_year_start)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        for period_data in summary:
+            for key in ("income", "expenses", "ebitda"):
+                del period_data[key]
+        return summary
+    
+    # A snapshot, or the projection computed from the parameters, stands in for the rows
+    projection = await load_projection_async(db, scenario)
+    if projection is not None:
+        summary = get_yearly_summary(projection)
+        for year_data in summary:
+            for key in ("income", "expenses", "ebitda", "ceo_count"):
+                del year_data[key]
+        return summary
+    
+    yearly_data = (await db.execute(
+        select(YearlySummary).where(YearlySummary.scenario_id == scenario_id).order_by(YearlySummary.year)
+    )).scalars().all()
     
     result = []
     for year in yearly_data:
@@ -392,11 +547,13 @@ async def get_scenario_staff_summary(
 @router.get("/api/scenarios/{scenario_id}/expense-breakdown/monthly")
 async def get_scenario_expense_breakdown(
     scenario_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to")
 ):
-    """Returns a detailed breakdown of expenses by category for each month for a specific scenario"""
-    scenario = get_scenario_by_id(db, scenario_id)
+    """Returns a detailed breakdown of expenses by category for each month for a specific scenario, optionally limited to ?from=YYYY-MM&to=YYYY-MM"""
+    scenario = await get_scenario_by_id_async(db, scenario_id)
     
     # Check if user has access to this scenario
     if scenario not in current_user.scenarios:
@@ -405,9 +562,29 @@ async def get_scenario_expense_breakdown(
             detail="Not authorized to access this scenario"
         )
     
-    monthly_data = db.query(MonthlyData).filter(
-        MonthlyData.scenario_id == scenario_id
-    ).order_by(MonthlyData.month_number).all()
+    # Month numbers of the requested range
+    try:
+        first_month, stop_month = month_number_range(scenario, from_month, to_month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # A snapshot, or the projection computed from the parameters, stands in for the rows
+    projection = await load_projection_async(db, scenario)
+    if projection is not None:
+        if first_month or stop_month is not None:
+            projection = projection[first_month:stop_month]
+        return projection_records(projection, EXPENSE_BREAKDOWN_FIELDS)
+    
+    # Range scan on the (scenario_id, month_number) index
+    query = select(MonthlyData).where(MonthlyData.scenario_id == scenario_id)
+    if first_month:
+        query = query.where(MonthlyData.month_number >= first_month)
+    if stop_month is not None:
+        query = query.where(MonthlyData.month_number < stop_month)
+    monthly_data = (await db.execute(query.order_by(MonthlyData.month_number))).scalars().all()
     
     result = []
     for month in monthly_data:
@@ -431,8 +608,10 @@ async def get_scenario_expense_breakdown(
 # Legacy API routes for backward compatibility - now user-specific
 @router.get("/api/financials/yearly")
 async def get_yearly_financials(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    period: str = "year",
+    fiscal_year_start: int = 1
 ):
     """Get yearly financial data from the user's default scenario"""
     # Find the user's default scenario
@@ -453,14 +632,16 @@ async def get_yearly_financials(
             default_scenario = current_user.scenarios[0]
             # Mark it as default
             default_scenario.is_default = True
-            db.commit()
+            await db.commit()
     
-    return await get_scenario_yearly_financials(default_scenario.id, db, current_user)
+    return await get_scenario_yearly_financials(default_scenario.id, db, current_user, period, fiscal_year_start)
 
 @router.get("/api/financials/monthly")
 async def get_monthly_financials(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Add auth dependency
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),  # Add auth dependency
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to")
 ):
     """Get monthly financial data from the user's default scenario"""
     # Find the user's default scenario (similar logic as above)
@@ -477,13 +658,13 @@ async def get_monthly_financials(
         else:
             default_scenario = current_user.scenarios[0]
             default_scenario.is_default = True
-            db.commit()
+            await db.commit()
     
-    return await get_scenario_monthly_financials(default_scenario.id, db, current_user)
+    return await get_scenario_monthly_financials(default_scenario.id, db, current_user, from_month, to_month)
 
 @router.get("/api/parameters")
 async def get_parameters(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Get parameters from the user's default scenario"""
@@ -501,14 +682,14 @@ async def get_parameters(
         else:
             default_scenario = current_user.scenarios[0]
             default_scenario.is_default = True
-            db.commit()
+            await db.commit()
     
     return await get_scenario_parameters(default_scenario.id, db, current_user)
 
 @router.post("/api/parameters/update")
 async def update_parameters(
-    params: dict, 
-    db: Session = Depends(get_db),
+    params: ParameterUpdate, 
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)  # Add auth dependency
 ):
     """Update parameters for the user's default scenario"""
@@ -526,6 +707,6 @@ async def update_parameters(
         else:
             default_scenario = current_user.scenarios[0]
             default_scenario.is_default = True
-            db.commit()
+            await db.commit()
     
     return await update_scenario_parameters(default_scenario.id, params, db, current_user)
\ No newline at end of file
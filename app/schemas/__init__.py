@@ -16,5 +16,10 @@ from app.schemas.financial import (
     ScenarioCreate,
     ScenarioUpdate,
     Scenario,
-    ParameterUpdate
+    ParameterUpdate,
+    Distribution,
+    SimulationRequest,
+    GoalSeekRequest,
+    SweepAxis,
+    SweepRequest
 )
\ No newline at end of file
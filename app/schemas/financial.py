@@ -1,6 +1,6 @@
 # app/schemas/financial.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ScenarioBase(BaseModel):
@@ -50,4 +50,42 @@ class ParameterUpdate(BaseModel):
     admin_salary: Optional[float] = None
     marketing_percentage: Optional[float] = None
     infrastructure_cost_per_user: Optional[float] = None
-    other_expenses_percentage: Optional[float] = None
\ No newline at end of file
+    other_expenses_percentage: Optional[float] = None
+    forecast_months: Optional[int] = None
+    
+    class Config:
+        # A misspelled field is an error, not a silently ignored change
+        extra = "forbid"
+
+class Distribution(BaseModel):
+    # Offsets from the scenario's own value: normal uses std,
+    # uniform uses low/high, triangular uses low/mode/high
+    distribution: str = "normal"
+    std: Optional[float] = None
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+
+class SimulationRequest(BaseModel):
+    paths: int = 1000
+    seed: Optional[int] = None
+    distributions: Dict[str, Distribution] = {}
+
+class GoalSeekRequest(BaseModel):
+    parameter: str
+    month: int
+    metric: str = "ebitda"
+    target: float = 0.0
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+class SweepAxis(BaseModel):
+    parameter: str
+    start: float
+    stop: float
+    steps: int = 50
+
+class SweepRequest(BaseModel):
+    x: SweepAxis
+    y: SweepAxis
+    kpis: List[str] = ["cumulative_ebitda", "break_even_month"]
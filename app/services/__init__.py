@@ -2,10 +2,61 @@
 # Import services as needed
 from app.services.financial import (
     get_scenario_by_id,
+    get_scenario_by_id_async,
     get_default_scenario,
+    get_default_scenario_async,
+    clone_scenario,
     get_parameters_from_scenario,
     recalculate_scenario,
+    recalculate_scenario_job,
     calculate_projections,
+    calculate_projections_batch,
+    iter_projections,
     get_yearly_summary,
+    get_period_summary,
+    get_period_summary_async,
+    store_projection,
+    load_projection,
+    load_projection_async,
+    month_number_range,
     DEFAULT_PARAMETERS
-)
\ No newline at end of file
+)
+from app.services.projection import (
+    ForecastParams,
+    ProjectionResult,
+    project_series,
+    project_batch,
+    split_batch,
+    series_to_records,
+    batch_to_records
+)
+from app.services.cache import (
+    parameter_hash,
+    projection_cache,
+    cached_project_series,
+    cached_project_many
+)
+from app.services.bulk import (
+    bulk_insert,
+    insert_monthly_data,
+    insert_yearly_summaries,
+    sync_monthly_data,
+    sync_yearly_summaries,
+    write_stats
+)
+from app.services.snapshots import (
+    PROJECTION_STORAGE,
+    encode_snapshot,
+    decode_snapshot,
+    save_snapshot,
+    load_snapshot,
+    load_snapshot_async,
+    delete_snapshot,
+    stored_projection,
+    projection_records
+)
+from app.services.executor import compute_executor, ComputeBusy, ComputeTimeout
+from app.services.jobs import RecomputeJob, RecomputeBackend, InProcessBackend, recompute_queue
+from app.services.simulation import run_simulation
+from app.services.analysis import sensitivity_analysis, goal_seek, sweep_grid
+from app.services.rollup import rollup, rollup_records
@@ -0,0 +1,309 @@
+# app/services/analysis.py
+import math
+import re
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.services.projection import (
+    INTEGER_PARAMETERS,
+    RATE_PARAMETERS,
+    SCALAR_PARAMETERS,
+    ForecastParams,
+    forecast_months,
+    project_batch,
+    split_batch
+)
+from app.services.executor import compute_executor
+
+# Growth-rate entries are addressed as e.g. "client_growth_rates[0]"
+RATE_ENTRY = re.compile(r"^(\w+)\[(\d+)\]$")
+
+# KPIs computed per scenario: fixed names plus totals such as "year3_ebitda"
+KPI_NAMES = ["cumulative_ebitda", "break_even_month"]
+YEAR_KPI = re.compile(r"^year(\d+)_(income|expenses|ebitda)$")
+
+# KPIs reported by the sensitivity analysis
+SENSITIVITY_KPIS = ["cumulative_ebitda", "break_even_month", "year5_income"]
+
+# Monthly metrics a goal-seek can target
+GOAL_METRICS = ["income", "expenses", "ebitda", "cumulative_ebitda"]
+
+# Goal-seek evaluates this many candidates per round, narrowing the bracket
+# 32-fold each time, until it is TOLERANCE of the starting range wide
+GOAL_SEEK_POINTS = 33
+GOAL_SEEK_MAX_ROUNDS = 8
+GOAL_SEEK_TOLERANCE = 1e-6
+
+# Grid sweeps: size caps, and grid points projected per pool task
+MAX_SWEEP_STEPS = 200
+MAX_SWEEP_POINTS = 10000
+SWEEP_CHUNK_POINTS = 500
+
+
+# Helper function to list the inputs a what-if analysis can vary
+def parameter_names(params: Dict[str, Any]) -> List[str]:
+    """Numeric scalar parameters, then every entry of the growth-rate lists."""
+    names = list(SCALAR_PARAMETERS)
+    for key in RATE_PARAMETERS:
+        names += [f"{key}[{index}]" for index in range(len(params[key]))]
+    return names
+
+
+# Helper function to read one numeric input by name
+def get_parameter(params: Dict[str, Any], name: str) -> float:
+    match = RATE_ENTRY.match(name)
+    if match:
+        key, index = match.group(1), int(match.group(2))
+        if key not in RATE_PARAMETERS or index >= len(params[key]):
+            raise ValueError(f"Unknown parameter '{name}'")
+        return params[key][index]
+    if name not in SCALAR_PARAMETERS:
+        raise ValueError(f"Unknown parameter '{name}'")
+    return params[name]
+
+
+# Helper function to copy a parameter set with numeric inputs replaced by name
+def with_parameters(params: Dict[str, Any], values: Dict[str, float]) -> ForecastParams:
+    """Whole-number parameters are rounded half up; the hiring interval stays at least 1.
+
+    The copy is validated once, however many inputs change.
+    """
+    updated = ForecastParams.from_dict(params).to_dict()
+    for name, value in values.items():
+        get_parameter(params, name)
+        match = RATE_ENTRY.match(name)
+        if match:
+            updated[match.group(1)][int(match.group(2))] = value
+            continue
+        if name in INTEGER_PARAMETERS:
+            value = int(math.floor(value + 0.5))
+            if name == "sales_hiring_interval":
+                value = max(value, 1)
+        updated[name] = value
+    return ForecastParams(updated)
+
+
+# Helper function to copy a parameter set with one numeric input replaced
+def with_parameter(params: Dict[str, Any], name: str, value: float) -> ForecastParams:
+    return with_parameters(params, {name: value})
+
+
+# Helper function to reject unknown KPI names before any projection runs
+def validate_kpi(name: str) -> None:
+    if name not in KPI_NAMES and not YEAR_KPI.match(name):
+        raise ValueError(f"Unknown KPI '{name}'")
+
+
+# Helper function to compute one KPI for every scenario of a batch
+def kpi_values(series: Dict[str, np.ndarray], name: str) -> np.ndarray:
+    """KPI per scenario as floats; NaN where it is undefined.
+
+    break_even_month is the month from which EBITDA stays positive to the end of
+    the horizon. yearN_* totals cover months 12(N-1) to 12N-1 of the forecast.
+    """
+    if name == "cumulative_ebitda":
+        return np.asarray(series["ebitda"], dtype=np.float64).sum(axis=1)
+    if name == "break_even_month":
+        not_positive = np.asarray(series["ebitda"], dtype=np.float64) <= 0
+        months = not_positive.shape[1]
+        last_loss = months - 1 - np.argmax(not_positive[:, ::-1], axis=1)
+        break_even = np.where(not_positive.any(axis=1), last_loss + 1, 0).astype(np.float64)
+        break_even[break_even >= months] = np.nan
+        return break_even
+    match = YEAR_KPI.match(name)
+    if match:
+        year, key = int(match.group(1)), match.group(2)
+        values = np.asarray(series[key], dtype=np.float64)
+        if year < 1 or values.shape[1] < 12 * year:
+            return np.full(values.shape[0], np.nan)
+        return values[:, 12 * (year - 1):12 * year].sum(axis=1)
+    raise ValueError(f"Unknown KPI '{name}'")
+
+
+# Helper function to turn a KPI value into JSON
+def kpi_output(name: str, value: float) -> Optional[float]:
+    if math.isnan(value):
+        return None
+    if name == "break_even_month":
+        return int(value)
+    return round(value, 2)
+
+
+def sensitivity_analysis(params: Dict[str, Any], percent: float = 10.0) -> Dict[str, Any]:
+    """Tornado data: each input moved by -percent and +percent, all projected as one batch.
+
+    Parameters are sorted by the swing in cumulative EBITDA between their low and
+    high perturbation, largest first.
+    """
+    if not 0 < percent < 100:
+        raise ValueError("percent must be between 0 and 100")
+
+    params = ForecastParams.from_dict(params)
+    names = parameter_names(params)
+    variants = [params]
+    for name in names:
+        base_value = get_parameter(params, name)
+        variants.append(with_parameter(params, name, base_value * (100 - percent) / 100))
+        variants.append(with_parameter(params, name, base_value * (100 + percent) / 100))
+
+    series = project_batch(variants, forecast_months(params))
+    kpis = {kpi: kpi_values(series, kpi) for kpi in SENSITIVITY_KPIS}
+    baseline = {kpi: kpi_output(kpi, values[0]) for kpi, values in kpis.items()}
+
+    results = []
+    for position, name in enumerate(names):
+        entry = {"parameter": name, "base_value": get_parameter(params, name)}
+        for side, row in (("low", 2 * position + 1), ("high", 2 * position + 2)):
+            outcome = {"value": get_parameter(variants[row], name)}
+            for kpi, values in kpis.items():
+                outcome[kpi] = kpi_output(kpi, values[row])
+                change = values[row] - values[0]
+                outcome[f"{kpi}_change"] = kpi_output(kpi, change)
+            entry[side] = outcome
+        entry["swing"] = round(abs(kpis["cumulative_ebitda"][2 * position + 2] - kpis["cumulative_ebitda"][2 * position + 1]), 2)
+        results.append(entry)
+    results.sort(key=lambda entry: entry["swing"], reverse=True)
+
+    return {"percent": percent, "baseline": baseline, "parameters": results}
+
+
+# Helper function to read a goal-seek metric in one month for every scenario
+def metric_at_month(series: Dict[str, np.ndarray], metric: str, month: int) -> np.ndarray:
+    if metric == "cumulative_ebitda":
+        return np.asarray(series["ebitda"], dtype=np.float64)[:, :month + 1].sum(axis=1)
+    return np.asarray(series[metric], dtype=np.float64)[:, month]
+
+
+def goal_seek(
+    params: Dict[str, Any],
+    parameter: str,
+    metric: str,
+    month: int,
+    target: float = 0.0,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Value of one parameter at which `metric` in `month` reaches `target`.
+
+    Bracketed search over the in-memory engine: each round projects a batch of
+    candidates spread over the bracket and keeps the first interval where the
+    target flips between missed and reached, so the crossing closest to `lower`
+    is found. The returned value is the bracket end that reaches the target.
+    Nothing is persisted.
+    """
+    if metric not in GOAL_METRICS:
+        raise ValueError(f"metric must be one of {', '.join(GOAL_METRICS)}")
+    params = ForecastParams.from_dict(params)
+    months = forecast_months(params)
+    if not 0 <= month < months:
+        raise ValueError(f"month must be between 0 and {months - 1}")
+    current = get_parameter(params, parameter)
+    if lower is None:
+        lower = 0.0
+    if upper is None:
+        upper = max(10 * abs(current), 1.0)
+    if not (math.isfinite(lower) and math.isfinite(upper)):
+        raise ValueError("lower and upper must be finite numbers")
+    if not math.isfinite(target):
+        raise ValueError("target must be a finite number")
+    if lower >= upper:
+        raise ValueError("lower must be below upper")
+
+    is_integer = parameter in INTEGER_PARAMETERS
+    tolerance = 1 if is_integer else (upper - lower) * GOAL_SEEK_TOLERANCE
+    evaluations = 0
+    reached_low = None
+    for _ in range(GOAL_SEEK_MAX_ROUNDS):
+        candidates = np.linspace(lower, upper, GOAL_SEEK_POINTS)
+        if is_integer:
+            candidates = np.unique(np.floor(candidates + 0.5))
+        variants = [with_parameter(params, parameter, value) for value in candidates.tolist()]
+        reached = metric_at_month(project_batch(variants, months), metric, month) >= target
+        evaluations += len(variants)
+
+        flips = np.flatnonzero(reached != reached[0])
+        if len(flips) == 0:
+            if reached_low is None:
+                state = "reached" if reached[0] else "missed"
+                raise ValueError(f"Target is {state} across the whole range [{lower}, {upper}]")
+            break
+        reached_low = bool(reached[0])
+        lower, upper = candidates[flips[0] - 1], candidates[flips[0]]
+        if upper - lower <= tolerance:
+            break
+
+    value = lower if reached_low else upper
+    solved = with_parameter(params, parameter, float(value))
+    batch = project_batch([solved], months)
+    achieved = metric_at_month(batch, metric, month)[0]
+    return {
+        "parameter": parameter,
+        "value": get_parameter(solved, parameter),
+        "metric": metric,
+        "month": month,
+        "target": target,
+        "achieved": round(float(achieved), 2),
+        "evaluations": evaluations,
+        "projection": split_batch(batch)[0].to_records(),
+    }
+
+
+def _sweep_chunk(variants: List[Dict[str, Any]], months: int, kpis: List[str]) -> Dict[str, np.ndarray]:
+    """Project a slice of the grid and keep only the requested KPIs."""
+    series = project_batch(variants, months)
+    return {kpi: kpi_values(series, kpi) for kpi in kpis}
+
+
+def sweep_grid(
+    params: Dict[str, Any],
+    x: Dict[str, Any],
+    y: Dict[str, Any],
+    kpis: List[str],
+) -> Dict[str, Any]:
+    """KPI heatmaps over a two-parameter grid.
+
+    Each axis is {"parameter", "start", "stop", "steps"}. Every grid point is
+    projected; slices of SWEEP_CHUNK_POINTS are batched and spread over the
+    compute pool. Matrices are indexed [y][x]. Axis values are reported as
+    applied, so whole-number parameters show their rounded values.
+    """
+    if x["parameter"] == y["parameter"]:
+        raise ValueError("Sweep needs two different parameters")
+    params = ForecastParams.from_dict(params)
+    for axis in (x, y):
+        get_parameter(params, axis["parameter"])
+        if not 2 <= axis["steps"] <= MAX_SWEEP_STEPS:
+            raise ValueError(f"steps must be between 2 and {MAX_SWEEP_STEPS}")
+    if x["steps"] * y["steps"] > MAX_SWEEP_POINTS:
+        raise ValueError(f"Grid is limited to {MAX_SWEEP_POINTS} points")
+    if not kpis:
+        raise ValueError("At least one KPI is required")
+    for kpi in kpis:
+        validate_kpi(kpi)
+
+    months = forecast_months(params)
+    x_values = np.linspace(x["start"], x["stop"], x["steps"]).tolist()
+    y_values = np.linspace(y["start"], y["stop"], y["steps"]).tolist()
+    variants = [
+        with_parameters(params, {x["parameter"]: x_value, y["parameter"]: y_value})
+        for y_value in y_values
+        for x_value in x_values
+    ]
+
+    chunks = [variants[start:start + SWEEP_CHUNK_POINTS] for start in range(0, len(variants), SWEEP_CHUNK_POINTS)]
+    if len(chunks) == 1 or compute_executor.workers <= 1:
+        results = [_sweep_chunk(chunk, months, kpis) for chunk in chunks]
+    else:
+        results = list(compute_executor.pool().map(_sweep_chunk, chunks, [months] * len(chunks), [kpis] * len(chunks)))
+
+    matrices = {}
+    for kpi in kpis:
+        values = np.concatenate([result[kpi] for result in results]).reshape(y["steps"], x["steps"])
+        matrices[kpi] = [[kpi_output(kpi, value) for value in row] for row in values.tolist()]
+
+    return {
+        "x": {"parameter": x["parameter"], "values": [get_parameter(variants[j], x["parameter"]) for j in range(x["steps"])]},
+        "y": {"parameter": y["parameter"], "values": [get_parameter(variants[i * x["steps"]], y["parameter"]) for i in range(y["steps"])]},
+        "kpis": matrices,
+    }
@@ -0,0 +1,249 @@
+# app/services/bulk.py
+import csv
+import io
+import math
+import os
+import threading
+from collections import Counter
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import chain, islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Integer, bindparam, delete, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.models.database import MonthlyData, YearlySummary
+from app.services.projection import MONTH_KEYS, ProjectionResult
+
+# On PostgreSQL through psycopg2, stream rows with COPY instead of a batched INSERT
+BULK_COPY = os.getenv("BULK_COPY", "false").lower() in ("1", "true", "yes")
+
+# Rows are written, and compared with the stored ones, this many at a time, so a stream
+# of months is never held in full
+BULK_CHUNK_ROWS = int(os.getenv("BULK_CHUNK_ROWS", "5000"))
+
+# Columns of a stored yearly summary, as written so far (ceo_count is left unset)
+YEARLY_COLUMNS = [
+    "year", "income", "expenses", "ebitda",
+    "client_count", "paying_clients", "developer_count", "affiliate_count",
+    "sales_staff", "jr_devs", "admin_staff", "cto_count", "total_staff",
+]
+
+
+# Helper function to turn one scenario's months into monthly_data rows
+def monthly_rows(scenario_id: int, monthly_data) -> Iterator[Dict[str, Any]]:
+    """Rows from month dicts or straight from the columns of a ProjectionResult, built as they are read."""
+    keys = ["scenario_id"] + MONTH_KEYS
+    if isinstance(monthly_data, ProjectionResult):
+        columns = [monthly_data.column(key).tolist() for key in MONTH_KEYS]
+        return (dict(zip(keys, (scenario_id,) + row)) for row in zip(*columns))
+    return (dict(zip(keys, [scenario_id] + [month[key] for key in MONTH_KEYS])) for month in monthly_data)
+
+
+# Helper function to turn one scenario's yearly summary into yearly_summaries rows
+def yearly_rows(scenario_id: int, yearly_data: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"scenario_id": scenario_id, **{key: year[key] for key in YEARLY_COLUMNS}} for year in yearly_data]
+
+
+# Helper function to read an iterable BULK_CHUNK_ROWS items at a time
+def _chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    rows = iter(rows)
+    chunk = list(islice(rows, BULK_CHUNK_ROWS))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, BULK_CHUNK_ROWS))
+
+
+def bulk_insert(db: Session, model, rows: Iterable[Dict[str, Any]]) -> int:
+    """Insert rows as a Core executemany, or a COPY on PostgreSQL with BULK_COPY set.
+
+    Rows may be any iterable and are written BULK_CHUNK_ROWS at a time. They
+    skip the ORM unit of work entirely, so nothing is added to the session.
+    Returns the number of rows written.
+    """
+    written = 0
+    for chunk in _chunks(rows):
+        if BULK_COPY and db.get_bind().dialect.driver == "psycopg2":
+            _copy_rows(db, model.__table__, chunk)
+        else:
+            db.execute(insert(model.__table__), chunk)
+        written += len(chunk)
+    return written
+
+
+def _copy_rows(db: Session, table, rows: List[Dict[str, Any]]) -> None:
+    """COPY ... FROM STDIN in CSV format through the session's own connection (psycopg2)."""
+    columns = list(rows[0])
+    integer_columns = [isinstance(table.c[column].type, Integer) for column in columns]
+    buffer = io.StringIO()
+    # None is written as an unquoted empty field, which CSV COPY reads as NULL
+    csv.writer(buffer).writerows(
+        [_copy_value(row[column], integer) for column, integer in zip(columns, integer_columns)] for row in rows
+    )
+    buffer.seek(0)
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    dbapi = db.get_bind().dialect.loaded_dbapi
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    except dbapi.Error as error:
+        # Raise what a failed INSERT would, e.g. DataError for a value out of range
+        raise DBAPIError.instance(statement, None, error, dbapi.Error) from error
+    finally:
+        cursor.close()
+
+
+# Helper function to write a value the way an INSERT parameter would be stored
+def _copy_value(value: Any, integer_column: bool) -> Any:
+    # COPY rejects "201.0" in an integer column, where an INSERT casts it, rounding half away from zero
+    if integer_column and isinstance(value, float) and math.isfinite(value):
+        return int(Decimal(repr(value)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return value
+
+
+def insert_monthly_data(db: Session, monthly_by_scenario: Dict[int, Any]) -> int:
+    """Write the months of one or many scenarios in one round trip per BULK_CHUNK_ROWS rows.
+
+    Values are month dicts or a ProjectionResult per scenario_id.
+    """
+    rows = chain.from_iterable(
+        monthly_rows(scenario_id, monthly_data) for scenario_id, monthly_data in monthly_by_scenario.items()
+    )
+    return bulk_insert(db, MonthlyData, rows)
+
+
+def insert_yearly_summaries(db: Session, yearly_by_scenario: Dict[int, Iterable[Dict[str, Any]]]) -> int:
+    """Write the yearly summaries of one or many scenarios in a single round trip."""
+    rows = []
+    for scenario_id, yearly_data in yearly_by_scenario.items():
+        rows += yearly_rows(scenario_id, yearly_data)
+    return bulk_insert(db, YearlySummary, rows)
+
+
+# Helper function to tell whether a stored value still matches a recomputed one
+def _unchanged(stored: Any, value: Any, integer_column: bool) -> bool:
+    if stored == value:
+        return True
+    # A database may round a fractional count written to an integer column
+    return (integer_column and isinstance(stored, int) and isinstance(value, float)
+            and math.isfinite(value) and stored == round(value))
+
+
+def sync_rows(db: Session, model, scenario_id: int, key: str, rows: Iterable[Dict[str, Any]],
+              since: Optional[int] = None) -> Counter:
+    """Make one scenario's stored rows match rows, writing only the difference.
+
+    Stored rows are matched to new ones on key (month_number or year), from
+    since onward when given. Changed rows get an UPDATE by id that sets only
+    the columns that changed, missing ones are added with bulk_insert and rows
+    no longer produced are deleted; identical rows are left alone. Returns
+    the number of rows inserted, updated, deleted and unchanged.
+
+    rows may be a stream in ascending key order; it is read BULK_CHUNK_ROWS at
+    a time, and each chunk is compared with the stored rows in its key range.
+    """
+    table = model.__table__
+    names = [column.name for column in table.columns if column.name not in ("id", "scenario_id")]
+    integer_names = {column.name for column in table.columns if isinstance(column.type, Integer)}
+    query = select(table.c.id, *[table.c[name] for name in names]).where(table.c.scenario_id == scenario_id)
+    # Stored rows not yet compared: from since onward, then past the last chunk
+    lower = None if since is None else table.c[key] >= since
+
+    counts = Counter()
+    for chunk in _chunks(rows):
+        last = chunk[-1][key]
+        in_chunk = table.c[key] <= last if lower is None else lower & (table.c[key] <= last)
+        counts += _sync_chunk(db, model, key, integer_names, query.where(in_chunk), chunk)
+        lower = table.c[key] > last
+
+    # Stored rows past the last new one
+    tail = delete(table).where(table.c.scenario_id == scenario_id)
+    if lower is not None:
+        tail = tail.where(lower)
+    counts["deleted"] += db.execute(tail).rowcount
+    return counts
+
+
+# Helper function to bring the stored rows one chunk covers up to date with it
+def _sync_chunk(db: Session, model, key: str, integer_names, query, rows: List[Dict[str, Any]]) -> Counter:
+    table = model.__table__
+    existing = {}
+    stale = []
+    for row in db.execute(query).mappings():
+        if row[key] in existing:
+            stale.append(row["id"])
+        else:
+            existing[row[key]] = row
+
+    inserts = []
+    # Changed rows, grouped by the columns that changed so each group is one executemany
+    updates: Dict[tuple, List[Dict[str, Any]]] = {}
+    counts = Counter()
+    for row in rows:
+        stored = existing.pop(row[key], None)
+        if stored is None:
+            inserts.append(row)
+            continue
+        changed = tuple(name for name, value in row.items()
+                        if name != "scenario_id" and not _unchanged(stored[name], value, name in integer_names))
+        if changed:
+            updates.setdefault(changed, []).append({"row_id": stored["id"], **{name: row[name] for name in changed}})
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+    stale += [stored["id"] for stored in existing.values()]
+
+    for params in updates.values():
+        db.execute(update(table).where(table.c.id == bindparam("row_id")), params)
+    if stale:
+        db.execute(delete(table).where(table.c.id.in_(stale)))
+    counts["inserted"] += bulk_insert(db, model, inserts)
+    counts["deleted"] += len(stale)
+    return counts
+
+
+def sync_monthly_data(db: Session, scenario_id: int, monthly_data, since_month: int = 0) -> Counter:
+    """Bring a scenario's months from since_month onward up to date with monthly_data.
+
+    monthly_data is a ProjectionResult or month dicts in month order, which may be a generator.
+    """
+    return sync_rows(db, MonthlyData, scenario_id, "month_number", monthly_rows(scenario_id, monthly_data),
+                     since_month or None)
+
+
+def sync_yearly_summaries(db: Session, scenario_id: int, yearly_data: Iterable[Dict[str, Any]]) -> Counter:
+    """Bring a scenario's yearly summary rows up to date with yearly_data."""
+    return sync_rows(db, YearlySummary, scenario_id, "year", yearly_rows(scenario_id, yearly_data))
+
+
+class WriteStats:
+    """Rows written by recalculations since startup, for the metrics endpoint."""
+
+    KINDS = ("inserted", "updated", "deleted", "unchanged", "snapshots")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recalculations = 0
+        self.totals = Counter()
+        self.last: Dict[str, int] = {}
+
+    def record(self, counts: Counter) -> None:
+        last = {kind: counts[kind] for kind in self.KINDS}
+        with self._lock:
+            self.recalculations += 1
+            self.totals.update(last)
+            self.last = last
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            written = sum(self.totals[kind] for kind in ("inserted", "updated", "deleted", "snapshots"))
+            return {
+                "recalculations": self.recalculations,
+                "rows": {kind: self.totals[kind] for kind in self.KINDS},
+                "rows_written_per_recalculation": written / self.recalculations if self.recalculations else 0.0,
+                "last_recalculation": self.last,
+            }
+
+
+write_stats = WriteStats()
@@ -0,0 +1,148 @@
+# app/services/cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from app.services.projection import (
+    SCALAR_PARAMETERS,
+    RATE_PARAMETERS,
+    OPTIONAL_PARAMETERS,
+    ProjectionResult,
+    forecast_months,
+    project_series,
+    project_batch
+)
+
+# Memory cap for cached projections, in bytes
+PROJECTION_CACHE_MAX_BYTES = int(os.getenv("PROJECTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _canonical_value(value: Any) -> Any:
+    """Numbers hash by value, so 25 and 25.0 share an entry.
+
+    Safe because projected values do not depend on parameter types either:
+    amounts and client counts are always floats (see FLOAT_KEYS).
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v) for v in value]
+    return value
+
+
+def parameter_hash(params: Dict[str, Any]) -> str:
+    """Stable hash of the parameters that determine a projection.
+
+    Keys outside the model are ignored and a missing horizon hashes like the
+    default one, so equivalent parameter sets map to the same entry.
+    """
+    canonical = {key: _canonical_value(params.get(key)) for key in SCALAR_PARAMETERS + RATE_PARAMETERS}
+    for key, default in OPTIONAL_PARAMETERS.items():
+        canonical[key] = _canonical_value(params.get(key, default))
+    canonical["start_date"] = params.get("start_date")
+    canonical["forecast_months"] = forecast_months(params)
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ProjectionCache:
+    """LRU cache of projected series keyed by parameter hash, bounded by memory.
+
+    An entry is shared by every scenario with the same parameters, so entries
+    are only ever evicted by the LRU, never when one scenario moves away.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, ProjectionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ProjectionResult]:
+        with self._lock:
+            series = self._entries.get(key)
+            if series is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return series
+
+    def put(self, key: str, series: ProjectionResult) -> None:
+        size = series.nbytes
+        if size > self.max_bytes:
+            return
+        # Cached arrays are shared between callers, so freeze them
+        for values in series.columns.values():
+            values.flags.writeable = False
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = series
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+projection_cache = ProjectionCache(PROJECTION_CACHE_MAX_BYTES)
+
+
+def cached_project_series(params: Dict[str, Any]) -> ProjectionResult:
+    """project_series through the shared cache; the returned arrays are read-only."""
+    key = parameter_hash(params)
+    series = projection_cache.get(key)
+    if series is None:
+        series = project_series(params)
+        projection_cache.put(key, series)
+    return series
+
+
+def cached_project_many(params_list: List[Dict[str, Any]]) -> List[ProjectionResult]:
+    """Series for each parameter set, computing only the cache misses in one batch."""
+    keys = [parameter_hash(params) for params in params_list]
+    results = [projection_cache.get(key) for key in keys]
+
+    # Duplicates within the batch are computed once
+    missing: Dict[str, int] = {}
+    for index, series in enumerate(results):
+        if series is None:
+            missing.setdefault(keys[index], index)
+    if missing:
+        batch = project_batch([params_list[index] for index in missing.values()])
+        computed = {}
+        for row, (key, index) in enumerate(missing.items()):
+            months = forecast_months(params_list[index])
+            # Copied out of the batch so each entry is evicted independently
+            computed[key] = ProjectionResult({name: values[row, :months].copy() for name, values in batch.items()})
+            projection_cache.put(key, computed[key])
+        results = [computed[key] if series is None else series for key, series in zip(keys, results)]
+    return results
@@ -0,0 +1,123 @@
+# app/services/executor.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Jobs run on COMPUTE_WORKERS threads, at most COMPUTE_MAX_QUEUE waiting or
+# running at once; a request gives up waiting after COMPUTE_TIMEOUT seconds.
+# Batch analyses fan their chunks out to a COMPUTE_POOL ("process" or "thread")
+# pool of the same size.
+COMPUTE_POOL = os.getenv("COMPUTE_POOL", "process")
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(os.cpu_count() or 1)))
+COMPUTE_MAX_QUEUE = int(os.getenv("COMPUTE_MAX_QUEUE", "32"))
+COMPUTE_TIMEOUT = float(os.getenv("COMPUTE_TIMEOUT", "30"))
+
+# Pool processes come from a fork server, or are spawned where there is none: a plain
+# fork of this multi-threaded server could hand the child a lock another thread held
+COMPUTE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Imported once by the fork server, so each pool process starts with the chunk functions
+# loaded; importing them starts no threads
+COMPUTE_PRELOAD = ["app.services.simulation", "app.services.analysis"]
+
+
+class ComputeBusy(Exception):
+    """Raised when the compute queue is full."""
+
+
+class ComputeTimeout(Exception):
+    """Raised when a job does not finish within the request timeout."""
+
+
+class ComputeExecutor:
+    """Runs heavy work off the event loop.
+
+    Jobs (recalculations, simulations) run on a thread pool; each one opens its
+    own database session when it needs one, so a request that timed out never
+    shares a session with a job still running. Jobs that split into
+    independent chunks hand them to pool(), a process or thread pool.
+    """
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, max_queue: int = COMPUTE_MAX_QUEUE,
+                 timeout: float = COMPUTE_TIMEOUT, pool_kind: str = COMPUTE_POOL):
+        if pool_kind not in ("process", "thread"):
+            raise ValueError("COMPUTE_POOL must be 'process' or 'thread'")
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 1)
+        self.timeout = timeout
+        self.pool_kind = pool_kind
+        self._jobs = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute")
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def pool(self) -> Executor:
+        """Pool for the chunks of a batch job, started on first use."""
+        with self._lock:
+            if self._pool is None:
+                if self.pool_kind == "process":
+                    context = multiprocessing.get_context(COMPUTE_START_METHOD)
+                    if COMPUTE_START_METHOD == "forkserver":
+                        context.set_forkserver_preload(COMPUTE_PRELOAD)
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute-pool")
+            return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a job, or raise ComputeBusy when COMPUTE_MAX_QUEUE jobs are already queued or running."""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise ComputeBusy("Too many calculations in progress, try again shortly")
+            self._pending += 1
+        try:
+            future = self._jobs.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is freed when the job really ends, not when a request stops waiting
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Await a job from the event loop.
+
+        After the timeout the request fails with ComputeTimeout; a job that has
+        not started yet is dropped, one already running finishes in the background.
+        """
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise ComputeTimeout("Calculation timed out")
+
+    def _release(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": self.pool_kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+compute_executor = ComputeExecutor()
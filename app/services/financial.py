@@ -1,12 +1,46 @@
 # app/services/financial.py
-import json
-from typing import Dict, Any, List
+import threading
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
+from collections import Counter, OrderedDict
+from itertools import chain, groupby, islice
+from operator import itemgetter
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Tuple
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.models.database import ForecastScenario, Parameters, MonthlyData, YearlySummary
+from app.database import SessionLocal, use_primary
+from app.models.database import ForecastScenario, Parameters, MonthlyData, YearlySummary, ProjectionSnapshot
+from app.services.bulk import (
+    insert_monthly_data,
+    insert_yearly_summaries,
+    sync_monthly_data,
+    sync_yearly_summaries,
+    write_stats
+)
+from app.services.cache import cached_project_series, cached_project_many
+from app.services.snapshots import (
+    PROJECTION_STORAGE,
+    delete_snapshot,
+    load_snapshot,
+    load_snapshot_async,
+    save_snapshot,
+    stored_projection
+)
+from app.services.rollup import FLOW_KEYS, STOCK_KEYS, period_ids, records_to_columns, rollup_records, rollup_years
+from app.services.projection import (
+    ForecastParams,
+    ProjectionResult,
+    ProjectionState,
+    forecast_months,
+    iter_projections,
+    record_checkpoints,
+    first_affected_month
+)
+
+# Columns of monthly_data that period aggregation reads back
+STORED_MONTH_KEYS = ["year", "month"] + FLOW_KEYS + STOCK_KEYS
 
 # Default business model parameters
 DEFAULT_PARAMETERS = {
@@ -48,8 +82,19 @@ DEFAULT_PARAMETERS = {
     "marketing_percentage": 0.15,  # 15% of revenue for marketing
     "infrastructure_cost_per_user": 1.5,  # $1.50 per user for infrastructure
     "other_expenses_percentage": 0.10,  # 10% of revenue for other expenses
+    
+    # Forecast horizon
+    "forecast_months": 72,  # 6 years of monthly projections
 }
 
+# Simulation checkpoints of recently recalculated scenarios: scenario_id -> (parameters, state before each month)
+CHECKPOINT_CACHE_SIZE = 256
+_scenario_checkpoints: "OrderedDict[int, Tuple[Dict[str, Any], List[ProjectionState]]]" = OrderedDict()
+_checkpoint_lock = threading.Lock()
+
+# Recalculations of the same scenario run one at a time; locks are shared by scenario_id modulo their count
+_recalculation_locks = [threading.Lock() for _ in range(64)]
+
 # Helper function to get the growth rate based on month
 def get_growth_rate(month: int, rates: List[float]) -> float:
     year = min(month // 12, len(rates) - 1)
@@ -62,6 +107,18 @@ def get_scenario_by_id(db: Session, scenario_id: int):
         raise HTTPException(status_code=404, detail="Scenario not found")
     return scenario
 
+# Helper function to get scenario by ID on an async session, with its parameters loaded
+# (an async session cannot load them lazily)
+async def get_scenario_by_id_async(db: AsyncSession, scenario_id: int):
+    scenario = (await db.execute(
+        select(ForecastScenario)
+        .options(selectinload(ForecastScenario.parameters))
+        .where(ForecastScenario.id == scenario_id)
+    )).scalars().first()
+    if not scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return scenario
+
 # Helper function to get default scenario
 def get_default_scenario(db: Session):
     default_scenario = db.query(ForecastScenario).filter(ForecastScenario.is_default == True).first()
@@ -70,6 +127,18 @@ def get_default_scenario(db: Session):
         default_scenario = create_default_scenario(db)
     return default_scenario
 
+# Helper function to get default scenario on an async session
+async def get_default_scenario_async(db: AsyncSession):
+    # A replica that has not caught up would show no default and have a second one created
+    use_primary(db)
+    default_scenario = (await db.execute(
+        select(ForecastScenario).where(ForecastScenario.is_default == True)
+    )).scalars().first()
+    if not default_scenario:
+        # Created once per database, so the sync helper runs on the session's connection
+        default_scenario = await db.run_sync(create_default_scenario)
+    return default_scenario
+
 # Helper function to create a default scenario
 def create_default_scenario(db: Session):
     # Create default scenario
@@ -111,364 +180,187 @@ def create_default_scenario(db: Session):
         admin_salary=DEFAULT_PARAMETERS["admin_salary"],
         marketing_percentage=DEFAULT_PARAMETERS["marketing_percentage"],
         infrastructure_cost_per_user=DEFAULT_PARAMETERS["infrastructure_cost_per_user"],
-        other_expenses_percentage=DEFAULT_PARAMETERS["other_expenses_percentage"]
+        other_expenses_percentage=DEFAULT_PARAMETERS["other_expenses_percentage"],
+        forecast_months=DEFAULT_PARAMETERS["forecast_months"]
     )
     db.add(default_params)
     
-    # Generate monthly data
-    monthly_data = calculate_projections(DEFAULT_PARAMETERS)
-    for month_data in monthly_data:
-        db_month = MonthlyData(
-            scenario_id=default_scenario.id,
-            year=month_data["year"],
-            month=month_data["month"],
-            month_number=month_data["month_number"],
-            date=month_data["date"],
-            income=month_data["income"],
-            expenses=month_data["expenses"],
-            ebitda=month_data["ebitda"],
-            client_count=month_data["client_count"],
-            new_clients=month_data["new_clients"],
-            paying_clients=month_data["paying_clients"],
-            developer_count=month_data["developer_count"],
-            affiliate_count=month_data["affiliate_count"],
-            sales_staff=month_data["sales_staff"],
-            jr_devs=month_data["jr_devs"],
-            admin_staff=month_data["admin_staff"],
-            cto_count=month_data["cto_count"],
-            total_staff=month_data["total_staff"],
-            cto_cost=month_data["cto_cost"],
-            sales_cost=month_data["sales_cost"],
-            jr_dev_cost=month_data["jr_dev_cost"],
-            admin_cost=month_data["admin_cost"],
-            infrastructure_cost=month_data["infrastructure_cost"],
-            marketing_cost=month_data["marketing_cost"],
-            affiliate_cost=month_data["affiliate_cost"],
-            other_expenses=month_data["other_expenses"]
-        )
-        db.add(db_month)
-    
-    # Generate yearly summary
-    yearly_data = get_yearly_summary(monthly_data)
-    for year_data in yearly_data:
-        db_year = YearlySummary(
-            scenario_id=default_scenario.id,
-            year=year_data["year"],
-            income=year_data["income"],
-            expenses=year_data["expenses"],
-            ebitda=year_data["ebitda"],
-            client_count=year_data["client_count"],
-            paying_clients=year_data["paying_clients"],
-            developer_count=year_data["developer_count"],
-            affiliate_count=year_data["affiliate_count"],
-            sales_staff=year_data["sales_staff"],
-            jr_devs=year_data["jr_devs"],
-            admin_staff=year_data["admin_staff"],
-            cto_count=year_data["cto_count"],
-            total_staff=year_data["total_staff"]
-        )
-        db.add(db_year)
+    # Generate monthly data and its yearly summary
+    store_projection(db, default_scenario.id, ForecastParams.from_dict(DEFAULT_PARAMETERS), cached_project_series(DEFAULT_PARAMETERS))
     
     db.commit()
     db.refresh(default_scenario)
     return default_scenario
 
-# Helper function to get parameters from scenario
-def get_parameters_from_scenario(scenario):
-    if not scenario.parameters:
-        return DEFAULT_PARAMETERS
-    
-    # Convert JSON strings to python objects if needed
-    client_growth_rates = scenario.parameters.client_growth_rates
-    developer_growth_rates = scenario.parameters.developer_growth_rates
-    affiliate_growth_rates = scenario.parameters.affiliate_growth_rates
-    
-    if isinstance(client_growth_rates, str):
-        client_growth_rates = json.loads(client_growth_rates)
-    if isinstance(developer_growth_rates, str):
-        developer_growth_rates = json.loads(developer_growth_rates)
-    if isinstance(affiliate_growth_rates, str):
-        affiliate_growth_rates = json.loads(affiliate_growth_rates)
-    
-    # Construct the parameters dictionary
-    return {
-        "start_date": scenario.parameters.start_date,
-        "initial_clients": scenario.parameters.initial_clients,
-        "initial_developers": scenario.parameters.initial_developers,
-        "initial_affiliates": scenario.parameters.initial_affiliates,
-        "client_growth_rates": client_growth_rates,
-        "developer_growth_rates": developer_growth_rates,
-        "affiliate_growth_rates": affiliate_growth_rates,
-        "subscription_price": scenario.parameters.subscription_price,
-        "affiliate_commission": scenario.parameters.affiliate_commission,
-        "free_months": scenario.parameters.free_months,
-        "conversion_rate": scenario.parameters.conversion_rate,
-        "cto_start_month": scenario.parameters.cto_start_month,
-        "ceo_start_month": scenario.parameters.ceo_start_month,
-        "sales_start_month": scenario.parameters.sales_start_month,
-        "sales_hiring_interval": scenario.parameters.sales_hiring_interval,
-        "max_sales_staff": scenario.parameters.max_sales_staff,
-        "jr_dev_start_month": scenario.parameters.jr_dev_start_month,
-        "admin_start_month": scenario.parameters.admin_start_month,
-        "cto_salary": scenario.parameters.cto_salary,
-        "ceo_salary": scenario.parameters.ceo_salary,
-        "sales_base_salary": scenario.parameters.sales_base_salary,
-        "sales_commission": scenario.parameters.sales_commission,
-        "jr_dev_salary": scenario.parameters.jr_dev_salary,
-        "admin_salary": scenario.parameters.admin_salary,
-        "marketing_percentage": scenario.parameters.marketing_percentage,
-        "infrastructure_cost_per_user": scenario.parameters.infrastructure_cost_per_user,
-        "other_expenses_percentage": scenario.parameters.other_expenses_percentage
-    }
-
-# Calculate financial projections based on parameters
-def calculate_projections(params: Dict[str, Any]) -> List[Dict[str, Any]]:
-    start_date = datetime.strptime(params["start_date"], "%Y-%m-%d")
-    months = 72
-
-    # Initialize values
-    clients = params["initial_clients"]
-    paying_clients = 0
-    developers = params["initial_developers"] 
-    affiliates = params["initial_affiliates"]
-
-    # Track clients by cohort for calculating paying clients
-    client_cohorts = []  # List of (month_joined, count) tuples
-    
-    # Track sales staff hiring
-    sales_staff_count = 0
-    sales_staff_hire_months = []
+# Tables holding a scenario's parameters and stored projection, copied by clone_scenario
+SCENARIO_DATA_MODELS = [Parameters, MonthlyData, YearlySummary, ProjectionSnapshot]
+
+# Helper function to create a scenario as a copy of another one
+def clone_scenario(db: Session, source_id: int, name: str, description: Optional[str] = None) -> ForecastScenario:
+    """Copies the source's parameters and stored projection with one INSERT ... SELECT per table.
+
+    Nothing is projected or loaded into Python; the caller commits, so the
+    new scenario and its data land in one transaction.
+    """
+    scenario = ForecastScenario(name=name, description=description, is_default=False)
+    db.add(scenario)
+    db.flush()  # Flush to get the ID for the copied rows
     
-    # Init other staff counts
-    cto_count = 0
-    ceo_count = 0
-    jr_dev_count = 0
-    admin_count = 0
-
-    monthly_data = []
-
-    for i in range(months):
-        current_date = start_date + relativedelta(months=i)
-        current_month = current_date.month
-        current_year = current_date.year
-        year_index = min(i // 12, len(params["client_growth_rates"]) - 1)
-        
-        # --- Staff Hiring Logic ---
-        # CTO hiring
-        if i >= params["cto_start_month"] and cto_count == 0:
-            cto_count = 1
-        
-        # CEO hiring logic
-        if i >= params["ceo_start_month"] and ceo_count == 0:
-            ceo_count = 1
-            
-        # Sales staff hiring
-        if i >= params["sales_start_month"] and i % params["sales_hiring_interval"] == params["sales_start_month"] % params["sales_hiring_interval"] and sales_staff_count < params["max_sales_staff"]:
-            sales_staff_count += 1
-            sales_staff_hire_months.append(i)
-            
-        # Junior Developer hiring
-        if i >= params["jr_dev_start_month"] and jr_dev_count == 0:
-            jr_dev_count = 1
-            
-        # Admin staff hiring
-        if i >= params["admin_start_month"] and admin_count == 0:
-            admin_count = 1
-        
-        # --- Growth Calculations ---
-        # Client growth
-        client_growth_rate = params["client_growth_rates"][year_index]
-        developer_growth_rate = params["developer_growth_rates"][year_index]
-        affiliate_growth_rate = params["affiliate_growth_rates"][year_index]
-        
-        # Base acquisition from marketing + product-led growth
-        base_acquisition = max(5, int(clients * client_growth_rate * 0.2)) if i == 0 else max(10, int(clients * client_growth_rate * 0.2))
-        
-        # Sales-driven acquisition
-        sales_acquisition = 0
-        if sales_staff_count > 0:
-            sales_acquisition = 20 * sales_staff_count * (1 + (i // 6) * 0.1)  # Each sales person brings 20 clients/month, improving 10% every 6 months
-            
-        # Affiliate-driven acquisition
-        affiliate_acquisition = 0
-        if affiliates > 0:
-            affiliate_acquisition = int(affiliates * 0.5)  # Each affiliate brings 0.5 clients on average per month
-            
-        new_clients = base_acquisition + sales_acquisition + affiliate_acquisition
-        new_devs = max(1, int(developers * developer_growth_rate)) if developers > 0 else 2
-        new_affs = max(2, int(affiliates * affiliate_growth_rate)) if affiliates > 0 else 3
-        
-        # Store cohort for future conversion calculation
-        if new_clients > 0:
-            client_cohorts.append((i, new_clients))
-            
-        # Update totals
-        clients += new_clients
-        developers += new_devs
-        affiliates += new_affs
-        
-        # Calculate paying clients
-        paying_clients = 0
-        for cohort_month, cohort_size in client_cohorts:
-            months_since_joining = i - cohort_month
-            
-            # If past free period, apply conversion rate
-            if months_since_joining >= params["free_months"]:
-                # First month after free period - apply conversion
-                if months_since_joining == params["free_months"]:
-                    cohort_size = int(cohort_size * params["conversion_rate"])
-                
-                paying_clients += cohort_size
-        
-        # --- Revenue Calculations ---
-        client_revenue = paying_clients * params["subscription_price"]
-        developer_revenue = developers * params["subscription_price"]
-        
-        # Calculate affiliate commission
-        affiliate_commission = affiliates * params["affiliate_commission"]
-        
-        # Total revenue
-        revenue = client_revenue + developer_revenue
-        
-        # --- Expense Calculations ---
-        # Staff salaries
-        cto_cost = cto_count * params["cto_salary"]
-        ceo_cost = ceo_count * params["ceo_salary"]
-        jr_dev_cost = jr_dev_count * params["jr_dev_salary"]
-        admin_cost = admin_count * params["admin_salary"]
-        
-        # Sales staff cost - base + commission
-        sales_base_cost = sales_staff_count * params["sales_base_salary"]
-        sales_commission_cost = sales_acquisition * params["subscription_price"] * params["sales_commission"]
-        sales_total_cost = sales_base_cost + sales_commission_cost
-        
-        # Infrastructure costs
-        infrastructure_cost = (clients + developers) * params["infrastructure_cost_per_user"]
-        
-        # Marketing costs
-        marketing_cost = revenue * params["marketing_percentage"]
-        
-        # Affiliate program costs
-        affiliate_program_cost = affiliate_commission
-        
-        # Other expenses
-        other_expenses = revenue * params["other_expenses_percentage"]
-        
-        # Total expenses
-        total_expenses = (
-            cto_cost + 
-            ceo_cost + 
-            jr_dev_cost + 
-            admin_cost + 
-            sales_total_cost + 
-            infrastructure_cost + 
-            marketing_cost + 
-            affiliate_program_cost + 
-            other_expenses
+    for model in SCENARIO_DATA_MODELS:
+        table = model.__table__
+        columns = [column.name for column in table.columns if column.name not in ("id", "scenario_id")]
+        rows = select(literal(scenario.id, Integer), *[table.c[column] for column in columns]).where(
+            table.c.scenario_id == source_id
         )
-        
-        # Net income (EBITDA)
-        ebitda = revenue - total_expenses
-        
-        # Store monthly data
-        monthly_data.append({
-            "year": current_year,
-            "month": current_month,
-            "month_number": i,
-            "date": current_date.strftime("%Y-%m-%d"),
-            "income": round(revenue, 2),
-            "expenses": round(total_expenses, 2),
-            "ebitda": round(ebitda, 2),
-            "client_count": clients,
-            "new_clients": new_clients,
-            "paying_clients": paying_clients,
-            "developer_count": developers,
-            "affiliate_count": affiliates,
-            "sales_staff": sales_staff_count,
-            "jr_devs": jr_dev_count,
-            "admin_staff": admin_count,
-            "cto_count": cto_count,
-            "ceo_count": ceo_count,
-            "total_staff": sales_staff_count + jr_dev_count + admin_count + cto_count + ceo_count,
-            # Detailed costs
-            "cto_cost": round(cto_cost, 2),
-            "ceo_cost": round(ceo_cost, 2),
-            "sales_cost": round(sales_total_cost, 2),
-            "jr_dev_cost": round(jr_dev_cost, 2),
-            "admin_cost": round(admin_cost, 2),
-            "infrastructure_cost": round(infrastructure_cost, 2),
-            "marketing_cost": round(marketing_cost, 2),
-            "affiliate_cost": round(affiliate_program_cost, 2),
-            "other_expenses": round(other_expenses, 2),
-        })
-
-    return monthly_data
-
-# Aggregate monthly data to yearly summaries
-def get_yearly_summary(monthly_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    yearly_summary = {}
-    
-    for month in monthly_data:
-        year = month["year"]
-        if year not in yearly_summary:
-            yearly_summary[year] = {
-                "year": year,
-                "income": 0,
-                "expenses": 0,
-                "ebitda": 0,
-                "end_of_year": None
-            }
-        
-        yearly_summary[year]["income"] += month["income"]
-        yearly_summary[year]["expenses"] += month["expenses"]
-        yearly_summary[year]["ebitda"] += month["ebitda"]
-        
-        # Keep the December data (or last month of the year)
-        if month["month"] == 12 or yearly_summary[year]["end_of_year"] is None:
-            yearly_summary[year]["end_of_year"] = {
-                "client_count": month["client_count"],
-                "paying_clients": month["paying_clients"],
-                "developer_count": month["developer_count"],
-                "affiliate_count": month["affiliate_count"],
-                "sales_staff": month["sales_staff"],
-                "jr_devs": month["jr_devs"],
-                "admin_staff": month["admin_staff"],
-                "cto_count": month["cto_count"],
-                "ceo_count": month.get("ceo_count", 0),
-                "total_staff": month["total_staff"]
-            }
+        copied = db.execute(insert(table).from_select(["scenario_id"] + columns, rows)).rowcount
+        if model is Parameters and not copied:
+            # A source without stored parameters projects the defaults; give the copy its own row
+            db.add(Parameters(scenario_id=scenario.id, **DEFAULT_PARAMETERS))
+    return scenario
+
+# Helper function to get parameters from scenario, validated once for the projection engine
+def get_parameters_from_scenario(scenario) -> ForecastParams:
+    if not scenario.parameters:
+        return ForecastParams.from_dict(DEFAULT_PARAMETERS)
+    return ForecastParams.from_row(scenario.parameters)
+
+# Calculate financial projections based on parameters; .to_records() gives the month dicts
+def calculate_projections(params: Dict[str, Any]) -> ProjectionResult:
+    return cached_project_series(params)
+
+# Calculate projections for many parameter sets in one vectorized pass, one result per scenario
+def calculate_projections_batch(params_list: List[Dict[str, Any]]) -> List[ProjectionResult]:
+    return cached_project_many(params_list)
+
+# Aggregate monthly data to yearly summaries; accepts month rows or a ProjectionResult.
+# Each year's staff and client counts come from its last month.
+def get_yearly_summary(monthly_data: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if isinstance(monthly_data, ProjectionResult):
+        columns = monthly_data.columns
+        if len(columns["year"]) == 0:
+            return []
+        return rollup_records(columns, "year")
+    # Month rows, which may be a generator, are rolled up as they are read
+    return list(rollup_years(monthly_data))
+
+# Helper function to pass month rows through, adding each year's summary to yearly_data as its months go by
+def _summarized(monthly_data: Iterable[Dict[str, Any]], yearly_data: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for _, months in groupby(monthly_data, key=itemgetter("year")):
+        months = list(months)
+        yearly_data += rollup_years(months)
+        yield from months
+
+# Helper function to write the first projection of a new scenario in the PROJECTION_STORAGE mode;
+# returns its yearly summary
+def store_projection(db: Session, scenario_id: int, params: ForecastParams, projection: ProjectionResult) -> List[Dict[str, Any]]:
+    yearly_data = get_yearly_summary(projection)
+    if PROJECTION_STORAGE in ("rows", "both"):
+        # Monthly data and yearly summary, each written in one bulk insert
+        insert_monthly_data(db, {scenario_id: projection})
+        insert_yearly_summaries(db, {scenario_id: yearly_data})
+    if PROJECTION_STORAGE in ("snapshot", "both"):
+        save_snapshot(db, scenario_id, params, projection)
+    return yearly_data
+
+# Helper function to turn ?from=YYYY-MM&to=YYYY-MM into the month_number range [first, stop) of a scenario
+def month_number_range(scenario, from_month: Optional[str], to_month: Optional[str]) -> Tuple[int, Optional[int]]:
+    """Months are counted from the scenario's start date, so a range maps onto the
+    (scenario_id, month_number) index; stop is None when the range is open-ended."""
+    start_date = scenario.parameters.start_date if scenario.parameters else DEFAULT_PARAMETERS["start_date"]
+    start = datetime.strptime(start_date, "%Y-%m-%d")
     
-    # Convert dict to list and round values
-    result = []
-    for year, data in yearly_summary.items():
-        year_data = {
-            "year": year,
-            "income": round(data["income"], 2),
-            "expenses": round(data["expenses"], 2),
-            "ebitda": round(data["ebitda"], 2)
-        }
-        # Add staff data
-        if data["end_of_year"]:
-            year_data.update({
-                "client_count": data["end_of_year"]["client_count"],
-                "paying_clients": data["end_of_year"]["paying_clients"],
-                "developer_count": data["end_of_year"]["developer_count"],
-                "affiliate_count": data["end_of_year"]["affiliate_count"],
-                "sales_staff": data["end_of_year"]["sales_staff"],
-                "jr_devs": data["end_of_year"]["jr_devs"],
-                "admin_staff": data["end_of_year"]["admin_staff"],
-                "cto_count": data["end_of_year"]["cto_count"],
-                "ceo_count": data["end_of_year"]["ceo_count"],
-                "total_staff": data["end_of_year"]["total_staff"]
-            })
-        result.append(year_data)
+    def month_number(name: str, value: str) -> int:
+        try:
+            month = datetime.strptime(value, "%Y-%m")
+        except ValueError:
+            raise ValueError(f"{name} must be a month in YYYY-MM format")
+        return (month.year - start.year) * 12 + month.month - start.month
     
-    return sorted(result, key=lambda x: x["year"])
+    first = max(month_number("from", from_month), 0) if from_month else 0
+    stop = max(month_number("to", to_month) + 1, 0) if to_month else None
+    return first, stop
+
+# Helper function to get a scenario's projection without its monthly rows: computed from the
+# parameters in "parameters" storage mode, its snapshot in "snapshot" and "both" modes if it
+# has one, else None; "rows" mode never looks for a snapshot
+def load_projection(db: Session, scenario) -> Optional[ProjectionResult]:
+    if PROJECTION_STORAGE == "parameters":
+        return stored_projection(cached_project_series(get_parameters_from_scenario(scenario)))
+    if PROJECTION_STORAGE not in ("snapshot", "both"):
+        return None
+    return load_snapshot(db, scenario.id)
+
+# Helper function to get a scenario's projection without its monthly rows, on an async session
+async def load_projection_async(db: AsyncSession, scenario) -> Optional[ProjectionResult]:
+    if PROJECTION_STORAGE == "parameters":
+        return stored_projection(cached_project_series(get_parameters_from_scenario(scenario)))
+    if PROJECTION_STORAGE not in ("snapshot", "both"):
+        return None
+    return await load_snapshot_async(db, scenario.id)
+
+# Roll a scenario's stored months up to quarters, calendar years or fiscal years
+def get_period_summary(db: Session, scenario_id: int, period: str, fiscal_year_start: int = 1) -> List[Dict[str, Any]]:
+    projection = load_projection(db, get_scenario_by_id(db, scenario_id))
+    if projection is not None:
+        columns = projection.columns
+    else:
+        columns = records_to_columns(get_stored_months(db, scenario_id), STORED_MONTH_KEYS)
+    return _period_summary(columns, period, fiscal_year_start)
+
+# Roll a scenario's stored months up to quarters, calendar years or fiscal years, on an async session
+async def get_period_summary_async(db: AsyncSession, scenario_id: int, period: str, fiscal_year_start: int = 1) -> List[Dict[str, Any]]:
+    projection = await load_projection_async(db, await get_scenario_by_id_async(db, scenario_id))
+    if projection is not None:
+        columns = projection.columns
+    else:
+        columns = records_to_columns(await get_stored_months_async(db, scenario_id), STORED_MONTH_KEYS)
+    return _period_summary(columns, period, fiscal_year_start)
+
+# Helper function to roll month columns up to periods
+def _period_summary(columns: Dict[str, Any], period: str, fiscal_year_start: int) -> List[Dict[str, Any]]:
+    if len(columns["year"]) == 0:
+        # Still reject an unknown period or fiscal start month
+        period_ids(columns["year"], columns["month"], period, fiscal_year_start)
+        return []
+    return rollup_records(columns, period, fiscal_year_start)
+
+# Helper function to build the query for the stored months needed for period aggregation
+def _stored_months_query(scenario_id: int, before_month: Optional[int] = None):
+    table = MonthlyData.__table__
+    query = select(*[table.c[key] for key in STORED_MONTH_KEYS]).where(table.c.scenario_id == scenario_id)
+    if before_month is not None:
+        query = query.where(table.c.month_number < before_month)
+    return query.order_by(table.c.month_number)
+
+# Helper function to read back the stored months needed for period aggregation (all of them by default)
+def get_stored_months(db: Session, scenario_id: int, before_month: Optional[int] = None) -> List[Dict[str, Any]]:
+    return [dict(month) for month in db.execute(_stored_months_query(scenario_id, before_month)).mappings()]
+
+# Helper function to read back the stored months on an async session
+async def get_stored_months_async(db: AsyncSession, scenario_id: int, before_month: Optional[int] = None) -> List[Dict[str, Any]]:
+    return [dict(month) for month in (await db.execute(_stored_months_query(scenario_id, before_month))).mappings()]
+
+# Helper function to normalize parameters for checkpoint comparison
+def _checkpoint_parameters(params: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {key: params.get(key) for key in DEFAULT_PARAMETERS}
+    normalized["forecast_months"] = forecast_months(params)
+    return normalized
+
+# Helper function to remember a scenario's checkpoints, evicting the least recently used
+def _remember_checkpoints(scenario_id: int, params: Dict[str, Any], checkpoints: List[ProjectionState]):
+    with _checkpoint_lock:
+        _scenario_checkpoints[scenario_id] = (params, checkpoints)
+        _scenario_checkpoints.move_to_end(scenario_id)
+        while len(_scenario_checkpoints) > CHECKPOINT_CACHE_SIZE:
+            _scenario_checkpoints.popitem(last=False)
 
 # Helper function to recalculate and update a scenario with new parameters
 def recalculate_scenario(db: Session, scenario_id: int, params: Dict[str, Any]):
+    params = ForecastParams.from_dict(params)
+    
     # Get scenario
     scenario = get_scenario_by_id(db, scenario_id)
+    previous_params = get_parameters_from_scenario(scenario) if scenario.parameters else None
     
     # Update parameters
     if scenario.parameters:
@@ -479,63 +371,68 @@ def recalculate_scenario(db: Session, scenario_id: int, params: Dict[str, Any]):
             elif hasattr(scenario.parameters, key):
                 setattr(scenario.parameters, key, value)
     
-    # Delete existing monthly data and yearly summaries
-    db.query(MonthlyData).filter(MonthlyData.scenario_id == scenario_id).delete()
-    db.query(YearlySummary).filter(YearlySummary.scenario_id == scenario_id).delete()
+    if PROJECTION_STORAGE in ("snapshot", "parameters"):
+        # No rows are kept, including any written before the switch
+        counts = Counter(deleted=(
+            db.query(YearlySummary).filter(YearlySummary.scenario_id == scenario_id).delete()
+            + db.query(MonthlyData).filter(MonthlyData.scenario_id == scenario_id).delete()
+        ))
+        projection = cached_project_series(params)
+        if PROJECTION_STORAGE == "snapshot":
+            counts["snapshots"] = save_snapshot(db, scenario_id, params, projection)
+        else:
+            # Reads compute from the parameters, which also leaves the cache warm for them
+            delete_snapshot(db, scenario_id)
+        yearly_data = get_yearly_summary(projection)
+        db.commit()
+        write_stats.record(counts)
+        return yearly_data
     
-    # Generate new monthly data
-    monthly_data = calculate_projections(params)
-    for month_data in monthly_data:
-        db_month = MonthlyData(
-            scenario_id=scenario_id,
-            year=month_data["year"],
-            month=month_data["month"],
-            month_number=month_data["month_number"],
-            date=month_data["date"],
-            income=month_data["income"],
-            expenses=month_data["expenses"],
-            ebitda=month_data["ebitda"],
-            client_count=month_data["client_count"],
-            new_clients=month_data["new_clients"],
-            paying_clients=month_data["paying_clients"],
-            developer_count=month_data["developer_count"],
-            affiliate_count=month_data["affiliate_count"],
-            sales_staff=month_data["sales_staff"],
-            jr_devs=month_data["jr_devs"],
-            admin_staff=month_data["admin_staff"],
-            cto_count=month_data["cto_count"],
-            total_staff=month_data["total_staff"],
-            cto_cost=month_data["cto_cost"],
-            sales_cost=month_data["sales_cost"],
-            jr_dev_cost=month_data["jr_dev_cost"],
-            admin_cost=month_data["admin_cost"],
-            infrastructure_cost=month_data["infrastructure_cost"],
-            marketing_cost=month_data["marketing_cost"],
-            affiliate_cost=month_data["affiliate_cost"],
-            other_expenses=month_data["other_expenses"]
-        )
-        db.add(db_month)
+    months = forecast_months(params)
+    checkpoint_params = _checkpoint_parameters(params)
+    
+    # Resume from the earliest month the change can affect if this scenario's checkpoints are current
+    start_month = 0
+    cached = _scenario_checkpoints.get(scenario_id)
+    if cached is not None and previous_params is not None and cached[0] == _checkpoint_parameters(previous_params):
+        start_month = first_affected_month(cached[0], checkpoint_params, months)
     
-    # Generate yearly summary
-    yearly_data = get_yearly_summary(monthly_data)
-    for year_data in yearly_data:
-        db_year = YearlySummary(
-            scenario_id=scenario_id,
-            year=year_data["year"],
-            income=year_data["income"],
-            expenses=year_data["expenses"],
-            ebitda=year_data["ebitda"],
-            client_count=year_data["client_count"],
-            paying_clients=year_data["paying_clients"],
-            developer_count=year_data["developer_count"],
-            affiliate_count=year_data["affiliate_count"],
-            sales_staff=year_data["sales_staff"],
-            jr_devs=year_data["jr_devs"],
-            admin_staff=year_data["admin_staff"],
-            cto_count=year_data["cto_count"],
-            total_staff=year_data["total_staff"]
+    if start_month > 0:
+        # Compute only the months from start_month onward, stepping on from the checkpointed state.
+        # They are streamed into the sync, rolled up into yearly_data on the way with the stored
+        # months before them, which are read but not rewritten.
+        checkpoints = cached[1][:start_month]
+        stored_months = get_stored_months(db, scenario_id, start_month)
+        yearly_data = []
+        monthly_data = islice(
+            _summarized(chain(stored_months, iter_projections(params, months, state=cached[1][start_month], checkpoints=checkpoints)), yearly_data),
+            len(stored_months), None
         )
-        db.add(db_year)
+    else:
+        checkpoints = record_checkpoints(params, months)
+        monthly_data = cached_project_series(params)
+        yearly_data = get_yearly_summary(monthly_data)
+    
+    # Rewrite only the rows whose values changed; a streamed yearly_data is complete once the months are written
+    counts = sync_monthly_data(db, scenario_id, monthly_data, start_month)
+    counts += sync_yearly_summaries(db, scenario_id, yearly_data)
+    if PROJECTION_STORAGE == "both":
+        counts["snapshots"] = save_snapshot(db, scenario_id, params, cached_project_series(params))
+    else:
+        # Reads prefer a snapshot, so one left from another mode would now be stale
+        delete_snapshot(db, scenario_id)
     
     db.commit()
-    return yearly_data
\ No newline at end of file
+    _remember_checkpoints(scenario_id, checkpoint_params, checkpoints)
+    write_stats.record(counts)
+    return yearly_data
+
+# Helper function to recalculate a scenario on a compute worker
+def recalculate_scenario_job(scenario_id: int, params: Dict[str, Any]):
+    """recalculate_scenario in a session of its own, one run per scenario at a time."""
+    with _recalculation_locks[scenario_id % len(_recalculation_locks)]:
+        db = SessionLocal()
+        try:
+            return recalculate_scenario(db, scenario_id, params)
+        finally:
+            db.close()
@@ -0,0 +1,318 @@
+# app/services/jobs.py
+import asyncio
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.executor import ComputeBusy, compute_executor
+from app.services.financial import recalculate_scenario_job
+from app.services.projection import ForecastParams
+
+# How parameter updates are applied:
+#   sync   - the request recalculates and returns the yearly summary (default)
+#   queued - the request returns 202 with a job id; a background worker recalculates
+PARAMETER_UPDATE_MODES = ["sync", "queued"]
+PARAMETER_UPDATES = os.getenv("PARAMETER_UPDATES", "sync")
+if PARAMETER_UPDATES not in PARAMETER_UPDATE_MODES:
+    raise ValueError(f"PARAMETER_UPDATES must be one of {', '.join(PARAMETER_UPDATE_MODES)}")
+
+# A queued update waits RECOMPUTE_DEBOUNCE seconds for the next one to the same scenario,
+# but never more than RECOMPUTE_MAX_DELAY seconds after the first; finished jobs can be
+# looked up for RECOMPUTE_JOB_TTL seconds.
+RECOMPUTE_BACKEND = os.getenv("RECOMPUTE_BACKEND", "memory")
+RECOMPUTE_DEBOUNCE = float(os.getenv("RECOMPUTE_DEBOUNCE", "0.5"))
+RECOMPUTE_MAX_DELAY = float(os.getenv("RECOMPUTE_MAX_DELAY", "3"))
+RECOMPUTE_JOB_TTL = float(os.getenv("RECOMPUTE_JOB_TTL", "600"))
+
+FINISHED_STATUSES = ("succeeded", "failed", "superseded")
+
+
+class RecomputeJob:
+    """One recalculation of a scenario, standing for every update coalesced into it.
+
+    status goes queued -> running -> succeeded or failed. A job that could not
+    be started before a newer update arrived ends as superseded, pointing at
+    the job that carries its parameters forward.
+    """
+    __slots__ = ("id", "scenario_id", "params", "status", "updates", "created_at", "due", "deadline",
+                 "started_at", "finished_at", "result", "error", "superseded_by", "_listeners")
+
+    def __init__(self, scenario_id: int, params: ForecastParams, due: float, deadline: float):
+        self.id = uuid.uuid4().hex
+        self.scenario_id = scenario_id
+        self.params = params
+        self.status = "queued"
+        self.updates = 1
+        self.created_at = datetime.utcnow()
+        self.due = due
+        self.deadline = deadline
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.superseded_by: Optional[str] = None
+        self._listeners: List[Callable[["RecomputeJob"], None]] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        job = {
+            "job_id": self.id,
+            "scenario_id": self.scenario_id,
+            "status": self.status,
+            "updates": self.updates,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if self.status == "succeeded":
+            job["yearly_summary"] = self.result
+        elif self.status == "failed":
+            job["error"] = self.error
+        elif self.status == "superseded":
+            job["superseded_by"] = self.superseded_by
+        return job
+
+
+class RecomputeBackend(ABC):
+    """Where queued recalculations wait and run.
+
+    submit() coalesces an update into the scenario's queued job, or queues a
+    new one, and returns it; get() looks a job up by id; add_listener()
+    registers a callback for when a job finishes. A backend shared between
+    processes (a database table or Redis) implements the same methods; one
+    missing any of them cannot be instantiated.
+    """
+
+    @abstractmethod
+    def submit(self, scenario_id: int, params: ForecastParams) -> RecomputeJob:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[RecomputeJob]:
+        ...
+
+    @abstractmethod
+    def latest_params(self, scenario_id: int) -> Optional[ForecastParams]:
+        """Parameters of the scenario's newest queued or running job, which later updates build on."""
+        ...
+
+    @abstractmethod
+    def add_listener(self, job_id: str, callback: Callable[[RecomputeJob], None]) -> None:
+        """Call callback(job) once the job finishes, right away if it already has."""
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[RecomputeJob]:
+        """Wait up to timeout seconds for a job to finish without blocking the event loop."""
+        job = self.get(job_id)
+        if job is None or job.finished or timeout <= 0:
+            return job
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def notify(_job: RecomputeJob) -> None:
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        self.add_listener(job_id, notify)
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(job_id)
+
+
+class InProcessBackend(RecomputeBackend):
+    """Debounced jobs held in memory and started by one worker thread.
+
+    Each scenario has at most one queued job; an update arriving while it
+    waits replaces its parameters and pushes it back by the debounce window.
+    A job starts once its window passes and no job of the same scenario is
+    running, so a scenario's recalculations never overtake each other. The
+    recalculation itself runs on the compute executor; when that is full the
+    job waits another window.
+    """
+
+    def __init__(self, run: Callable[[int, ForecastParams], Any], debounce: float = RECOMPUTE_DEBOUNCE,
+                 max_delay: float = RECOMPUTE_MAX_DELAY, ttl: float = RECOMPUTE_JOB_TTL):
+        self.run = run
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.ttl = ttl
+        self._lock = threading.Condition()
+        self._jobs: Dict[str, RecomputeJob] = {}
+        self._queued: Dict[int, RecomputeJob] = {}
+        self._running: Dict[int, RecomputeJob] = {}
+        # Finished jobs in the order they finished, with the monotonic time they did
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._worker: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.created = 0
+        self.started = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.superseded = 0
+
+    def submit(self, scenario_id: int, params: ForecastParams) -> RecomputeJob:
+        now = time.monotonic()
+        with self._lock:
+            self.submitted += 1
+            self._expire()
+            job = self._queued.get(scenario_id)
+            if job is None:
+                job = RecomputeJob(scenario_id, params, now + self.debounce, now + self.max_delay)
+                self._queued[scenario_id] = job
+                self._jobs[job.id] = job
+                self.created += 1
+            else:
+                # Coalesce: only the latest parameters are computed
+                job.params = params
+                job.updates += 1
+                job.due = min(now + self.debounce, job.deadline)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="recompute", daemon=True)
+                self._worker.start()
+            self._lock.notify()
+            return job
+
+    def get(self, job_id: str) -> Optional[RecomputeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_params(self, scenario_id: int) -> Optional[ForecastParams]:
+        with self._lock:
+            job = self._queued.get(scenario_id) or self._running.get(scenario_id)
+            return job.params if job is not None else None
+
+    def add_listener(self, job_id: str, callback: Callable[[RecomputeJob], None]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if not job.finished:
+                job._listeners.append(callback)
+                return
+        callback(job)
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                job = self._next_due()
+                while job is None:
+                    self._lock.wait(self._until_next_due())
+                    job = self._next_due()
+                del self._queued[job.scenario_id]
+                self._running[job.scenario_id] = job
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                self.started += 1
+            try:
+                future = compute_executor.submit(self.run, job.scenario_id, job.params)
+            except ComputeBusy:
+                self._requeue(job)
+                continue
+            future.add_done_callback(lambda future, job=job: self._finish(job, future))
+
+    def _next_due(self) -> Optional[RecomputeJob]:
+        now = time.monotonic()
+        for scenario_id, job in self._queued.items():
+            if job.due <= now and scenario_id not in self._running:
+                return job
+        return None
+
+    def _until_next_due(self) -> Optional[float]:
+        waiting = [job.due for scenario_id, job in self._queued.items() if scenario_id not in self._running]
+        return max(min(waiting) - time.monotonic(), 0.001) if waiting else None
+
+    def _requeue(self, job: RecomputeJob) -> None:
+        """Put back a job the compute executor had no room for."""
+        with self._lock:
+            del self._running[job.scenario_id]
+            self.started -= 1
+            newer = self._queued.get(job.scenario_id)
+            if newer is None:
+                job.status = "queued"
+                job.started_at = None
+                job.due = time.monotonic() + self.debounce
+                self._queued[job.scenario_id] = job
+                return
+            # A newer update already carries the latest parameters
+            newer.updates += job.updates
+            listeners = self._end(job, "superseded")
+            job.superseded_by = newer.id
+            self.superseded += 1
+        self._notify(job, listeners)
+
+    def _finish(self, job: RecomputeJob, future) -> None:
+        with self._lock:
+            del self._running[job.scenario_id]
+            error = future.exception()
+            if error is None:
+                job.result = future.result()
+                listeners = self._end(job, "succeeded")
+                self.succeeded += 1
+            else:
+                job.error = getattr(error, "detail", None) or str(error) or type(error).__name__
+                listeners = self._end(job, "failed")
+                self.failed += 1
+            # The scenario's next job may be due already
+            self._lock.notify()
+        self._notify(job, listeners)
+
+    def _end(self, job: RecomputeJob, status: str) -> List[Callable[[RecomputeJob], None]]:
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        job.params = None
+        self._finished[job.id] = time.monotonic()
+        listeners, job._listeners = job._listeners, []
+        return listeners
+
+    @staticmethod
+    def _notify(job: RecomputeJob, listeners: List[Callable[[RecomputeJob], None]]) -> None:
+        for callback in listeners:
+            callback(job)
+
+    def _expire(self) -> None:
+        """Forget jobs that finished more than the TTL ago, whatever was submitted before them."""
+        cutoff = time.monotonic() - self.ttl
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if finished > cutoff:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "debounce": self.debounce,
+                "max_delay": self.max_delay,
+                "queued": len(self._queued),
+                "running": len(self._running),
+                "updates": self.submitted,
+                "coalesced": self.submitted - self.created,
+                "started": self.started,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "superseded": self.superseded,
+            }
+
+
+# Backends by RECOMPUTE_BACKEND name; register others here
+RECOMPUTE_BACKENDS: Dict[str, Callable[[], RecomputeBackend]] = {
+    "memory": lambda: InProcessBackend(recalculate_scenario_job),
+}
+if RECOMPUTE_BACKEND not in RECOMPUTE_BACKENDS:
+    raise ValueError(f"RECOMPUTE_BACKEND must be one of {', '.join(RECOMPUTE_BACKENDS)}")
+
+recompute_queue = RECOMPUTE_BACKENDS[RECOMPUTE_BACKEND]()
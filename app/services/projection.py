@@ -0,0 +1,1076 @@
+# app/services/projection.py
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+from collections import deque
+from collections.abc import Mapping
+from functools import lru_cache
+from itertools import islice
+from datetime import datetime
+import json
+import math
+import numbers
+from dateutil.relativedelta import relativedelta
+import numpy as np
+
+# Forecast horizon used when a parameter set does not specify one
+DEFAULT_FORECAST_MONTHS = 72
+MAX_FORECAST_MONTHS = 240
+
+# Counts and amounts are exact in float64 below this magnitude; beyond it the
+# kernel defers to the integer-exact scalar model
+EXACT_LIMIT = 2 ** 53
+
+# Order of the keys in a projected month, as returned by calculate_projections
+MONTH_KEYS = [
+    "year", "month", "month_number", "date",
+    "income", "expenses", "ebitda",
+    "client_count", "new_clients", "paying_clients", "developer_count", "affiliate_count",
+    "sales_staff", "jr_devs", "admin_staff", "cto_count", "ceo_count", "total_staff",
+    "cto_cost", "ceo_cost", "sales_cost", "jr_dev_cost", "admin_cost",
+    "infrastructure_cost", "marketing_cost", "affiliate_cost", "other_expenses",
+]
+
+# Series that are rounded to cents in the output
+ROUNDED_KEYS = [
+    "income", "expenses", "ebitda",
+    "cto_cost", "ceo_cost", "sales_cost", "jr_dev_cost", "admin_cost",
+    "infrastructure_cost", "marketing_cost", "affiliate_cost", "other_expenses",
+]
+
+# Series that are always floats, whatever the types of the parameters; the calendar,
+# developer, affiliate and staff counts are always ints
+FLOAT_KEYS = ["client_count", "new_clients", "paying_clients"] + ROUNDED_KEYS
+
+# Series checked against EXACT_LIMIT
+EXACT_KEYS = ["client_count", "new_clients", "paying_clients", "developer_count", "affiliate_count"] + ROUNDED_KEYS
+
+# Scalar model parameters, packed as one (scenarios, 1) column each
+SCALAR_PARAMETERS = [
+    "initial_clients", "initial_developers", "initial_affiliates",
+    "subscription_price", "affiliate_commission", "free_months", "conversion_rate",
+    "cto_start_month", "ceo_start_month", "sales_start_month", "sales_hiring_interval",
+    "max_sales_staff", "jr_dev_start_month", "admin_start_month",
+    "cto_salary", "ceo_salary", "sales_base_salary", "sales_commission", "jr_dev_salary", "admin_salary",
+    "marketing_percentage", "infrastructure_cost_per_user", "other_expenses_percentage",
+]
+
+# Scalar parameters stored as whole numbers
+INTEGER_PARAMETERS = [
+    "initial_clients", "initial_developers", "initial_affiliates", "free_months",
+    "cto_start_month", "ceo_start_month", "sales_start_month", "sales_hiring_interval",
+    "max_sales_staff", "jr_dev_start_month", "admin_start_month",
+]
+
+# Yearly rate lists, packed as one (scenarios, months) matrix each
+RATE_PARAMETERS = ["client_growth_rates", "developer_growth_rates", "affiliate_growth_rates"]
+
+# Model inputs with a fixed default, used when a parameter set leaves them out
+OPTIONAL_PARAMETERS = {
+    "sales_productivity": 20,  # clients each sales person brings per month, before the 6-monthly ramp
+}
+
+# Stored inputs of a parameter set, in the order the API returns them
+PARAMETER_KEYS = [
+    "start_date", "initial_clients", "initial_developers", "initial_affiliates",
+    "client_growth_rates", "developer_growth_rates", "affiliate_growth_rates",
+    "subscription_price", "affiliate_commission", "free_months", "conversion_rate",
+    "cto_start_month", "ceo_start_month", "sales_start_month", "sales_hiring_interval",
+    "max_sales_staff", "jr_dev_start_month", "admin_start_month",
+    "cto_salary", "ceo_salary", "sales_base_salary", "sales_commission", "jr_dev_salary", "admin_salary",
+    "marketing_percentage", "infrastructure_cost_per_user", "other_expenses_percentage",
+    "forecast_months",
+]
+
+
+def forecast_months(params: Dict[str, Any]) -> int:
+    """Number of months to project for a parameter set."""
+    return params.get("forecast_months") or DEFAULT_FORECAST_MONTHS
+
+
+@lru_cache(maxsize=4096)
+def _rate_years(months: int, last_year: int) -> Tuple[int, ...]:
+    """Rate-list index used by each month: the forecast year, capped at the last listed year."""
+    return tuple(min(i // 12, last_year) for i in range(months))
+
+
+# Helper function to check one whole-number input
+def _whole_number(key: str, value: Any) -> int:
+    if type(value) is int:
+        return value
+    if isinstance(value, bool) or not isinstance(value, numbers.Real) or not float(value).is_integer():
+        raise ValueError(f"{key} must be a whole number")
+    return int(value)
+
+
+# Helper function to check one numeric input
+def _real_number(key: str, value: Any):
+    if type(value) is float and math.isfinite(value) or type(value) is int:
+        return value
+    if isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value):
+        raise ValueError(f"{key} must be a finite number")
+    return value if isinstance(value, int) else float(value)
+
+
+# Helper function to check a list of rates
+def _rate_list(key: str, rates: Any) -> Tuple:
+    if isinstance(rates, str) or not isinstance(rates, (list, tuple)) or not rates:
+        raise ValueError(f"{key} must be a non-empty list of rates")
+    if set(map(type, rates)) <= {float, int} and all(map(math.isfinite, rates)):
+        return tuple(rates)
+    return tuple(_real_number(key, rate) for rate in rates)
+
+
+@lru_cache(maxsize=256)
+def _is_start_date(value: str) -> bool:
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+_INPUT_KEYS = frozenset(PARAMETER_KEYS) | frozenset(OPTIONAL_PARAMETERS)
+_SCALAR_CHECKS = [(key, _whole_number if key in INTEGER_PARAMETERS else _real_number) for key in SCALAR_PARAMETERS]
+_RATE_KEYS = [(key, key.replace("_rates", "_by_month")) for key in RATE_PARAMETERS]
+
+
+class ForecastParams(Mapping):
+    """A validated, immutable parameter set, read by the projection engine as attributes.
+
+    Build one per request with from_dict, from_row or from_update; bad input
+    raises ValueError naming the field. Growth rates are also expanded to one
+    value per forecast month (client_growth_by_month and so on), so the month
+    loop indexes a tuple instead of working out the year.
+
+    As a Mapping it reads like the parameter dicts it replaces: rate lists come
+    back as list copies, and optional inputs are listed only when they differ
+    from their default.
+    """
+    __slots__ = tuple(PARAMETER_KEYS) + tuple(OPTIONAL_PARAMETERS) + (
+        "client_growth_by_month", "developer_growth_by_month", "affiliate_growth_by_month",
+    )
+
+    def __init__(self, values: Dict[str, Any]):
+        if not _INPUT_KEYS.issuperset(values):
+            unknown = next(key for key in values if key not in _INPUT_KEYS)
+            raise ValueError(f"Unknown parameter '{unknown}'")
+        set_value = object.__setattr__
+
+        start_date = values.get("start_date")
+        if start_date is None:
+            raise ValueError("start_date is required")
+        if not isinstance(start_date, str) or not _is_start_date(start_date):
+            raise ValueError("start_date must be a date in YYYY-MM-DD format")
+        set_value(self, "start_date", start_date)
+
+        months = values.get("forecast_months")
+        if months is None:
+            months = DEFAULT_FORECAST_MONTHS
+        if isinstance(months, bool) or not isinstance(months, numbers.Integral) or not 1 <= months <= MAX_FORECAST_MONTHS:
+            raise ValueError(f"forecast_months must be an integer between 1 and {MAX_FORECAST_MONTHS}")
+        set_value(self, "forecast_months", int(months))
+
+        for key, check in _SCALAR_CHECKS:
+            value = values.get(key)
+            if value is None:
+                raise ValueError(f"{key} is required")
+            set_value(self, key, check(key, value))
+        for key, default in OPTIONAL_PARAMETERS.items():
+            set_value(self, key, _real_number(key, values.get(key, default)))
+        if self.sales_hiring_interval == 0:
+            raise ValueError("sales_hiring_interval must be non-zero")
+
+        # As in the original loop, the year index of all three lists is capped by client_growth_rates
+        years = None
+        for key, by_month in _RATE_KEYS:
+            if values.get(key) is None:
+                raise ValueError(f"{key} is required")
+            rates = _rate_list(key, values[key])
+            if years is None:
+                years = _rate_years(months, min(len(rates) - 1, (months - 1) // 12))
+            elif len(rates) <= years[-1]:
+                raise ValueError(f"{key} has fewer years than the forecast uses")
+            set_value(self, key, rates)
+            set_value(self, by_month, tuple(map(rates.__getitem__, years)))
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "ForecastParams":
+        """Validate a parameter dict; a ForecastParams is returned unchanged."""
+        if isinstance(params, cls):
+            return params
+        return cls(params)
+
+    @classmethod
+    def from_row(cls, row) -> "ForecastParams":
+        """From a Parameters row; growth rates stored as JSON text are decoded here, once."""
+        values = {key: getattr(row, key) for key in PARAMETER_KEYS}
+        for key in RATE_PARAMETERS:
+            if isinstance(values[key], str):
+                values[key] = json.loads(values[key])
+        return cls(values)
+
+    @classmethod
+    def from_update(cls, base: Dict[str, Any], update) -> "ForecastParams":
+        """base with the fields set in a ParameterUpdate (or a dict of changes) applied."""
+        changes = update if isinstance(update, Mapping) else update.model_dump(exclude_none=True)
+        return cls.from_dict(base).replace(**changes)
+
+    def replace(self, **changes) -> "ForecastParams":
+        return ForecastParams({**self.to_dict(), **changes})
+
+    def for_months(self, months: int) -> "ForecastParams":
+        """This parameter set with its per-month rates covering at least `months`."""
+        if months <= self.forecast_months:
+            return self
+        return self.replace(forecast_months=months)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _INPUT_KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        return list(value) if type(value) is tuple else value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from PARAMETER_KEYS
+        for key, default in OPTIONAL_PARAMETERS.items():
+            if getattr(self, key) != default:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ForecastParams is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("ForecastParams is immutable")
+
+    def __reduce__(self):
+        return (ForecastParams, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"ForecastParams({self.to_dict()!r})"
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals with the same result as Python's round(x, 2).
+
+    np.round scales by 100 before rounding, which can pick the other side of a
+    tie or lose precision on very large amounts; those few values are re-rounded
+    with the builtin.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    redo = (np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6) | (np.abs(scaled) >= 2 ** 52)
+    if redo.any():
+        rounded[redo] = [round(v, 2) for v in values[redo].tolist()]
+    return rounded
+
+
+def hired_counts(month_index: np.ndarray, start_month) -> np.ndarray:
+    """One hire from start_month onwards (CTO, CEO, junior dev, admin)."""
+    return (month_index >= start_month).astype(np.int32)
+
+
+def sales_staff_counts(month_index: np.ndarray, start_month, interval, max_staff) -> np.ndarray:
+    """Sales headcount: one hire every `interval` months from start_month, capped at max_staff."""
+    interval = np.abs(interval)
+    if np.any(interval == 0):
+        raise ZeroDivisionError("sales_hiring_interval must be non-zero")
+    first_hire = np.maximum(start_month, 0)
+    first_hire = first_hire + (start_month - first_hire) % interval
+    hires = np.where(month_index >= first_hire, (month_index - first_hire) // interval + 1, 0)
+    # At most one hire per month, so the count always fits
+    return np.minimum(hires, np.maximum(max_staff, 0)).astype(np.int32)
+
+
+def paying_client_counts(new_clients: np.ndarray, free_months, conversion_rate) -> np.ndarray:
+    """Paying clients per month from the monthly cohorts, along the last axis.
+
+    A cohort pays nothing during its free months, is converted once in the month
+    the free period ends, and counts in full after that. The sum runs in the same
+    order as the cohort list so the floats match the per-month rescan.
+    """
+    months = new_clients.shape[-1]
+    cohorts = np.where(new_clients > 0, new_clients, 0.0)
+    joined = np.cumsum(cohorts, axis=-1)
+
+    # Cohort converting in each month, and the cohorts already paying in full before it
+    converting = np.arange(months) - free_months
+    index = np.clip(converting, 0, months - 1)
+    converted = np.trunc(np.take_along_axis(cohorts, index, axis=-1) * conversion_rate)
+    before = np.where(index >= 1, np.take_along_axis(joined, np.maximum(index - 1, 0), axis=-1), 0.0)
+    paying = np.where(converting >= 0, before + converted, 0.0)
+
+    # A negative free period never hits the conversion month, so every cohort pays in full
+    return np.where(free_months < 0, joined, paying)
+
+
+class Calendar:
+    """Year, month and ISO date of every projected month for one start date and horizon.
+
+    Built once per (start_date, months) by get_calendar and shared, so projections
+    never touch relativedelta or strftime per month.
+    """
+    __slots__ = ("years", "months", "dates", "year_list", "month_list", "date_list")
+
+    def __init__(self, start_date: str, months: int):
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        dates = [start + relativedelta(months=i) for i in range(months)]
+        self.year_list = [d.year for d in dates]
+        self.month_list = [d.month for d in dates]
+        self.date_list = [d.strftime("%Y-%m-%d") for d in dates]
+        self.years = np.array(self.year_list, dtype=np.int64)
+        self.months = np.array(self.month_list, dtype=np.int64)
+        self.dates = np.array(self.date_list)
+        for values in (self.years, self.months, self.dates):
+            values.flags.writeable = False
+
+
+@lru_cache(maxsize=256)
+def get_calendar(start_date: str, months: int) -> Calendar:
+    """Shared calendar for a start date and horizon."""
+    return Calendar(start_date, months)
+
+
+class CohortAccumulator:
+    """Running paying-client count, updated in O(1) per month.
+
+    Only the cohorts still inside their free period are kept. The oldest one is
+    converted in the month its free period ends, then folded into the running
+    total of cohorts that pay in full.
+    """
+    __slots__ = ("free_months", "conversion_rate", "pending", "paying_in_full")
+
+    def __init__(self, free_months: int, conversion_rate: float):
+        self.free_months = free_months
+        self.conversion_rate = conversion_rate
+        self.pending = deque()
+        self.paying_in_full = 0
+
+    def add_month(self, new_clients) -> Any:
+        """Register this month's cohort and return the paying clients for the month."""
+        cohort = new_clients if new_clients > 0 else 0
+        if self.free_months < 0:
+            self.paying_in_full += cohort
+            return self.paying_in_full
+
+        self.pending.append(cohort)
+        if len(self.pending) <= self.free_months:
+            return 0
+        converting = self.pending.popleft()
+        paying = self.paying_in_full + int(converting * self.conversion_rate)
+        self.paying_in_full += converting
+        return paying
+
+
+class ProjectionState:
+    """Simulation state at the start of a month; a checkpoint is a copy of it."""
+    __slots__ = (
+        "month", "clients", "developers", "affiliates", "cohorts",
+        "sales_staff", "cto_count", "ceo_count", "jr_devs", "admin_staff",
+    )
+
+    def __init__(self, params: ForecastParams):
+        self.month = 0
+        self.clients = params.initial_clients
+        self.developers = params.initial_developers
+        self.affiliates = params.initial_affiliates
+
+        # Track clients by cohort for calculating paying clients
+        self.cohorts = CohortAccumulator(params.free_months, params.conversion_rate)
+
+        # Staff counts
+        self.sales_staff = 0
+        self.cto_count = 0
+        self.ceo_count = 0
+        self.jr_devs = 0
+        self.admin_staff = 0
+
+    def copy(self) -> "ProjectionState":
+        state = ProjectionState.__new__(ProjectionState)
+        for name in ProjectionState.__slots__:
+            setattr(state, name, getattr(self, name))
+        cohorts = CohortAccumulator(self.cohorts.free_months, self.cohorts.conversion_rate)
+        cohorts.pending = self.cohorts.pending.copy()
+        cohorts.paying_in_full = self.cohorts.paying_in_full
+        state.cohorts = cohorts
+        return state
+
+    def step(self, params: ForecastParams):
+        """Advance one month; returns (new_clients, sales_acquisition, paying_clients) for it.
+
+        params must cover this month (see ForecastParams.for_months).
+        """
+        i = self.month
+
+        # --- Staff Hiring Logic ---
+        # CTO hiring
+        if i >= params.cto_start_month and self.cto_count == 0:
+            self.cto_count = 1
+
+        # CEO hiring logic
+        if i >= params.ceo_start_month and self.ceo_count == 0:
+            self.ceo_count = 1
+
+        # Sales staff hiring
+        if i >= params.sales_start_month and i % params.sales_hiring_interval == params.sales_start_month % params.sales_hiring_interval and self.sales_staff < params.max_sales_staff:
+            self.sales_staff += 1
+
+        # Junior Developer hiring
+        if i >= params.jr_dev_start_month and self.jr_devs == 0:
+            self.jr_devs = 1
+
+        # Admin staff hiring
+        if i >= params.admin_start_month and self.admin_staff == 0:
+            self.admin_staff = 1
+
+        # --- Growth Calculations ---
+        clients = self.clients
+        developers = self.developers
+        affiliates = self.affiliates
+        client_growth_rate = params.client_growth_by_month[i]
+        developer_growth_rate = params.developer_growth_by_month[i]
+        affiliate_growth_rate = params.affiliate_growth_by_month[i]
+
+        # Base acquisition from marketing + product-led growth
+        base_acquisition = max(5, int(clients * client_growth_rate * 0.2)) if i == 0 else max(10, int(clients * client_growth_rate * 0.2))
+
+        # Sales-driven acquisition
+        sales_acquisition = 0
+        if self.sales_staff > 0:
+            sales_acquisition = params.sales_productivity * self.sales_staff * (1 + (i // 6) * 0.1)  # Each sales person brings 20 clients/month by default, improving 10% every 6 months
+
+        # Affiliate-driven acquisition
+        affiliate_acquisition = 0
+        if affiliates > 0:
+            affiliate_acquisition = int(affiliates * 0.5)  # Each affiliate brings 0.5 clients on average per month
+
+        new_clients = base_acquisition + sales_acquisition + affiliate_acquisition
+        new_devs = max(1, int(developers * developer_growth_rate)) if developers > 0 else 2
+        new_affs = max(2, int(affiliates * affiliate_growth_rate)) if affiliates > 0 else 3
+
+        # Update totals
+        self.clients = clients + new_clients
+        self.developers = developers + new_devs
+        self.affiliates = affiliates + new_affs
+        self.month = i + 1
+
+        # Calculate paying clients
+        paying_clients = self.cohorts.add_month(new_clients)
+        return new_clients, sales_acquisition, paying_clients
+
+
+# Helper function to give a value of the Python model the type of a FLOAT_KEYS column
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except OverflowError:
+        # An exact int past the float range, where the kernel's float64 would also be infinite
+        return math.copysign(math.inf, value)
+
+
+def iter_projections(
+    params: Dict[str, Any],
+    months: Optional[int] = None,
+    state: Optional[ProjectionState] = None,
+    checkpoints: Optional[List[ProjectionState]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield projected months one at a time, stepping the model on plain Python numbers.
+
+    Matches calculate_projections month for month while holding only the current
+    state. The model is stepped exactly, so counts that grow past the float range
+    of the kernel stay right; FLOAT_KEYS values are converted to float on output.
+    Passing a checkpointed state resumes from its month; passing a checkpoints
+    list appends the state before each month and after the last one.
+    """
+    params = ForecastParams.from_dict(params)
+    if months is None:
+        months = params.forecast_months
+    params = params.for_months(months)
+    calendar = get_calendar(params.start_date, months)
+    if state is None:
+        state = ProjectionState(params)
+    else:
+        # Resuming: the conversion rate may have changed since the checkpoint was taken
+        state = state.copy()
+        state.cohorts.conversion_rate = params.conversion_rate
+
+    for i in range(state.month, months):
+        if checkpoints is not None:
+            checkpoints.append(state.copy())
+        new_clients, sales_acquisition, paying_clients = state.step(params)
+
+        clients = state.clients
+        developers = state.developers
+        affiliates = state.affiliates
+        sales_staff_count = state.sales_staff
+        cto_count = state.cto_count
+        ceo_count = state.ceo_count
+        jr_dev_count = state.jr_devs
+        admin_count = state.admin_staff
+
+        # --- Revenue Calculations ---
+        client_revenue = paying_clients * params.subscription_price
+        developer_revenue = developers * params.subscription_price
+
+        # Calculate affiliate commission
+        affiliate_commission = affiliates * params.affiliate_commission
+
+        # Total revenue
+        revenue = client_revenue + developer_revenue
+
+        # --- Expense Calculations ---
+        # Staff salaries
+        cto_cost = cto_count * params.cto_salary
+        ceo_cost = ceo_count * params.ceo_salary
+        jr_dev_cost = jr_dev_count * params.jr_dev_salary
+        admin_cost = admin_count * params.admin_salary
+
+        # Sales staff cost - base + commission
+        sales_base_cost = sales_staff_count * params.sales_base_salary
+        sales_commission_cost = sales_acquisition * params.subscription_price * params.sales_commission
+        sales_total_cost = sales_base_cost + sales_commission_cost
+
+        # Infrastructure costs
+        infrastructure_cost = (clients + developers) * params.infrastructure_cost_per_user
+
+        # Marketing costs
+        marketing_cost = revenue * params.marketing_percentage
+
+        # Affiliate program costs
+        affiliate_program_cost = affiliate_commission
+
+        # Other expenses
+        other_expenses = revenue * params.other_expenses_percentage
+
+        # Total expenses
+        total_expenses = (
+            cto_cost +
+            ceo_cost +
+            jr_dev_cost +
+            admin_cost +
+            sales_total_cost +
+            infrastructure_cost +
+            marketing_cost +
+            affiliate_program_cost +
+            other_expenses
+        )
+
+        # Net income (EBITDA)
+        ebitda = revenue - total_expenses
+
+        # Yield monthly data
+        yield {
+            "year": calendar.year_list[i],
+            "month": calendar.month_list[i],
+            "month_number": i,
+            "date": calendar.date_list[i],
+            "income": _as_float(round(revenue, 2)),
+            "expenses": _as_float(round(total_expenses, 2)),
+            "ebitda": _as_float(round(ebitda, 2)),
+            "client_count": _as_float(clients),
+            "new_clients": _as_float(new_clients),
+            "paying_clients": _as_float(paying_clients),
+            "developer_count": developers,
+            "affiliate_count": affiliates,
+            "sales_staff": sales_staff_count,
+            "jr_devs": jr_dev_count,
+            "admin_staff": admin_count,
+            "cto_count": cto_count,
+            "ceo_count": ceo_count,
+            "total_staff": sales_staff_count + jr_dev_count + admin_count + cto_count + ceo_count,
+            # Detailed costs
+            "cto_cost": _as_float(round(cto_cost, 2)),
+            "ceo_cost": _as_float(round(ceo_cost, 2)),
+            "sales_cost": _as_float(round(sales_total_cost, 2)),
+            "jr_dev_cost": _as_float(round(jr_dev_cost, 2)),
+            "admin_cost": _as_float(round(admin_cost, 2)),
+            "infrastructure_cost": _as_float(round(infrastructure_cost, 2)),
+            "marketing_cost": _as_float(round(marketing_cost, 2)),
+            "affiliate_cost": _as_float(round(affiliate_program_cost, 2)),
+            "other_expenses": _as_float(round(other_expenses, 2)),
+        }
+
+    if checkpoints is not None:
+        checkpoints.append(state.copy())
+
+
+def record_checkpoints(params: Dict[str, Any], months: Optional[int] = None) -> List[ProjectionState]:
+    """Simulation state before every month and after the last, without building rows."""
+    params = ForecastParams.from_dict(params)
+    if months is None:
+        months = params.forecast_months
+    params = params.for_months(months)
+    state = ProjectionState(params)
+    checkpoints = [state.copy()]
+    for _ in range(months):
+        state.step(params)
+        checkpoints.append(state.copy())
+    return checkpoints
+
+
+def first_affected_month(old: Dict[str, Any], new: Dict[str, Any], months: int) -> int:
+    """Earliest month whose projected row can differ between two parameter sets.
+
+    Returns `months` when no projected month changes. Parameters without a
+    narrower rule (prices, percentages, initial values, start date, unknown
+    keys) affect month 0.
+    """
+    first = months
+    for key in set(old) | set(new):
+        if old.get(key) != new.get(key):
+            first = min(first, _first_month_for(key, old, new, months))
+    return max(first, 0)
+
+
+def _first_month_for(key: str, old: Dict[str, Any], new: Dict[str, Any], months: int) -> int:
+    if key == "forecast_months":
+        # Existing months are unaffected; only rows past the shorter horizon change
+        return min(forecast_months(old), forecast_months(new))
+    if key in ("cto_start_month", "ceo_start_month", "jr_dev_start_month", "admin_start_month"):
+        return min(old[key], new[key])
+    if key in ("cto_salary", "ceo_salary", "jr_dev_salary", "admin_salary"):
+        start_key = key.replace("_salary", "_start_month")
+        return min(old[start_key], new[start_key])
+    if key in ("sales_start_month", "sales_hiring_interval", "max_sales_staff", "sales_base_salary", "sales_commission", "sales_productivity"):
+        return _first_sales_month(key, old, new, months)
+    if key in RATE_PARAMETERS:
+        return _first_rate_month(old, new, months)
+    if key == "conversion_rate":
+        # Only applied in the month the first cohort's free period ends
+        free_months = new["free_months"]
+        return free_months if free_months >= 0 else months
+    return 0
+
+
+def _first_sales_month(key: str, old: Dict[str, Any], new: Dict[str, Any], months: int) -> int:
+    month_index = np.arange(months)
+    counts = [
+        sales_staff_counts(month_index, p["sales_start_month"], p["sales_hiring_interval"], p["max_sales_staff"])
+        for p in (old, new)
+    ]
+    if key in ("sales_base_salary", "sales_commission", "sales_productivity"):
+        staffed = np.flatnonzero((counts[0] > 0) | (counts[1] > 0))
+        return int(staffed[0]) if len(staffed) else months
+    changed = np.flatnonzero(counts[0] != counts[1])
+    return int(changed[0]) if len(changed) else months
+
+
+def _first_rate_month(old: Dict[str, Any], new: Dict[str, Any], months: int) -> int:
+    try:
+        rates = [pack_parameters([p], months) for p in (old, new)]
+    except ValueError:
+        return 0
+    changed = np.zeros(months, dtype=bool)
+    for key in RATE_PARAMETERS:
+        changed |= rates[0][key][0] != rates[1][key][0]
+    return int(np.argmax(changed)) if changed.any() else months
+
+
+def pack_parameters(params_list: List[Dict[str, Any]], months: int) -> Dict[str, np.ndarray]:
+    """Stack parameter sets into (scenarios, 1) columns and (scenarios, months) rate matrices.
+
+    Dicts are validated into ForecastParams first; a rate list too short for
+    `months` raises ValueError.
+    """
+    params_list = [ForecastParams.from_dict(p).for_months(months) for p in params_list]
+    packed = {key: np.array([getattr(p, key) for p in params_list])[:, None] for key in SCALAR_PARAMETERS}
+    for key in OPTIONAL_PARAMETERS:
+        packed[key] = np.array([getattr(p, key) for p in params_list])[:, None]
+
+    # Gathered from the short yearly lists in one pass rather than stacking each per-month tuple
+    last_rate_year = np.array([len(p.client_growth_rates) - 1 for p in params_list])
+    year_index = np.minimum(np.arange(months) // 12, last_rate_year[:, None])
+    for key in RATE_PARAMETERS:
+        rates = [getattr(p, key) for p in params_list]
+        padded = np.zeros((len(rates), max(len(r) for r in rates)))
+        for s, r in enumerate(rates):
+            padded[s, :len(r)] = r
+        packed[key] = np.take_along_axis(padded, year_index, axis=1)
+    return packed
+
+
+def _step_counts_scalar(params: ForecastParams, sales_acquisition: np.ndarray, months: int):
+    """Client, developer and affiliate totals for one scenario, stepped on plain Python numbers."""
+    client_rates = params.client_growth_by_month
+    developer_rates = params.developer_growth_by_month
+    affiliate_rates = params.affiliate_growth_by_month
+
+    clients = params.initial_clients
+    developers = params.initial_developers
+    affiliates = params.initial_affiliates
+    sales_acquisition_list = sales_acquisition[0].tolist()
+
+    new_clients = []
+    client_count = []
+    developer_count = []
+    affiliate_count = []
+    for i in range(months):
+        base_acquisition = max(5 if i == 0 else 10, int(clients * client_rates[i] * 0.2))
+        affiliate_acquisition = int(affiliates * 0.5) if affiliates > 0 else 0
+        new = base_acquisition + sales_acquisition_list[i] + affiliate_acquisition
+
+        clients += new
+        developers += max(1, int(developers * developer_rates[i])) if developers > 0 else 2
+        affiliates += max(2, int(affiliates * affiliate_rates[i])) if affiliates > 0 else 3
+
+        new_clients.append(new)
+        client_count.append(clients)
+        developer_count.append(developers)
+        affiliate_count.append(affiliates)
+
+    return (
+        np.array([new_clients], dtype=np.float64),
+        np.array([client_count], dtype=np.float64),
+        np.array([developer_count], dtype=np.float64),
+        np.array([affiliate_count], dtype=np.float64),
+    )
+
+
+def _step_counts_batch(packed: Dict[str, np.ndarray], sales_acquisition: np.ndarray, months: int):
+    """Client, developer and affiliate totals for every scenario, one month at a time across scenarios."""
+    scenarios = sales_acquisition.shape[0]
+    clients = packed["initial_clients"][:, 0].astype(np.float64)
+    developers = packed["initial_developers"][:, 0].astype(np.float64)
+    affiliates = packed["initial_affiliates"][:, 0].astype(np.float64)
+
+    # Month-major copies so each step reads and writes contiguous rows
+    client_rates = np.ascontiguousarray(packed["client_growth_rates"].T)
+    developer_rates = np.ascontiguousarray(packed["developer_growth_rates"].T)
+    affiliate_rates = np.ascontiguousarray(packed["affiliate_growth_rates"].T)
+    sales = np.ascontiguousarray(sales_acquisition.T)
+
+    new_clients = np.empty((months, scenarios))
+    client_count = np.empty((months, scenarios))
+    developer_count = np.empty((months, scenarios))
+    affiliate_count = np.empty((months, scenarios))
+    for i in range(months):
+        base_acquisition = np.maximum(5 if i == 0 else 10, np.trunc(clients * client_rates[i] * 0.2))
+        affiliate_acquisition = np.where(affiliates > 0, np.trunc(affiliates * 0.5), 0.0)
+        new = base_acquisition + sales[i] + affiliate_acquisition
+
+        new_devs = np.where(developers > 0, np.maximum(1, np.trunc(developers * developer_rates[i])), 2)
+        new_affs = np.where(affiliates > 0, np.maximum(2, np.trunc(affiliates * affiliate_rates[i])), 3)
+        clients = clients + new
+        developers = developers + new_devs
+        affiliates = affiliates + new_affs
+
+        new_clients[i] = new
+        client_count[i] = clients
+        developer_count[i] = developers
+        affiliate_count[i] = affiliates
+
+    return new_clients.T, client_count.T, developer_count.T, affiliate_count.T
+
+
+def _project(params_list: List[Dict[str, Any]], months: int) -> Dict[str, np.ndarray]:
+    """Shared kernel: every series as a (scenarios, months) array."""
+    params_list = [ForecastParams.from_dict(p).for_months(months) for p in params_list]
+    packed = pack_parameters(params_list, months)
+    start_dates = [p.start_date for p in params_list]
+    return _project_packed(packed, start_dates, months, params_list)
+
+
+def _project_packed(
+    packed: Dict[str, np.ndarray],
+    start_dates: List[str],
+    months: int,
+    params_list: Optional[List[ForecastParams]] = None,
+) -> Dict[str, np.ndarray]:
+    month_index = np.arange(months)
+    scenarios = len(start_dates)
+
+    # --- Staff ---
+    cto_count = hired_counts(month_index, packed["cto_start_month"])
+    ceo_count = hired_counts(month_index, packed["ceo_start_month"])
+    jr_devs = hired_counts(month_index, packed["jr_dev_start_month"])
+    admin_staff = hired_counts(month_index, packed["admin_start_month"])
+    sales_staff = sales_staff_counts(
+        month_index,
+        packed["sales_start_month"],
+        packed["sales_hiring_interval"],
+        packed["max_sales_staff"],
+    )
+    total_staff = sales_staff + jr_devs + admin_staff + cto_count + ceo_count
+
+    # Each sales person brings sales_productivity clients/month, improving 10% every 6 months
+    sales_acquisition = packed["sales_productivity"] * sales_staff * (1 + (month_index // 6) * 0.1)
+
+    # --- Growth ---
+    if params_list is not None and len(params_list) == 1:
+        counts = _step_counts_scalar(params_list[0], sales_acquisition, months)
+    else:
+        counts = _step_counts_batch(packed, sales_acquisition, months)
+    new_clients, client_count, developer_count, affiliate_count = counts
+    paying_clients = paying_client_counts(new_clients, packed["free_months"], packed["conversion_rate"])
+
+    # --- Revenue ---
+    price = packed["subscription_price"]
+    income = paying_clients * price + developer_count * price
+
+    # --- Expenses ---
+    cto_cost = cto_count * packed["cto_salary"]
+    ceo_cost = ceo_count * packed["ceo_salary"]
+    jr_dev_cost = jr_devs * packed["jr_dev_salary"]
+    admin_cost = admin_staff * packed["admin_salary"]
+    sales_cost = sales_staff * packed["sales_base_salary"] + sales_acquisition * price * packed["sales_commission"]
+    infrastructure_cost = (client_count + developer_count) * packed["infrastructure_cost_per_user"]
+    marketing_cost = income * packed["marketing_percentage"]
+    affiliate_cost = affiliate_count * packed["affiliate_commission"]
+    other_expenses = income * packed["other_expenses_percentage"]
+
+    expenses = (
+        cto_cost +
+        ceo_cost +
+        jr_dev_cost +
+        admin_cost +
+        sales_cost +
+        infrastructure_cost +
+        marketing_cost +
+        affiliate_cost +
+        other_expenses
+    )
+    ebitda = income - expenses
+
+    # --- Calendar, shared per distinct start date ---
+    distinct = list(dict.fromkeys(start_dates))
+    calendars = [get_calendar(start, months) for start in distinct]
+    if len(distinct) == 1:
+        # Read-only views of the cached calendar, not one copy per scenario
+        calendar_columns = [
+            np.broadcast_to(values, (scenarios, months))
+            for values in (calendars[0].years, calendars[0].months, calendars[0].dates)
+        ]
+    else:
+        position = {start: index for index, start in enumerate(distinct)}
+        rows = np.array([position[start] for start in start_dates])
+        calendar_columns = [
+            np.stack([c.years for c in calendars])[rows],
+            np.stack([c.months for c in calendars])[rows],
+            np.stack([c.dates for c in calendars])[rows],
+        ]
+
+    series = {
+        "year": calendar_columns[0],
+        "month": calendar_columns[1],
+        "month_number": np.broadcast_to(month_index, (scenarios, months)),
+        "date": calendar_columns[2],
+        "income": income,
+        "expenses": expenses,
+        "ebitda": ebitda,
+        "client_count": client_count,
+        "new_clients": new_clients,
+        "paying_clients": paying_clients,
+        "developer_count": developer_count,
+        "affiliate_count": affiliate_count,
+        "sales_staff": sales_staff,
+        "jr_devs": jr_devs,
+        "admin_staff": admin_staff,
+        "cto_count": cto_count,
+        "ceo_count": ceo_count,
+        "total_staff": total_staff,
+        "cto_cost": cto_cost,
+        "ceo_cost": ceo_cost,
+        "sales_cost": sales_cost,
+        "jr_dev_cost": jr_dev_cost,
+        "admin_cost": admin_cost,
+        "infrastructure_cost": infrastructure_cost,
+        "marketing_cost": marketing_cost,
+        "affiliate_cost": affiliate_cost,
+        "other_expenses": other_expenses,
+    }
+    # Checked and rounded as one stacked array rather than key by key
+    stacked = np.stack([np.broadcast_to(series[key], income.shape) for key in EXACT_KEYS]).astype(np.float64)
+    inexact = (np.abs(stacked) >= EXACT_LIMIT).any(axis=(0, 2))
+
+    rounded = round_cents(stacked[-len(ROUNDED_KEYS):])
+    for index, key in enumerate(ROUNDED_KEYS):
+        series[key] = rounded[index]
+    if params_list is None and inexact.any():
+        # No parameter dicts to replay, so oversized scenarios keep their float values
+        return series
+    series["developer_count"] = np.where(inexact[:, None], 0, developer_count).astype(np.int64)
+    series["affiliate_count"] = np.where(inexact[:, None], 0, affiliate_count).astype(np.int64)
+
+    if inexact.any():
+        _replace_inexact_rows(series, params_list, months, np.flatnonzero(inexact))
+    return series
+
+
+def _replace_inexact_rows(series: Dict[str, np.ndarray], params_list: List[ForecastParams], months: int, rows) -> None:
+    """Recompute scenarios that outgrew float64 with iter_projections.
+
+    Developer and affiliate counts are stored as exact Python ints; the FLOAT_KEYS
+    series take the floats iter_projections rounds its exact values to.
+    """
+    for key in EXACT_KEYS:
+        series[key] = series[key].astype(np.float64 if key in FLOAT_KEYS else object)
+    for row in rows:
+        records = list(iter_projections(params_list[row], months))
+        for key in EXACT_KEYS:
+            series[key][row] = [month[key] for month in records]
+
+
+class MonthView(Mapping):
+    """Read-only view of one projected month, converting values to Python numbers on access."""
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result: "ProjectionResult", index: int):
+        self._result = result
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._result.column(key)[self._index]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.keys())
+
+    def __len__(self) -> int:
+        return len(self._result.keys())
+
+    def __repr__(self) -> str:
+        return f"MonthView({dict(self)!r})"
+
+
+class ProjectionResult:
+    """Projected months of one scenario, stored as one array per metric.
+
+    result["income"] returns a column; result[i] and iteration give MonthView
+    rows built on demand; result[:n] cuts the horizon without copying. A result
+    split from a batch keeps a reference to its row of the batch arrays instead
+    of one view per metric. to_records() produces the list of dicts the API and
+    DB writers use.
+    """
+    __slots__ = ("_columns", "_row", "_months")
+
+    def __init__(self, columns: Dict[str, np.ndarray], row: Optional[int] = None, months: Optional[int] = None):
+        self._columns = columns
+        self._row = row
+        self._months = columns["month_number"].shape[-1] if months is None else months
+
+    def column(self, key: str) -> np.ndarray:
+        values = self._columns[key]
+        if self._row is not None:
+            values = values[self._row]
+        return values if len(values) == self._months else values[:self._months]
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {key: self.column(key) for key in self._columns}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.columns.values())
+
+    def __len__(self) -> int:
+        return self._months
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return ProjectionResult({name: values[key] for name, values in self.columns.items()})
+        if key < 0:
+            key += self._months
+        if not 0 <= key < self._months:
+            raise IndexError("month out of range")
+        return MonthView(self, key)
+
+    def __iter__(self) -> Iterator[MonthView]:
+        for index in range(self._months):
+            yield MonthView(self, index)
+
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return series_to_records(self)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        return iter_records(self)
+
+
+def project_series(params: Dict[str, Any], months: Optional[int] = None) -> ProjectionResult:
+    """Compute every projected series as a column, keyed like calculate_projections.
+
+    Client, developer and affiliate totals feed back into their own growth through
+    integer truncation, so they are stepped month by month on plain floats. Every
+    other series is derived from them with whole-array operations.
+    """
+    params = ForecastParams.from_dict(params)
+    if months is None:
+        months = params.forecast_months
+    return ProjectionResult({key: values[0] for key, values in _project([params], months).items()})
+
+
+def project_batch(params_list: List[Dict[str, Any]], months: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Compute the series of many scenarios at once, each as a (scenarios, months) array.
+
+    Without an explicit horizon every scenario runs to the longest forecast_months
+    in the batch; months never depend on the horizon, so shorter scenarios are
+    simply cut when converted to records.
+
+    The growth recurrence steps all scenarios together, so the Python-level cost is
+    per month rather than per scenario.
+    """
+    if months is None:
+        months = max((forecast_months(p) for p in params_list), default=DEFAULT_FORECAST_MONTHS)
+    if not params_list:
+        return {key: np.empty((0, months)) for key in MONTH_KEYS}
+    return _project(params_list, months)
+
+
+def project_packed(packed: Dict[str, np.ndarray], start_dates: List[str], months: int) -> Dict[str, np.ndarray]:
+    """Run the kernel on columns laid out like pack_parameters, without parameter dicts.
+
+    For callers that generate many parameter variants as arrays (simulation,
+    sweeps). Scenarios that outgrow float64 cannot be replayed exactly here, so
+    their series stay floats instead of falling back to the integer model.
+    """
+    if not start_dates:
+        return {key: np.empty((0, months)) for key in MONTH_KEYS}
+    return _project_packed(packed, start_dates, months)
+
+
+def split_batch(series: Dict[str, np.ndarray], horizons: Optional[List[int]] = None) -> List[ProjectionResult]:
+    """One ProjectionResult per scenario of a batch, as views into the batch arrays.
+
+    horizons optionally cuts each scenario to its own number of months.
+    """
+    scenarios = len(series["month_number"])
+    return [
+        ProjectionResult(series, row, None if horizons is None else horizons[row])
+        for row in range(scenarios)
+    ]
+
+
+def series_to_records(series: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convert projected columns into the list-of-dicts layout used by the API and the DB writers."""
+    columns = [series[key].tolist() for key in MONTH_KEYS]
+    return [dict(zip(MONTH_KEYS, row)) for row in zip(*columns)]
+
+
+def iter_records(series: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """Yield projected columns one month dict at a time."""
+    columns = [series[key].tolist() for key in MONTH_KEYS]
+    for row in zip(*columns):
+        yield dict(zip(MONTH_KEYS, row))
+
+
+def batch_to_records(series: Dict[str, np.ndarray], horizons: Optional[List[int]] = None) -> List[List[Dict[str, Any]]]:
+    """Split batched columns into one calculate_projections-style list per scenario.
+
+    horizons optionally cuts each scenario to its own number of months.
+    """
+    columns = [series[key].tolist() for key in MONTH_KEYS]
+    results = []
+    for index, scenario_columns in enumerate(zip(*columns)):
+        rows = zip(*scenario_columns)
+        if horizons is not None:
+            rows = islice(rows, horizons[index])
+        results.append([dict(zip(MONTH_KEYS, row)) for row in rows])
+    return results
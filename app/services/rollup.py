@@ -0,0 +1,166 @@
+# app/services/rollup.py
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Any, List, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from app.services.projection import round_cents
+
+# Reporting periods months can be rolled up to
+PERIODS = ["quarter", "year", "fiscal_year"]
+
+# Summed over a period
+FLOW_KEYS = ["income", "expenses", "ebitda"]
+
+# Taken from the last month of a period
+STOCK_KEYS = [
+    "client_count", "paying_clients", "developer_count", "affiliate_count",
+    "sales_staff", "jr_devs", "admin_staff", "cto_count", "ceo_count", "total_staff"
+]
+
+
+# Helper function to label every month with the period it belongs to
+def period_ids(years: np.ndarray, months: np.ndarray, period: str, fiscal_year_start: int = 1) -> np.ndarray:
+    """Quarters as year * 4 + index; fiscal years by the calendar year they end in."""
+    if period == "quarter":
+        return years * 4 + (months - 1) // 3
+    if period == "year":
+        return years
+    if period == "fiscal_year":
+        if not 1 <= fiscal_year_start <= 12:
+            raise ValueError("fiscal_year_start must be a month between 1 and 12")
+        if fiscal_year_start == 1:
+            return years
+        return years + (months >= fiscal_year_start)
+    raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+
+
+# Helper function to find where each period starts and how many months it has
+def period_segments(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    lengths = np.diff(np.append(starts, len(ids)))
+    return starts, lengths
+
+
+def segment_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Per-segment totals along the last axis, added in month order.
+
+    np.add.reduceat sums pairwise, which can differ in the last bit from the
+    month-by-month totals stored so far; stepping through the segments one
+    offset at a time keeps the order and is still vectorized across segments
+    and scenarios.
+    """
+    width = int(lengths.max(initial=0))
+    offsets = np.arange(width)
+    index = np.minimum(starts[:, None] + offsets, values.shape[-1] - 1)
+    padded = np.where(offsets < lengths[:, None], values[..., index], 0)
+    dtype = object if values.dtype == object else np.float64
+    totals = np.zeros(values.shape[:-1] + (len(starts),), dtype=dtype)
+    for offset in range(width):
+        totals = totals + padded[..., offset]
+    return totals
+
+
+def segment_last(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Value in the last month of each segment along the last axis."""
+    return values[..., starts + lengths - 1]
+
+
+# Helper function to stack month rows into columns
+def records_to_columns(monthly_data: Iterable[Dict[str, Any]], keys: List[str]) -> Dict[str, np.ndarray]:
+    """Object arrays, so rolled-up rows keep their Python ints, floats and big values as given."""
+    rows = list(monthly_data)
+    columns = {}
+    for key in keys:
+        column = np.empty(len(rows), dtype=object)
+        column[:] = [month.get(key, 0) for month in rows]
+        columns[key] = column
+    return columns
+
+
+def rollup(
+    columns: Dict[str, np.ndarray],
+    period: str,
+    fiscal_year_start: int = 1,
+    flow_keys: List[str] = FLOW_KEYS,
+    stock_keys: List[str] = STOCK_KEYS,
+) -> Dict[str, np.ndarray]:
+    """Roll monthly columns up to periods.
+
+    Columns may be (months,) or (scenarios, months) when every scenario shares
+    the calendar; year and month are read from the first row. Flows are summed
+    and rounded to cents, stocks are taken from the last month of each period.
+    The result holds "period_id" plus one array per key.
+    """
+    years = np.asarray(columns["year"]).reshape(-1, np.shape(columns["year"])[-1])[0].astype(np.int64)
+    months = np.asarray(columns["month"]).reshape(-1, np.shape(columns["month"])[-1])[0].astype(np.int64)
+    ids = period_ids(years, months, period, fiscal_year_start)
+    starts, lengths = period_segments(ids)
+
+    result = {"period_id": ids[starts]}
+    if flow_keys:
+        # All flows summed in one pass
+        totals = segment_sums(np.stack([np.asarray(columns[key]) for key in flow_keys]), starts, lengths)
+        if totals.dtype == object:
+            totals = np.array([round(v, 2) for v in totals.ravel().tolist()], dtype=object).reshape(totals.shape)
+        else:
+            totals = round_cents(totals)
+        for index, key in enumerate(flow_keys):
+            result[key] = totals[index]
+    for key in stock_keys:
+        result[key] = segment_last(np.asarray(columns[key]), starts, lengths)
+    return result
+
+
+# Helper function to describe a period id
+def period_label(period_id: int, period: str) -> Dict[str, Any]:
+    if period == "quarter":
+        year, quarter = divmod(period_id, 4)
+        return {"period": f"{year}-Q{quarter + 1}", "year": year, "quarter": quarter + 1}
+    if period == "fiscal_year":
+        return {"period": f"FY{period_id}", "fiscal_year": period_id}
+    return {"year": period_id}
+
+
+def rollup_records(
+    columns: Dict[str, np.ndarray],
+    period: str,
+    fiscal_year_start: int = 1,
+    flow_keys: List[str] = FLOW_KEYS,
+    stock_keys: List[str] = STOCK_KEYS,
+) -> List[Dict[str, Any]]:
+    """rollup for one scenario as a list of dicts, one per period."""
+    rolled = rollup(columns, period, fiscal_year_start, flow_keys, stock_keys)
+    keys = flow_keys + stock_keys
+    values = [rolled[key].tolist() for key in keys]
+    return [
+        {**period_label(period_id, period), **dict(zip(keys, row))}
+        for period_id, row in zip(rolled["period_id"].tolist(), zip(*values))
+    ]
+
+
+def rollup_years(
+    monthly_data: Iterable[Dict[str, Any]],
+    flow_keys: List[str] = FLOW_KEYS,
+    stock_keys: List[str] = STOCK_KEYS,
+) -> Iterator[Dict[str, Any]]:
+    """Calendar years of month rows given in month order, each yielded once its last month is read.
+
+    Gives the rows rollup_records gives for the same months as object columns
+    (flows added in month order and rounded with round(), stocks from the
+    last month) without holding more than the current month, so a generator
+    of months can be summarized as it streams by.
+    """
+    for year, months in groupby(monthly_data, key=itemgetter("year")):
+        totals = dict.fromkeys(flow_keys, 0)
+        for month in months:
+            for key in flow_keys:
+                totals[key] = totals[key] + month.get(key, 0)
+        yield {
+            **period_label(year, "year"),
+            **{key: round(totals[key], 2) for key in flow_keys},
+            **{key: month.get(key, 0) for key in stock_keys},
+        }
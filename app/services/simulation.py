@@ -0,0 +1,171 @@
+# app/services/simulation.py
+import math
+import secrets
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.services.projection import (
+    MAX_FORECAST_MONTHS,
+    RATE_PARAMETERS,
+    ForecastParams,
+    forecast_months,
+    get_calendar,
+    pack_parameters,
+    project_packed,
+    round_cents
+)
+from app.services.executor import compute_executor
+
+# Paths per simulation request
+DEFAULT_SIMULATION_PATHS = 1000
+MAX_SIMULATION_PATHS = 50000
+
+# Paths are drawn and projected in fixed-size chunks, each with its own child
+# seed, so results for a seed do not depend on how many workers run them
+SIMULATION_CHUNK_PATHS = 2000
+
+PERCENTILES = [10, 50, 90]
+SIMULATED_SERIES = ["income", "expenses", "ebitda"]
+
+# Inputs that can be given a distribution, and the range each sample is clipped to
+UNCERTAIN_PARAMETERS = {
+    "client_growth_rates": (-1.0, None),
+    "developer_growth_rates": (-1.0, None),
+    "affiliate_growth_rates": (-1.0, None),
+    "conversion_rate": (0.0, 1.0),
+    "sales_productivity": (0.0, None),
+}
+
+# Helper function to check a distribution spec
+def validate_distribution(name: str, spec: Dict[str, Any]) -> None:
+    """Raise ValueError for an unknown or inconsistent distribution.
+
+    Every distribution describes an offset from the scenario's own value:
+    normal takes std, uniform takes low/high, triangular takes low/mode/high.
+    """
+    kind = spec.get("distribution", "normal")
+    for field in ("std", "low", "mode", "high"):
+        if spec.get(field) is not None and not math.isfinite(spec[field]):
+            raise ValueError(f"{name}: {field} must be a finite number")
+    if kind == "normal":
+        if spec.get("std") is None or spec["std"] < 0:
+            raise ValueError(f"{name}: normal distribution needs a non-negative std")
+    elif kind == "uniform":
+        if spec.get("low") is None or spec.get("high") is None or spec["low"] > spec["high"]:
+            raise ValueError(f"{name}: uniform distribution needs low <= high")
+    elif kind == "triangular":
+        low, mode, high = spec.get("low"), spec.get("mode"), spec.get("high")
+        if low is None or mode is None or high is None or not low <= mode <= high or low == high:
+            raise ValueError(f"{name}: triangular distribution needs low <= mode <= high with low < high")
+    else:
+        raise ValueError(f"{name}: unknown distribution '{kind}'")
+
+
+# Helper function to draw offsets from a distribution spec
+def draw_offsets(rng: np.random.Generator, spec: Dict[str, Any], size) -> np.ndarray:
+    kind = spec.get("distribution", "normal")
+    if kind == "normal":
+        return rng.normal(0.0, spec["std"], size)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+
+
+# Helper function to expand per-year samples onto the months that use them
+def rate_year_index(params: Dict[str, Any], months: int) -> np.ndarray:
+    return np.minimum(np.arange(months) // 12, len(params["client_growth_rates"]) - 1)
+
+
+def _simulate_chunk(
+    base: Dict[str, np.ndarray],
+    year_index: np.ndarray,
+    start_date: str,
+    months: int,
+    distributions: Dict[str, Dict[str, Any]],
+    paths: int,
+    seed: np.random.SeedSequence,
+) -> Dict[str, np.ndarray]:
+    """Draw `paths` parameter variants and project them as one batch."""
+    rng = np.random.default_rng(seed)
+    packed = {key: np.repeat(values, paths, axis=0) for key, values in base.items()}
+
+    # Fixed order, so a seed always feeds the same draws to the same input
+    for name in UNCERTAIN_PARAMETERS:
+        spec = distributions.get(name)
+        if spec is None:
+            continue
+        low, high = UNCERTAIN_PARAMETERS[name]
+        if name in RATE_PARAMETERS:
+            # One draw per forecast year, shared by that year's months
+            offsets = draw_offsets(rng, spec, (paths, int(year_index[-1]) + 1))[:, year_index]
+        else:
+            offsets = draw_offsets(rng, spec, (paths, 1))
+        packed[name] = np.clip(packed[name] + offsets, low, high)
+
+    series = project_packed(packed, [start_date] * paths, months)
+    return {key: np.asarray(series[key], dtype=np.float64) for key in SIMULATED_SERIES}
+
+
+def run_simulation(
+    params: Dict[str, Any],
+    distributions: Dict[str, Dict[str, Any]],
+    paths: int = DEFAULT_SIMULATION_PATHS,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Monte Carlo run of a scenario: P10/P50/P90 of income, expenses and EBITDA per month.
+
+    Distributions are keyed by UNCERTAIN_PARAMETERS; growth rates are drawn once
+    per forecast year. Without a seed one is generated and returned, so any run
+    can be replayed exactly.
+    """
+    if not 1 <= paths <= MAX_SIMULATION_PATHS:
+        raise ValueError(f"paths must be between 1 and {MAX_SIMULATION_PATHS}")
+    for name, spec in distributions.items():
+        if name not in UNCERTAIN_PARAMETERS:
+            raise ValueError(f"{name} cannot be simulated")
+        validate_distribution(name, spec)
+
+    params = ForecastParams.from_dict(params)
+    months = forecast_months(params)
+    if not 1 <= months <= MAX_FORECAST_MONTHS:
+        raise ValueError(f"forecast_months must be between 1 and {MAX_FORECAST_MONTHS}")
+    base = pack_parameters([params], months)
+    year_index = rate_year_index(params, months)
+
+    if seed is None:
+        seed = secrets.randbits(32)
+    chunk_sizes = [SIMULATION_CHUNK_PATHS] * (paths // SIMULATION_CHUNK_PATHS)
+    if paths % SIMULATION_CHUNK_PATHS:
+        chunk_sizes.append(paths % SIMULATION_CHUNK_PATHS)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    jobs = [
+        (base, year_index, params.start_date, months, distributions, size, chunk_seed)
+        for size, chunk_seed in zip(chunk_sizes, chunk_seeds)
+    ]
+    if len(jobs) == 1 or compute_executor.workers <= 1:
+        chunks = [_simulate_chunk(*job) for job in jobs]
+    else:
+        chunks = list(compute_executor.pool().map(_simulate_chunk, *zip(*jobs)))
+
+    bands = {}
+    for key in SIMULATED_SERIES:
+        values = np.concatenate([chunk[key] for chunk in chunks])
+        bands[key] = round_cents(np.percentile(values, PERCENTILES, axis=0))
+
+    calendar = get_calendar(params.start_date, months)
+    results = []
+    for i in range(months):
+        month = {
+            "year": calendar.year_list[i],
+            "month": calendar.month_list[i],
+            "month_number": i,
+            "date": calendar.date_list[i],
+        }
+        for key in SIMULATED_SERIES:
+            for row, percentile in enumerate(PERCENTILES):
+                month[f"{key}_p{percentile}"] = float(bands[key][row, i])
+        results.append(month)
+
+    return {"paths": paths, "seed": seed, "months": results}
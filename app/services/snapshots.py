@@ -0,0 +1,160 @@
+# app/services/snapshots.py
+import json
+import os
+import struct
+import zlib
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sqlalchemy import Integer, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.database import MonthlyData, ProjectionSnapshot
+from app.services.cache import parameter_hash
+from app.services.projection import MONTH_KEYS, ProjectionResult, get_calendar
+
+# Where recalculated projections are stored:
+#   rows       - monthly_data and yearly_summaries rows (default)
+#   snapshot   - one compressed projection_snapshots blob per scenario
+#   both       - rows and a snapshot, while moving from one to the other
+#   parameters - nothing; reads compute the projection from the parameters
+# Otherwise reads use a scenario's snapshot when it has one and fall back to its rows.
+STORAGE_MODES = ["rows", "snapshot", "both", "parameters"]
+PROJECTION_STORAGE = os.getenv("PROJECTION_STORAGE", "rows")
+if PROJECTION_STORAGE not in STORAGE_MODES:
+    raise ValueError(f"PROJECTION_STORAGE must be one of {', '.join(STORAGE_MODES)}")
+
+SNAPSHOT_VERSION = 1
+
+# Calendar columns are rebuilt from the start date rather than stored
+CALENDAR_KEYS = ["year", "month", "month_number", "date"]
+SERIES_KEYS = [key for key in MONTH_KEYS if key not in CALENDAR_KEYS]
+
+# Series kept in integer columns of monthly_data; read back as integers when every value is whole
+INTEGER_KEYS = [column.name for column in MonthlyData.__table__.columns if isinstance(column.type, Integer)]
+
+
+# Helper function to store a whole-valued count column as integers, as monthly_data would
+def _as_stored(key: str, values: np.ndarray) -> np.ndarray:
+    if key not in INTEGER_KEYS:
+        return values
+    if values.dtype == object:
+        stored = np.empty(len(values), dtype=object)
+        stored[:] = [int(v) if isinstance(v, float) and v.is_integer() and abs(v) < 2 ** 63 else v for v in values]
+        return stored
+    if values.dtype.kind == "f" and np.all(np.abs(values) < 2 ** 63) and np.all(values == np.trunc(values)):
+        return values.astype(np.int64)
+    return values
+
+
+def encode_snapshot(projection: ProjectionResult, start_date: str) -> bytes:
+    """Serialize a projection as one zlib-compressed columnar blob.
+
+    Layout before compression: a 4-byte header length, a JSON header naming
+    each column's dtype, then the columns back to back. Numeric columns are
+    byte-shuffled (all first bytes, then all second bytes, ...), which lets
+    zlib find the repetition in slowly changing floats. Columns that fell
+    back to exact Python numbers go into the header as JSON.
+    """
+    months = len(projection)
+    header = {"version": SNAPSHOT_VERSION, "start_date": start_date, "months": months, "columns": [], "exact": {}}
+    buffers = []
+    for key in SERIES_KEYS:
+        values = _as_stored(key, projection.column(key))
+        if values.dtype == object:
+            header["exact"][key] = values.tolist()
+            continue
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        header["columns"].append([key, values.dtype.str])
+        buffers.append(values.view(np.uint8).reshape(months, values.itemsize).T.tobytes())
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    return zlib.compress(struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(buffers))
+
+
+def decode_snapshot(blob: bytes) -> ProjectionResult:
+    """Rebuild the ProjectionResult stored by encode_snapshot."""
+    raw = zlib.decompress(blob)
+    (header_length,) = struct.unpack_from("<I", raw)
+    header = json.loads(raw[4:4 + header_length])
+    if header["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header['version']}")
+    months = header["months"]
+    calendar = get_calendar(header["start_date"], months)
+
+    stored = {}
+    offset = 4 + header_length
+    for key, dtype in header["columns"]:
+        dtype = np.dtype(dtype)
+        size = months * dtype.itemsize
+        shuffled = np.frombuffer(raw, dtype=np.uint8, count=size, offset=offset)
+        stored[key] = shuffled.reshape(dtype.itemsize, months).T.copy().view(dtype).ravel()
+        offset += size
+    for key, values in header["exact"].items():
+        column = np.empty(months, dtype=object)
+        column[:] = values
+        stored[key] = column
+
+    columns = {
+        "year": calendar.years,
+        "month": calendar.months,
+        "month_number": np.arange(months),
+        "date": calendar.dates,
+    }
+    for key in SERIES_KEYS:
+        columns[key] = stored[key]
+    return ProjectionResult(columns)
+
+
+# Helper function to store a scenario's projection, replacing any older snapshot
+def save_snapshot(db: Session, scenario_id: int, params: Dict[str, Any], projection: ProjectionResult) -> int:
+    """Returns the number of rows written: 0 when the stored snapshot is already for these parameters."""
+    key = parameter_hash(params)
+    existing = db.query(ProjectionSnapshot).filter(ProjectionSnapshot.scenario_id == scenario_id).all()
+    if len(existing) == 1 and existing[0].parameter_hash == key:
+        return 0
+    for snapshot in existing:
+        db.delete(snapshot)
+    db.flush()
+    db.add(ProjectionSnapshot(
+        scenario_id=scenario_id,
+        parameter_hash=key,
+        months=len(projection),
+        data=encode_snapshot(projection, params["start_date"])
+    ))
+    return 1
+
+
+# Helper function to drop a scenario's snapshot once its rows are the current copy
+def delete_snapshot(db: Session, scenario_id: int) -> None:
+    db.query(ProjectionSnapshot).filter(ProjectionSnapshot.scenario_id == scenario_id).delete()
+
+
+# Helper function to read a scenario's snapshot, if it has one
+def load_snapshot(db: Session, scenario_id: int) -> Optional[ProjectionResult]:
+    data = db.query(ProjectionSnapshot.data).filter(ProjectionSnapshot.scenario_id == scenario_id).scalar()
+    if data is None:
+        return None
+    return decode_snapshot(data)
+
+
+# Helper function to read a scenario's snapshot, if it has one, on an async session
+async def load_snapshot_async(db: AsyncSession, scenario_id: int) -> Optional[ProjectionResult]:
+    data = (await db.execute(
+        select(ProjectionSnapshot.data).where(ProjectionSnapshot.scenario_id == scenario_id)
+    )).scalar()
+    if data is None:
+        return None
+    return decode_snapshot(data)
+
+
+def stored_projection(projection: ProjectionResult) -> ProjectionResult:
+    """The projection with whole-valued counts as integers, as they read back from monthly_data."""
+    return ProjectionResult({key: _as_stored(key, values) for key, values in projection.columns.items()})
+
+
+def projection_records(projection: ProjectionResult, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Response rows straight from projection columns; fields maps each output key to its column."""
+    keys = list(fields)
+    columns = [projection.column(column).tolist() for column in fields.values()]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
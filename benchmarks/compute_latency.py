@@ -0,0 +1,110 @@
+# benchmarks/compute_latency.py
+"""Latency of light requests while heavy recalculations and simulations run.
+
+CLIENTS clients each run three 240-month parameter updates and one
+4000-path simulation, while a probe requests GET / every 5 ms. Probe latency
+is measured from when the probe was due, so time the event loop spends
+blocked counts. The app runs in-process through httpx's ASGI transport.
+
+    python benchmarks/compute_latency.py
+
+DATABASE_URL defaults to a fresh SQLite file; COMPUTE_* settings apply as usual.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+CLIENTS = int(os.getenv("CLIENTS", "8"))
+UPDATES = 3
+SIMULATION = {"paths": 4000, "seed": 1, "distributions": {"conversion_rate": {"std": 0.05}}}
+PROBE_INTERVAL = 0.005
+
+
+def percentiles(name: str, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(f"{name:10s} n={len(latencies):5d} p50={statistics.median(latencies):7.1f} ms "
+          f"p99={p99:7.1f} ms max={latencies[-1]:7.1f} ms")
+
+
+async def probe(client, stop: asyncio.Event, latencies):
+    due = time.perf_counter()
+    while not stop.is_set():
+        response = await client.get("/")
+        now = time.perf_counter()
+        assert response.status_code == 200
+        latencies.append((now - due) * 1000)
+        due = now + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def heavy(client, headers, scenario_id: int, index: int):
+    for update in range(UPDATES):
+        response = await client.post(
+            f"/api/scenarios/{scenario_id}/parameters/update",
+            json={"forecast_months": 240, "initial_clients": 100 + 10 * update + index},
+            headers=headers,
+        )
+        assert response.status_code in (200, 202), response.text
+    response = await client.post(f"/api/scenarios/{scenario_id}/simulation", json=SIMULATION, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+async def run():
+    import httpx
+    from app.main import app
+    from app.auth.utils import create_access_token
+    from app.database import async_engine
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+        response = await client.post(
+            "/api/auth/register", json={"username": "bench", "email": "bench@example.com", "password": "benchmark"}
+        )
+        assert response.status_code == 200, response.text
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench"})}
+        scenario_ids = []
+        for index in range(CLIENTS):
+            response = await client.post(
+                "/api/scenarios", json={"name": f"bench {index}", "description": ""}, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            scenario_ids.append(response.json()["id"])
+
+        idle = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, idle))
+        await asyncio.sleep(1)
+        stop.set()
+        await task
+
+        busy = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, busy))
+        start = time.perf_counter()
+        await asyncio.gather(*(heavy(client, headers, scenario_id, index) for index, scenario_id in enumerate(scenario_ids)))
+        wall = time.perf_counter() - start
+        stop.set()
+        await task
+
+    percentiles("idle", idle)
+    percentiles("under load", busy)
+    print(f"heavy batch wall {wall:.2f} s ({CLIENTS} clients)")
+    await async_engine.dispose()
+
+
+def main():
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.database import engine
+    from app.models.database import Base
+    import app.models.user  # noqa: F401 registers the users tables
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ echo "=== Installing requirements for RYZE.ai ==="
 
 # Install backend requirements
 echo "Installing backend requirements..."
-pip install fastapi uvicorn sqlalchemy psycopg2-binary alembic python-dateutil
+pip install fastapi uvicorn sqlalchemy psycopg2-binary asyncpg aiosqlite alembic python-dateutil
 
 # Check if npm is installed for frontend dependencies
 if command -v npm &> /dev/null; then
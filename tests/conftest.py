@@ -0,0 +1,21 @@
+# tests/conftest.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.services import financial
+from app.services.cache import projection_cache
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A session on a fresh SQLite database, with the in-process caches emptied."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    projection_cache.clear()
+    financial._scenario_checkpoints.clear()
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,22 @@
+# tests/test_analysis.py
+import math
+
+import pytest
+
+from app.services.analysis import goal_seek
+from app.services.financial import DEFAULT_PARAMETERS
+
+
+@pytest.mark.parametrize("bounds", [
+    {"upper": math.inf},
+    {"lower": math.nan},
+    {"lower": -math.inf, "upper": 100},
+])
+def test_goal_seek_rejects_non_finite_bracket(bounds):
+    with pytest.raises(ValueError, match="finite"):
+        goal_seek(DEFAULT_PARAMETERS, "initial_clients", "ebitda", 5, **bounds)
+
+
+def test_goal_seek_rejects_non_finite_target():
+    with pytest.raises(ValueError, match="finite"):
+        goal_seek(DEFAULT_PARAMETERS, "initial_clients", "ebitda", 5, target=math.nan)
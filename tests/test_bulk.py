@@ -0,0 +1,148 @@
+# tests/test_bulk.py
+import math
+from collections import Counter
+
+import pytest
+from sqlalchemy import event, select
+
+from app.models.database import ForecastScenario, MonthlyData, YearlySummary
+from app.services import bulk
+from app.services.bulk import (
+    _unchanged,
+    insert_monthly_data,
+    insert_yearly_summaries,
+    monthly_rows,
+    sync_monthly_data,
+    sync_rows,
+)
+from app.services.financial import (
+    DEFAULT_PARAMETERS,
+    calculate_projections,
+    create_default_scenario,
+    get_yearly_summary,
+    recalculate_scenario
+)
+
+CHANGED = {**DEFAULT_PARAMETERS, "initial_clients": 150}
+
+
+@pytest.fixture(params=[5000, 7, 1], ids=["one chunk", "chunks of 7", "chunks of 1"])
+def chunk_rows(request, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_CHUNK_ROWS", request.param)
+    return request.param
+
+
+# Helper function to add an empty scenario
+def new_scenario(db, name):
+    scenario = ForecastScenario(name=name, is_default=False)
+    db.add(scenario)
+    db.flush()
+    return scenario.id
+
+
+# Helper function to read a scenario's stored rows in key order, without their ids
+def stored(db, model, scenario_id, key):
+    table = model.__table__
+    columns = [column for column in table.columns if column.name not in ("id", "scenario_id")]
+    query = select(*columns).where(table.c.scenario_id == scenario_id).order_by(table.c[key], table.c.id)
+    return [tuple(row) for row in db.execute(query)]
+
+
+# Helper function to write a projection the way a new scenario gets it, as a reference
+def fresh_rows(db, params):
+    scenario_id = new_scenario(db, f"fresh {len(db.query(ForecastScenario).all())}")
+    projection = calculate_projections(params)
+    insert_monthly_data(db, {scenario_id: projection})
+    insert_yearly_summaries(db, {scenario_id: get_yearly_summary(projection)})
+    return stored(db, MonthlyData, scenario_id, "month_number"), stored(db, YearlySummary, scenario_id, "year")
+
+
+def test_recalculation_stores_what_a_fresh_insert_would(db, chunk_rows):
+    default = create_default_scenario(db)
+    for params in (CHANGED, {**CHANGED, "forecast_months": 60}, {**CHANGED, "forecast_months": 84}):
+        recalculate_scenario(db, default.id, params)
+        assert (stored(db, MonthlyData, default.id, "month_number"),
+                stored(db, YearlySummary, default.id, "year")) == fresh_rows(db, params)
+
+
+def test_counts_each_kind_of_write(db, chunk_rows):
+    scenario_id = new_scenario(db, "counted")
+    insert_monthly_data(db, {scenario_id: calculate_projections(DEFAULT_PARAMETERS)})
+
+    # Counts are written as floats to integer columns; equal stored ints are unchanged
+    counts = sync_monthly_data(db, scenario_id, calculate_projections(DEFAULT_PARAMETERS))
+    assert counts == Counter(unchanged=72)
+
+    counts = sync_monthly_data(db, scenario_id, calculate_projections({**CHANGED, "forecast_months": 60}))
+    assert counts["deleted"] == 12 and counts["inserted"] == 0
+    assert counts["updated"] + counts["unchanged"] == 60 and counts["updated"] > 0
+
+    counts = sync_monthly_data(db, scenario_id, calculate_projections({**CHANGED, "forecast_months": 84}))
+    assert counts == Counter(inserted=24, unchanged=60)
+    assert stored(db, MonthlyData, scenario_id, "month_number") == fresh_rows(db, {**CHANGED, "forecast_months": 84})[0]
+
+
+def test_since_leaves_earlier_months_alone(db, chunk_rows):
+    scenario_id = new_scenario(db, "resumed")
+    insert_monthly_data(db, {scenario_id: calculate_projections(DEFAULT_PARAMETERS)})
+    before = stored(db, MonthlyData, scenario_id, "month_number")
+
+    # Months from 36 onward come from the changed parameters; the earlier ones are not compared
+    months = calculate_projections({**CHANGED, "forecast_months": 60}).to_records()[36:]
+    counts = sync_monthly_data(db, scenario_id, months, since_month=36)
+    assert counts["deleted"] == 12
+    assert counts["updated"] + counts["unchanged"] == 24
+
+    changed = fresh_rows(db, {**CHANGED, "forecast_months": 60})[0]
+    assert stored(db, MonthlyData, scenario_id, "month_number") == before[:36] + changed[36:]
+
+
+def test_duplicate_stored_keys_are_deleted(db, chunk_rows):
+    scenario_id = new_scenario(db, "duplicated")
+    projection = calculate_projections(DEFAULT_PARAMETERS)
+    insert_monthly_data(db, {scenario_id: projection})
+    insert_monthly_data(db, {scenario_id: projection})
+
+    counts = sync_monthly_data(db, scenario_id, projection)
+    assert counts == Counter(unchanged=72, deleted=72)
+    assert stored(db, MonthlyData, scenario_id, "month_number") == fresh_rows(db, DEFAULT_PARAMETERS)[0]
+
+
+def test_changed_rows_are_updated_in_groups_of_changed_columns(db):
+    scenario_id = new_scenario(db, "grouped")
+    rows = list(monthly_rows(scenario_id, calculate_projections(DEFAULT_PARAMETERS)))
+    bulk.bulk_insert(db, MonthlyData, rows)
+    rows[3]["income"] += 1
+    rows[5]["income"] += 1
+    rows[7]["expenses"] += 1
+
+    updates = []
+    # Helper function to record each UPDATE and how many rows it was run for
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            updates.append((statement, len(parameters) if executemany else 1))
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        counts = sync_rows(db, MonthlyData, scenario_id, "month_number", rows)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert counts == Counter(updated=3, unchanged=69)
+    assert sorted((statement.split(" WHERE")[0], count) for statement, count in updates) == [
+        ("UPDATE monthly_data SET expenses=?", 1),
+        ("UPDATE monthly_data SET income=?", 2),
+    ]
+    incomes = db.execute(select(MonthlyData.income).where(MonthlyData.scenario_id == scenario_id)
+                         .order_by(MonthlyData.month_number)).scalars().all()
+    assert incomes == [row["income"] for row in rows]
+
+
+def test_unchanged_allows_only_integer_column_rounding():
+    assert _unchanged(201, 201.0, True)
+    assert _unchanged(201, 200.6, True)
+    assert not _unchanged(201, 201.6, True)
+    assert not _unchanged(201, 200.6, False)
+    assert not _unchanged(201, math.inf, True)
+    assert _unchanged(None, None, True)
+    assert not _unchanged(None, 0.0, True)
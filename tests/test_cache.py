@@ -0,0 +1,43 @@
+# tests/test_cache.py
+import pytest
+
+from app.services.cache import parameter_hash, projection_cache
+from app.services.financial import (
+    DEFAULT_PARAMETERS,
+    calculate_projections,
+    clone_scenario,
+    create_default_scenario,
+    recalculate_scenario
+)
+from app.services.projection import project_series
+
+FLOAT_FORM = {
+    **DEFAULT_PARAMETERS,
+    "subscription_price": float(DEFAULT_PARAMETERS["subscription_price"]),
+    "cto_salary": float(DEFAULT_PARAMETERS["cto_salary"]),
+}
+
+
+# Helper function to list each month's values with their types
+def typed_records(projection):
+    return [[(value, type(value)) for value in month.values()] for month in projection.to_records()]
+
+
+@pytest.mark.parametrize("first, second", [(DEFAULT_PARAMETERS, FLOAT_FORM), (FLOAT_FORM, DEFAULT_PARAMETERS)])
+def test_int_and_float_forms_share_an_entry_with_the_same_types(first, second):
+    projection_cache.clear()
+    assert parameter_hash(first) == parameter_hash(second)
+    cached = calculate_projections(first)
+    assert calculate_projections(second) is cached
+    assert typed_records(cached) == typed_records(project_series(second)) == typed_records(project_series(first))
+
+
+def test_recalculating_a_copy_keeps_the_shared_projection(db):
+    default = create_default_scenario(db)
+    copies = [clone_scenario(db, default.id, f"copy {index}") for index in range(2)]
+    db.commit()
+    default_key = parameter_hash(DEFAULT_PARAMETERS)
+    assert projection_cache.get(default_key) is not None
+
+    recalculate_scenario(db, copies[0].id, {**DEFAULT_PARAMETERS, "initial_clients": 150})
+    assert projection_cache.get(default_key) is not None
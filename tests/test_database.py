@@ -0,0 +1,170 @@
+# tests/test_database.py
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import (
+    DB_MAX_OVERFLOW,
+    PoolMetrics,
+    ReadYourWrites,
+    RoutingSession,
+    TimedQueuePool,
+    engine_options,
+    route_reads
+)
+from app.models.database import Base, ForecastScenario
+from app.services.financial import create_default_scenario, get_default_scenario_async
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """Async sessions routed between two SQLite databases, a primary and a replica that lags behind it.
+
+    Only the primary has the default scenario; each has one scenario named after itself.
+    """
+    urls = {}
+    for name in ("primary", "replica"):
+        path = tmp_path / f"{name}.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        if name == "primary":
+            create_default_scenario(session)
+        session.add(ForecastScenario(name=f"on {name}", is_default=False))
+        session.commit()
+        session.close()
+        engine.dispose()
+        urls[name] = f"sqlite+aiosqlite:///{path}"
+
+    primary = create_async_engine(urls["primary"])
+    replica = create_async_engine(urls["replica"])
+    monkeypatch.setattr(database, "async_engine", primary)
+    monkeypatch.setattr(database, "replica_async_engine", replica)
+    monkeypatch.setattr(database, "read_your_writes", ReadYourWrites(window=5))
+    yield async_sessionmaker(primary, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False)
+    asyncio.run(primary.dispose())
+    asyncio.run(replica.dispose())
+
+
+# Helper function to run a coroutine taking a session of a GET (read_only) or other request
+def in_session(sessions, coroutine, read_only=True):
+    async def run():
+        async with sessions() as db:
+            db.info["read_only"] = read_only
+            return await coroutine(db)
+    return asyncio.run(run())
+
+
+# Helper function to list the scenario names a session's next read sees
+async def scenario_names(db):
+    return sorted((await db.execute(select(ForecastScenario.name))).scalars())
+
+
+def test_get_requests_read_from_the_replica(replicated):
+    async def read(db):
+        route_reads(db, "alice")
+        return await scenario_names(db)
+
+    assert in_session(replicated, read) == ["on replica"]
+    assert database.read_your_writes.stats()["reads"] == {"replica": 1, "primary": 0, "sticky": 0}
+
+
+def test_a_user_who_wrote_recently_reads_from_the_primary(replicated):
+    database.read_your_writes.mark("Alice")
+
+    async def read(db):
+        route_reads(db, "alice")
+        return await scenario_names(db)
+
+    assert "on primary" in in_session(replicated, read)
+    assert database.read_your_writes.stats()["reads"] == {"replica": 0, "primary": 0, "sticky": 1}
+
+
+def test_requests_that_may_write_read_from_the_primary(replicated):
+    async def read(db):
+        route_reads(db, "alice")
+        return await scenario_names(db)
+
+    assert "on primary" in in_session(replicated, read, read_only=False)
+    assert database.read_your_writes.stats()["reads"] == {"replica": 0, "primary": 1, "sticky": 0}
+
+
+def test_a_write_moves_the_rest_of_the_session_to_the_primary(replicated):
+    async def write_then_read(db):
+        route_reads(db, "alice")
+        before = await scenario_names(db)
+        db.add(ForecastScenario(name="added", is_default=False))
+        await db.flush()
+        return before, await scenario_names(db), db.info["wrote"]
+
+    before, after, wrote = in_session(replicated, write_then_read)
+    assert before == ["on replica"]
+    assert "added" in after and "on primary" in after
+    assert wrote
+
+
+def test_default_scenario_lookup_reads_from_the_primary(replicated):
+    async def lookup(db):
+        route_reads(db, "alice")
+        default = await get_default_scenario_async(db)
+        defaults = (await db.execute(
+            select(func.count()).select_from(ForecastScenario).where(ForecastScenario.is_default == True)
+        )).scalar()
+        return default.name, defaults, db.info.get("wrote", False)
+
+    # The replica has no default yet; the primary's is found and no second one is created
+    assert in_session(replicated, lookup) == ("Default Scenario", 1, False)
+    assert database.read_your_writes.stats()["reads"]["replica"] == 0
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:", "sqlite:///file:shared?mode=memory&uri=true"])
+def test_in_memory_sqlite_keeps_one_database(url):
+    engine = create_engine(url, **engine_options(url))
+    assert not isinstance(engine.pool, TimedQueuePool)
+    Base.metadata.create_all(bind=engine)
+    # A second connection sees the tables the first created
+    with engine.connect() as first, engine.connect() as second:
+        assert "forecast_scenarios" in inspect(first).get_table_names()
+        assert "forecast_scenarios" in inspect(second).get_table_names()
+    engine.dispose()
+
+
+def test_in_memory_async_sqlite_keeps_one_database():
+    url = "sqlite+aiosqlite://"
+    engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+
+    async def run():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with engine.connect() as connection:
+            return (await connection.execute(select(func.count()).select_from(ForecastScenario))).scalar()
+
+    assert asyncio.run(run()) == 0
+    asyncio.run(engine.dispose())
+
+
+def test_pool_metrics_report_every_pool_kind(tmp_path):
+    metrics = PoolMetrics()
+    file_url = f"sqlite:///{tmp_path / 'pooled.db'}"
+    engines = {
+        "file": create_engine(file_url, **engine_options(file_url)),
+        "memory": create_engine("sqlite://", **engine_options("sqlite://")),
+    }
+    for name, engine in engines.items():
+        metrics.watch(name, engine)
+        with engine.connect() as connection:
+            connection.execute(select(1))
+
+    pools = metrics.stats()["pools"]
+    assert pools["file"]["pool"] == "TimedQueuePool"
+    assert pools["file"]["max_overflow"] == DB_MAX_OVERFLOW
+    assert (pools["file"]["checked_out"], pools["file"]["checked_in"]) == (0, 1)
+    assert "max_overflow" not in pools["memory"]
+    for pool in pools.values():
+        assert (pool["checkouts"], pool["checkins"]) == (1, 1)
+    for engine in engines.values():
+        engine.dispose()
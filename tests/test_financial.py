@@ -0,0 +1,66 @@
+# tests/test_financial.py
+from app.services import financial
+from app.services.financial import (
+    DEFAULT_PARAMETERS,
+    clone_scenario,
+    create_default_scenario,
+    get_stored_months,
+    get_yearly_summary,
+    recalculate_scenario
+)
+
+# Each step is applied on top of the one before; every one after the first resumes
+STEPS = [
+    {"initial_clients": 150},
+    {"cto_salary": 14000},
+    {"client_growth_rates": [0.10, 0.12, 0.20, 0.12, 0.10]},
+    {"forecast_months": 96},
+    {"forecast_months": 60},
+    {"conversion_rate": 0.5},
+    {},
+    # Every rate list is read up to the last client growth rate year
+    {
+        "forecast_months": 240, "client_growth_rates": [0.10, 0.12, 0.20, 0.12] + [0.10] * 16,
+        "developer_growth_rates": [0.05, 0.07, 0.10, 0.08] + [0.06] * 16,
+        "affiliate_growth_rates": [0.08, 0.10, 0.12, 0.10] + [0.08] * 16,
+    },
+    {"affiliate_growth_rates": [0.08, 0.10, 0.12, 0.10] + [0.08] * 12 + [0.1] * 4},
+]
+
+
+# Helper function to read a scenario's stored months and yearly summary rows
+def stored_rows(db, scenario_id):
+    years = db.query(financial.YearlySummary).filter(financial.YearlySummary.scenario_id == scenario_id)
+    columns = [column.name for column in financial.YearlySummary.__table__.columns if column.name not in ("id", "scenario_id")]
+    return (
+        get_stored_months(db, scenario_id),
+        sorted([getattr(year, name) for name in columns] for year in years),
+    )
+
+
+def test_resumed_recalculation_matches_a_full_recompute(db, monkeypatch):
+    resumed = create_default_scenario(db)
+    full = clone_scenario(db, resumed.id, "full")
+    db.commit()
+
+    # The months before start_month are the ones a resumed recalculation reads back
+    start_months = []
+    read_stored_months = financial.get_stored_months
+    def record_start(db, scenario_id, before_month=None):
+        if scenario_id == resumed.id:
+            start_months.append(before_month)
+        return read_stored_months(db, scenario_id, before_month)
+    monkeypatch.setattr(financial, "get_stored_months", record_start)
+
+    params = dict(DEFAULT_PARAMETERS)
+    for step in STEPS:
+        params.update(step)
+        resumed_yearly = recalculate_scenario(db, resumed.id, params)
+        financial._scenario_checkpoints.pop(full.id, None)
+        full_yearly = recalculate_scenario(db, full.id, params)
+
+        assert resumed_yearly == full_yearly == get_yearly_summary(get_stored_months(db, full.id))
+        assert stored_rows(db, resumed.id) == stored_rows(db, full.id)
+
+    assert start_months == [6, 24, 72, 60, 1, 60, 60, 192]
+
@@ -0,0 +1,203 @@
+# tests/test_jobs.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import jobs
+from app.services.executor import ComputeBusy
+from app.services.jobs import InProcessBackend, RecomputeBackend
+
+
+class PartialBackend(RecomputeBackend):
+    def submit(self, scenario_id, params):
+        return None
+
+    def get(self, job_id):
+        return None
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    with pytest.raises(TypeError, match="add_listener"):
+        PartialBackend()
+
+
+def test_in_process_backend_implements_every_method():
+    backend = InProcessBackend(lambda scenario_id, params: None)
+    assert backend.get("missing") is None
+    assert backend.latest_params(1) is None
+
+
+class FakeExecutor:
+    """Runs jobs on a thread pool, answering ComputeBusy to the first `busy` submissions.
+
+    A submission that will be refused first waits for `gate`, when one is given.
+    """
+
+    def __init__(self, busy=0, gate=None):
+        self.busy = busy
+        self.gate = gate
+        self.pool = ThreadPoolExecutor(max_workers=4)
+
+    def submit(self, fn, *args):
+        if self.busy:
+            self.busy -= 1
+            if self.gate is not None:
+                self.gate.wait(5)
+            raise ComputeBusy("busy")
+        return self.pool.submit(fn, *args)
+
+
+class Recorder:
+    """A run function recording the monotonic time it was called with each scenario's parameters."""
+
+    def __init__(self, block=None):
+        self.calls = []
+        self.block = block
+
+    def __call__(self, scenario_id, params):
+        block = self.block
+        self.calls.append((scenario_id, params, time.monotonic()))
+        if block is not None:
+            block.wait(5)
+        return {"scenario_id": scenario_id, "params": params}
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = FakeExecutor()
+    monkeypatch.setattr(jobs, "compute_executor", executor)
+    yield executor
+    executor.pool.shutdown(wait=False)
+
+
+# Helper function to wait for a job to finish, through a listener
+def wait_for(backend, job, timeout=5):
+    finished = threading.Event()
+    backend.add_listener(job.id, lambda _job: finished.set())
+    assert finished.wait(timeout), job.status
+    return backend.get(job.id)
+
+
+def test_updates_to_a_queued_job_are_coalesced(executor):
+    run = Recorder()
+    backend = InProcessBackend(run, debounce=0.1, max_delay=5)
+    submitted = [backend.submit(1, {"initial_clients": clients}) for clients in (100, 110, 120)]
+    assert len({job.id for job in submitted}) == 1
+    assert backend.latest_params(1) == {"initial_clients": 120}
+
+    job = wait_for(backend, submitted[0])
+    assert (job.status, job.updates) == ("succeeded", 3)
+    assert job.result == {"scenario_id": 1, "params": {"initial_clients": 120}}
+    assert [call[:2] for call in run.calls] == [(1, {"initial_clients": 120})]
+    assert backend.latest_params(1) is None
+    stats = backend.stats()
+    assert (stats["updates"], stats["coalesced"], stats["succeeded"]) == (3, 2, 1)
+
+
+def test_each_update_pushes_the_start_back_by_the_debounce(executor):
+    run = Recorder()
+    backend = InProcessBackend(run, debounce=0.2, max_delay=5)
+    job = backend.submit(1, {"initial_clients": 100})
+    time.sleep(0.1)
+    last_update = time.monotonic()
+    backend.submit(1, {"initial_clients": 110})
+    wait_for(backend, job)
+    assert run.calls[0][2] - last_update >= 0.2
+
+
+def test_a_job_starts_by_max_delay_however_often_it_is_updated(executor):
+    run = Recorder()
+    backend = InProcessBackend(run, debounce=0.2, max_delay=0.4)
+    first_update = time.monotonic()
+    job = backend.submit(1, {"initial_clients": 100})
+    while not run.calls and time.monotonic() - first_update < 2:
+        backend.submit(1, {"initial_clients": 110})
+        time.sleep(0.05)
+    started = run.calls[0][2] - first_update
+    assert 0.4 <= started < 1
+    assert wait_for(backend, job).status == "succeeded"
+    # Updates arriving once it started go to a new job
+    assert backend.submit(1, {"initial_clients": 120}).id != job.id
+
+
+def test_a_job_without_room_is_requeued(executor):
+    executor.busy = 1
+    run = Recorder()
+    backend = InProcessBackend(run, debounce=0.05, max_delay=5)
+    job = wait_for(backend, backend.submit(1, {"initial_clients": 100}))
+    assert job.status == "succeeded"
+    assert len(run.calls) == 1
+    assert backend.stats()["started"] == 1
+
+
+def test_a_requeued_job_is_superseded_by_a_newer_one(executor):
+    gate = threading.Event()
+    executor.busy, executor.gate = 1, gate
+    run = Recorder()
+    backend = InProcessBackend(run, debounce=0.05, max_delay=5)
+    first = backend.submit(1, {"initial_clients": 100})
+    superseded = []
+    backend.add_listener(first.id, superseded.append)
+
+    # The first job has been taken off the queue and waits on the busy executor
+    deadline = time.monotonic() + 5
+    while first.status != "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    newer = backend.submit(1, {"initial_clients": 110})
+    assert newer.id != first.id
+    gate.set()
+
+    newer = wait_for(backend, newer)
+    assert superseded == [first]
+    assert (first.status, first.superseded_by) == ("superseded", newer.id)
+    assert (newer.status, newer.updates) == ("succeeded", 2)
+    assert [call[:2] for call in run.calls] == [(1, {"initial_clients": 110})]
+    assert backend.stats()["superseded"] == 1
+
+
+def test_listeners_are_called_once_the_job_finishes(executor):
+    block = threading.Event()
+    backend = InProcessBackend(Recorder(block), debounce=0.01, max_delay=5)
+    job = backend.submit(1, {"initial_clients": 100})
+    calls = []
+    backend.add_listener(job.id, calls.append)
+    assert calls == []
+    block.set()
+    wait_for(backend, job)
+    assert calls == [job]
+
+    # A finished job calls back right away; an unknown one never does
+    backend.add_listener(job.id, calls.append)
+    backend.add_listener("missing", calls.append)
+    assert calls == [job, job]
+
+
+def test_failed_jobs_keep_the_error(executor):
+    def run(scenario_id, params):
+        raise ValueError("Scenario not found")
+    backend = InProcessBackend(run, debounce=0.01, max_delay=5)
+    job = wait_for(backend, backend.submit(1, {"initial_clients": 100}))
+    assert job.to_dict()["error"] == "Scenario not found"
+    assert backend.stats()["failed"] == 1
+
+
+def test_finished_jobs_expire_behind_an_unfinished_one(executor):
+    block = threading.Event()
+    run = Recorder(block)
+    backend = InProcessBackend(run, debounce=0.01, max_delay=5, ttl=0.2)
+    # Submitted first and still running when the others expire
+    running = backend.submit(1, {"initial_clients": 100})
+    while not run.calls:
+        time.sleep(0.01)
+    run.block = None
+    finished = wait_for(backend, backend.submit(2, {"initial_clients": 100}))
+    time.sleep(0.3)
+
+    recent = backend.submit(3, {"initial_clients": 100})
+    assert backend.get(finished.id) is None
+    assert backend.get(running.id) is running
+    assert backend.get(recent.id) is recent
+    block.set()
+    assert wait_for(backend, running).status == "succeeded"
@@ -0,0 +1,372 @@
+# tests/test_projection.py
+import math
+import random
+from datetime import datetime
+from typing import Dict, Any, List
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from app.services.financial import DEFAULT_PARAMETERS, calculate_projections
+from app.services.projection import (
+    FLOAT_KEYS,
+    MONTH_KEYS,
+    CohortAccumulator,
+    batch_to_records,
+    first_affected_month,
+    forecast_months,
+    iter_projections,
+    pack_parameters,
+    project_batch,
+    project_packed,
+    ForecastParams
+)
+
+
+# The month loop calculate_projections ran before the NumPy kernel, frozen as the reference.
+# Only the horizon and the sales productivity are read from params; their defaults are the
+# original 72 months and 20 clients per sales person.
+def reference_projections(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    start_date = datetime.strptime(params["start_date"], "%Y-%m-%d")
+    months = params.get("forecast_months") or 72
+    sales_productivity = params.get("sales_productivity", 20)
+
+    # Initialize values
+    clients = params["initial_clients"]
+    paying_clients = 0
+    developers = params["initial_developers"]
+    affiliates = params["initial_affiliates"]
+
+    # Track clients by cohort for calculating paying clients
+    client_cohorts = []  # List of (month_joined, count) tuples
+
+    # Track sales staff hiring
+    sales_staff_count = 0
+    sales_staff_hire_months = []
+
+    # Init other staff counts
+    cto_count = 0
+    ceo_count = 0
+    jr_dev_count = 0
+    admin_count = 0
+
+    monthly_data = []
+
+    for i in range(months):
+        current_date = start_date + relativedelta(months=i)
+        current_month = current_date.month
+        current_year = current_date.year
+        year_index = min(i // 12, len(params["client_growth_rates"]) - 1)
+
+        # --- Staff Hiring Logic ---
+        if i >= params["cto_start_month"] and cto_count == 0:
+            cto_count = 1
+        if i >= params["ceo_start_month"] and ceo_count == 0:
+            ceo_count = 1
+        if i >= params["sales_start_month"] and i % params["sales_hiring_interval"] == params["sales_start_month"] % params["sales_hiring_interval"] and sales_staff_count < params["max_sales_staff"]:
+            sales_staff_count += 1
+            sales_staff_hire_months.append(i)
+        if i >= params["jr_dev_start_month"] and jr_dev_count == 0:
+            jr_dev_count = 1
+        if i >= params["admin_start_month"] and admin_count == 0:
+            admin_count = 1
+
+        # --- Growth Calculations ---
+        client_growth_rate = params["client_growth_rates"][year_index]
+        developer_growth_rate = params["developer_growth_rates"][year_index]
+        affiliate_growth_rate = params["affiliate_growth_rates"][year_index]
+
+        base_acquisition = max(5, int(clients * client_growth_rate * 0.2)) if i == 0 else max(10, int(clients * client_growth_rate * 0.2))
+
+        sales_acquisition = 0
+        if sales_staff_count > 0:
+            sales_acquisition = sales_productivity * sales_staff_count * (1 + (i // 6) * 0.1)
+
+        affiliate_acquisition = 0
+        if affiliates > 0:
+            affiliate_acquisition = int(affiliates * 0.5)
+
+        new_clients = base_acquisition + sales_acquisition + affiliate_acquisition
+        new_devs = max(1, int(developers * developer_growth_rate)) if developers > 0 else 2
+        new_affs = max(2, int(affiliates * affiliate_growth_rate)) if affiliates > 0 else 3
+
+        if new_clients > 0:
+            client_cohorts.append((i, new_clients))
+
+        clients += new_clients
+        developers += new_devs
+        affiliates += new_affs
+
+        paying_clients = 0
+        for cohort_month, cohort_size in client_cohorts:
+            months_since_joining = i - cohort_month
+            if months_since_joining >= params["free_months"]:
+                if months_since_joining == params["free_months"]:
+                    cohort_size = int(cohort_size * params["conversion_rate"])
+                paying_clients += cohort_size
+
+        # --- Revenue Calculations ---
+        client_revenue = paying_clients * params["subscription_price"]
+        developer_revenue = developers * params["subscription_price"]
+        affiliate_commission = affiliates * params["affiliate_commission"]
+        revenue = client_revenue + developer_revenue
+
+        # --- Expense Calculations ---
+        cto_cost = cto_count * params["cto_salary"]
+        ceo_cost = ceo_count * params["ceo_salary"]
+        jr_dev_cost = jr_dev_count * params["jr_dev_salary"]
+        admin_cost = admin_count * params["admin_salary"]
+        sales_base_cost = sales_staff_count * params["sales_base_salary"]
+        sales_commission_cost = sales_acquisition * params["subscription_price"] * params["sales_commission"]
+        sales_total_cost = sales_base_cost + sales_commission_cost
+        infrastructure_cost = (clients + developers) * params["infrastructure_cost_per_user"]
+        marketing_cost = revenue * params["marketing_percentage"]
+        affiliate_program_cost = affiliate_commission
+        other_expenses = revenue * params["other_expenses_percentage"]
+        total_expenses = (
+            cto_cost +
+            ceo_cost +
+            jr_dev_cost +
+            admin_cost +
+            sales_total_cost +
+            infrastructure_cost +
+            marketing_cost +
+            affiliate_program_cost +
+            other_expenses
+        )
+        ebitda = revenue - total_expenses
+
+        monthly_data.append({
+            "year": current_year,
+            "month": current_month,
+            "month_number": i,
+            "date": current_date.strftime("%Y-%m-%d"),
+            "income": round(revenue, 2),
+            "expenses": round(total_expenses, 2),
+            "ebitda": round(ebitda, 2),
+            "client_count": clients,
+            "new_clients": new_clients,
+            "paying_clients": paying_clients,
+            "developer_count": developers,
+            "affiliate_count": affiliates,
+            "sales_staff": sales_staff_count,
+            "jr_devs": jr_dev_count,
+            "admin_staff": admin_count,
+            "cto_count": cto_count,
+            "ceo_count": ceo_count,
+            "total_staff": sales_staff_count + jr_dev_count + admin_count + cto_count + ceo_count,
+            "cto_cost": round(cto_cost, 2),
+            "ceo_cost": round(ceo_cost, 2),
+            "sales_cost": round(sales_total_cost, 2),
+            "jr_dev_cost": round(jr_dev_cost, 2),
+            "admin_cost": round(admin_cost, 2),
+            "infrastructure_cost": round(infrastructure_cost, 2),
+            "marketing_cost": round(marketing_cost, 2),
+            "affiliate_cost": round(affiliate_program_cost, 2),
+            "other_expenses": round(other_expenses, 2),
+        })
+
+    return monthly_data
+
+
+# Helper function to draw an int or a float amount, so both parameter types are exercised
+def _amount(rng: random.Random, low: int, high: int):
+    if rng.random() < 0.5:
+        return rng.randint(low, high)
+    return round(rng.uniform(low, high), rng.choice([0, 1, 2, 4]))
+
+
+# Helper function to draw one parameter set around DEFAULT_PARAMETERS
+def random_parameters(rng: random.Random) -> Dict[str, Any]:
+    years = rng.randint(1, 7)
+    rates = lambda: [round(rng.uniform(-0.05, 0.3), 3) for _ in range(years)]
+    return {
+        "start_date": f"{rng.randint(2020, 2030)}-{rng.randint(1, 12):02d}-{rng.choice([1, 15, 28]):02d}",
+        "initial_clients": rng.randint(0, 5000),
+        "initial_developers": rng.randint(-5, 500),
+        "initial_affiliates": rng.randint(-5, 200),
+        "client_growth_rates": rates(),
+        "developer_growth_rates": rates() + [0.05] * 7,
+        "affiliate_growth_rates": rates() + [0.05] * 7,
+        "subscription_price": _amount(rng, 0, 100),
+        "affiliate_commission": _amount(rng, 0, 20),
+        "free_months": rng.choice([-3, -1, 0, 0, 1, 1, 2, 3, 6, 12, 71, 72, 100]),
+        "conversion_rate": rng.choice([0, 0.001, 0.25, 0.5, 0.75, 1, round(rng.uniform(0, 1.2), 3)]),
+        "cto_start_month": rng.randint(-2, 80),
+        "ceo_start_month": rng.randint(-2, 80),
+        "sales_start_month": rng.randint(-6, 80),
+        "sales_hiring_interval": rng.choice([-3, 1, 2, 3, 6, 12]),
+        "max_sales_staff": rng.randint(-1, 20),
+        "jr_dev_start_month": rng.randint(-2, 80),
+        "admin_start_month": rng.randint(-2, 80),
+        "cto_salary": _amount(rng, 0, 20000),
+        "ceo_salary": _amount(rng, 0, 20000),
+        "sales_base_salary": _amount(rng, 0, 15000),
+        "sales_commission": rng.choice([0, 1, 0.05, round(rng.uniform(0, 0.3), 3)]),
+        "jr_dev_salary": _amount(rng, 0, 12000),
+        "admin_salary": _amount(rng, 0, 12000),
+        "marketing_percentage": rng.choice([0, 1, 0.15, round(rng.uniform(0, 0.5), 3)]),
+        "infrastructure_cost_per_user": rng.choice([0, 1, 2, 1.5, round(rng.uniform(0, 5), 2)]),
+        "other_expenses_percentage": rng.choice([0, 1, 0.1, round(rng.uniform(0, 0.5), 3)]),
+    }
+
+
+# Helper function to turn a reference value into the one expected: FLOAT_KEYS are always
+# floats, infinite past the float range, and every other key keeps the reference's type
+def expected_value(key: str, value: Any) -> Any:
+    if key not in FLOAT_KEYS:
+        return value
+    try:
+        return float(value)
+    except OverflowError:
+        return math.copysign(math.inf, value)
+
+
+# Helper function to compare a projection with the reference value by value and type by type
+def assert_same_months(actual: List[Dict[str, Any]], expected: List[Dict[str, Any]]) -> None:
+    assert len(actual) == len(expected)
+    for month, (got, want) in enumerate(zip(actual, expected)):
+        assert list(got) == MONTH_KEYS
+        for key in MONTH_KEYS:
+            value = expected_value(key, want[key])
+            assert (got[key], type(got[key])) == (value, type(value)), (month, key)
+
+
+PARAMETER_SETS = [random_parameters(random.Random(seed)) for seed in range(300)]
+
+
+def test_default_parameters_match_reference():
+    expected = reference_projections(DEFAULT_PARAMETERS)
+    assert_same_months(calculate_projections(DEFAULT_PARAMETERS).to_records(), expected)
+    # The reference returns ints where every operand was one; the kernel always returns floats
+    assert type(expected[0]["client_count"]) is int
+    assert type(calculate_projections(DEFAULT_PARAMETERS)[0]["client_count"]) is float
+
+
+@pytest.mark.parametrize("seed", range(len(PARAMETER_SETS)))
+def test_random_parameters_match_reference(seed):
+    params = PARAMETER_SETS[seed]
+    expected = reference_projections(params)
+    assert_same_months(calculate_projections(params).to_records(), expected)
+    assert_same_months(list(iter_projections(params)), expected)
+
+
+def test_batch_matches_reference():
+    expected = [reference_projections(params) for params in PARAMETER_SETS]
+    for actual, want in zip(batch_to_records(project_batch(PARAMETER_SETS)), expected):
+        assert_same_months(actual, want)
+
+
+def test_packed_projection_matches_reference_values():
+    params_list = [ForecastParams.from_dict(params).for_months(72) for params in PARAMETER_SETS[:50]]
+    packed = pack_parameters(params_list, 72)
+    series = project_packed(packed, [params.start_date for params in params_list], 72)
+    for actual, params in zip(batch_to_records(series), PARAMETER_SETS[:50]):
+        assert_same_months(actual, reference_projections(params))
+
+
+def test_counts_past_float_precision_match_reference():
+    # Counts pass EXACT_LIMIT within the horizon, so the kernel replays the scenario exactly
+    params = {
+        **DEFAULT_PARAMETERS, "forecast_months": 240, "client_growth_rates": [3.0] * 20,
+        "developer_growth_rates": [0.1] * 20, "affiliate_growth_rates": [0.1] * 20,
+    }
+    expected = reference_projections(params)
+    assert expected[-1]["client_count"] >= 2 ** 53
+    assert_same_months(calculate_projections(params).to_records(), expected)
+    assert_same_months(batch_to_records(project_batch([params, DEFAULT_PARAMETERS]))[0], expected)
+    assert_same_months(list(iter_projections(params)), expected)
+
+
+@pytest.mark.parametrize("free_months", [0, -1, -12, 71, 72, 500])
+@pytest.mark.parametrize("conversion_rate", [0, 0.001, 0.75, 1])
+def test_free_months_and_conversion_edges(free_months, conversion_rate):
+    params = {**DEFAULT_PARAMETERS, "free_months": free_months, "conversion_rate": conversion_rate}
+    expected = reference_projections(params)
+    assert_same_months(calculate_projections(params).to_records(), expected)
+    assert_same_months(list(iter_projections(params)), expected)
+    if free_months >= 72:
+        assert all(month["paying_clients"] == 0 for month in expected)
+
+
+@pytest.mark.parametrize("free_months", [0, 2, -1])
+def test_cohorts_without_new_clients(free_months):
+    # A strongly negative sales productivity leaves months with no new clients, whose
+    # cohorts the original loop skipped
+    params = {**DEFAULT_PARAMETERS, "sales_productivity": -40, "free_months": free_months}
+    expected = reference_projections(params)
+    assert any(month["new_clients"] <= 0 for month in expected)
+    assert_same_months(calculate_projections(params).to_records(), expected)
+    assert_same_months(list(iter_projections(params)), expected)
+
+
+@pytest.mark.parametrize("free_months", [-2, 0, 1, 3, 10])
+def test_cohort_accumulator_matches_rescan(free_months):
+    rng = random.Random(free_months)
+    cohorts = CohortAccumulator(free_months, 0.6)
+    joined = []
+    for i in range(24):
+        new_clients = rng.choice([0, -3, 7, 12.5, 40])
+        if new_clients > 0:
+            joined.append((i, new_clients))
+        # The original rescan of every cohort joined so far
+        expected = 0
+        for cohort_month, cohort_size in joined:
+            if i - cohort_month >= free_months:
+                expected += int(cohort_size * 0.6) if i - cohort_month == free_months else cohort_size
+        paying = cohorts.add_month(new_clients)
+        assert (paying, type(paying)) == (expected, type(expected)), i
+
+
+# Parameter changes with the first month they can affect in the default 72-month scenario
+AFFECTED_MONTHS = [
+    ({}, 72),
+    ({"subscription_price": 30}, 0),
+    ({"start_date": "2025-05-01"}, 0),
+    ({"cto_start_month": 12}, 6),
+    ({"jr_dev_salary": 9000}, 6),
+    ({"sales_start_month": 9}, 3),
+    ({"sales_hiring_interval": 4}, 6),
+    ({"max_sales_staff": 5}, 18),
+    ({"sales_commission": 0.1}, 3),
+    ({"conversion_rate": 0.5}, 1),
+    ({"client_growth_rates": [0.10, 0.12, 0.20, 0.12, 0.10]}, 24),
+    ({"affiliate_growth_rates": [0.08, 0.10, 0.12, 0.10, 0.08, 0.08]}, 72),
+    ({"forecast_months": 60}, 60),
+    ({"forecast_months": 96}, 72),
+]
+
+
+@pytest.mark.parametrize("change, expected", AFFECTED_MONTHS)
+def test_first_affected_month(change, expected):
+    new = {**DEFAULT_PARAMETERS, **change}
+    assert first_affected_month(DEFAULT_PARAMETERS, new, 72) == expected
+
+
+@pytest.mark.parametrize("change, expected", AFFECTED_MONTHS)
+def test_months_before_the_first_affected_one_are_unchanged(change, expected):
+    old = calculate_projections(DEFAULT_PARAMETERS).to_records()
+    new = calculate_projections({**DEFAULT_PARAMETERS, **change}).to_records()
+    assert new[:expected] == old[:expected]
+    if expected < min(len(old), len(new)):
+        assert new[expected] != old[expected]
+
+
+NARROW_PARAMETERS = [
+    "cto_start_month", "ceo_start_month", "jr_dev_start_month", "admin_start_month",
+    "cto_salary", "ceo_salary", "jr_dev_salary", "admin_salary",
+    "sales_start_month", "sales_hiring_interval", "max_sales_staff", "sales_base_salary", "sales_commission",
+    "client_growth_rates", "developer_growth_rates", "affiliate_growth_rates", "conversion_rate",
+]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_first_affected_month_is_safe_for_random_changes(seed):
+    rng = random.Random(seed)
+    old = PARAMETER_SETS[seed]
+    # Two parameters changed at a time, drawn from those affecting only later months
+    other = random_parameters(rng)
+    new = {**old, **{key: other[key] for key in rng.sample(NARROW_PARAMETERS, 2)}}
+    months = min(forecast_months(old), forecast_months(new))
+    first = first_affected_month(old, new, months)
+    assert calculate_projections(new).to_records()[:first] == calculate_projections(old).to_records()[:first]
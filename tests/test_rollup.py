@@ -0,0 +1,123 @@
+# tests/test_rollup.py
+import numpy as np
+import pytest
+
+from app.services.financial import DEFAULT_PARAMETERS, calculate_projections
+from app.services.rollup import (
+    FLOW_KEYS,
+    STOCK_KEYS,
+    period_ids,
+    period_segments,
+    records_to_columns,
+    rollup_records,
+    rollup_years,
+    segment_sums
+)
+
+# Start dates and horizons leaving partial first and last years and quarters
+PROJECTIONS = [
+    {**DEFAULT_PARAMETERS},
+    {**DEFAULT_PARAMETERS, "start_date": "2025-05-15", "forecast_months": 20},
+    {**DEFAULT_PARAMETERS, "start_date": "2024-12-01", "forecast_months": 1},
+    {**DEFAULT_PARAMETERS, "start_date": "2025-01-01", "forecast_months": 24},
+]
+
+
+# The rollup of a month loop: the period of each month, flows added in month order and
+# rounded, stocks from the last month
+def reference_rollup(months, period, fiscal_year_start=1):
+    periods = {}
+    for month in months:
+        if period == "quarter":
+            key = (month["year"], (month["month"] - 1) // 3 + 1)
+        elif period == "fiscal_year":
+            key = month["year"] + (fiscal_year_start > 1 and month["month"] >= fiscal_year_start)
+        else:
+            key = month["year"]
+        rolled = periods.setdefault(key, dict.fromkeys(FLOW_KEYS, 0))
+        for name in FLOW_KEYS:
+            rolled[name] = rolled[name] + month[name]
+        rolled.update({name: month[name] for name in STOCK_KEYS})
+
+    rows = []
+    for key, rolled in periods.items():
+        if period == "quarter":
+            label = {"period": f"{key[0]}-Q{key[1]}", "year": key[0], "quarter": key[1]}
+        elif period == "fiscal_year":
+            label = {"period": f"FY{key}", "fiscal_year": key}
+        else:
+            label = {"year": key}
+        rows.append({**label, **{name: round(rolled[name], 2) for name in FLOW_KEYS},
+                     **{name: rolled[name] for name in STOCK_KEYS}})
+    return rows
+
+
+def test_quarter_ids():
+    years = np.array([2025] * 12 + [2026])
+    months = np.array(list(range(1, 13)) + [1])
+    ids = period_ids(years, months, "quarter")
+    assert ids.tolist() == [2025 * 4 + quarter for quarter in (0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3)] + [2026 * 4]
+
+
+@pytest.mark.parametrize("fiscal_year_start, expected", [
+    (1, [2025, 2025, 2025, 2025, 2026]),
+    (4, [2025, 2026, 2026, 2026, 2027]),
+    (7, [2025, 2025, 2026, 2026, 2026]),
+    (12, [2025, 2025, 2025, 2026, 2026]),
+])
+def test_fiscal_years_are_named_for_the_year_they_end_in(fiscal_year_start, expected):
+    years = np.array([2025, 2025, 2025, 2025, 2026])
+    months = np.array([3, 4, 7, 12, 6])
+    assert period_ids(years, months, "fiscal_year", fiscal_year_start).tolist() == expected
+
+
+@pytest.mark.parametrize("period, fiscal_year_start", [("fiscal_year", 0), ("fiscal_year", 13), ("month", 1)])
+def test_invalid_periods_are_rejected(period, fiscal_year_start):
+    with pytest.raises(ValueError):
+        period_ids(np.array([2025]), np.array([1]), period, fiscal_year_start)
+
+
+def test_segment_sums_pad_short_segments():
+    # Segments of 1, 3 and 2 months, for two scenarios
+    values = np.array([[1.0, 2.0, 3.0, 4.0, 5.0, 6.0], [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]])
+    starts, lengths = period_segments(np.array([7, 8, 8, 8, 9, 9]))
+    assert (starts.tolist(), lengths.tolist()) == ([0, 1, 4], [1, 3, 2])
+    totals = segment_sums(values, starts, lengths)
+    # Added month by month from zero, not pairwise
+    expected = [[0.0 + 1.0, 0.0 + 2.0 + 3.0 + 4.0, 0.0 + 5.0 + 6.0], [0.0 + 0.1, 0.0 + 0.2 + 0.3 + 0.4, 0.0 + 0.5 + 0.6]]
+    assert totals.tolist() == expected
+
+
+def test_segment_sums_keep_exact_values():
+    values = np.empty(3, dtype=object)
+    values[:] = [2 ** 70, 1, 0.5]
+    totals = segment_sums(values, np.array([0, 2]), np.array([2, 1]))
+    assert totals.tolist() == [2 ** 70 + 1, 0.5]
+    assert type(totals[0]) is int
+
+
+def test_segment_sums_of_no_months():
+    starts, lengths = period_segments(np.array([], dtype=np.int64))
+    assert segment_sums(np.zeros(0), starts, lengths).tolist() == []
+
+
+@pytest.mark.parametrize("params", PROJECTIONS, ids=lambda params: f"{params['start_date']} x {params['forecast_months']}")
+@pytest.mark.parametrize("period, fiscal_year_start", [
+    ("year", 1), ("quarter", 1), ("fiscal_year", 1), ("fiscal_year", 4), ("fiscal_year", 7), ("fiscal_year", 12),
+])
+def test_rollups_of_partial_periods_match_a_month_loop(params, period, fiscal_year_start):
+    projection = calculate_projections(params)
+    expected = reference_rollup(projection.to_records(), period, fiscal_year_start)
+    assert rollup_records(projection.columns, period, fiscal_year_start) == expected
+    records = projection.to_records()
+    assert rollup_records(records_to_columns(records, ["year", "month"] + FLOW_KEYS + STOCK_KEYS),
+                          period, fiscal_year_start) == expected
+
+
+@pytest.mark.parametrize("params", PROJECTIONS, ids=lambda params: f"{params['start_date']} x {params['forecast_months']}")
+def test_streamed_years_match_rollup_records(params):
+    records = calculate_projections(params).to_records()
+    expected = rollup_records(records_to_columns(records, ["year", "month"] + FLOW_KEYS + STOCK_KEYS), "year")
+    streamed = list(rollup_years(iter(records)))
+    assert [[(value, type(value)) for value in row.values()] for row in streamed] == \
+        [[(value, type(value)) for value in row.values()] for row in expected]
@@ -0,0 +1,28 @@
+# tests/test_simulation.py
+import math
+
+import pytest
+
+from app.services.simulation import validate_distribution
+
+
+@pytest.mark.parametrize("spec", [
+    {"distribution": "normal", "std": math.inf},
+    {"distribution": "normal", "std": math.nan},
+    {"distribution": "uniform", "low": math.nan, "high": 1},
+    {"distribution": "uniform", "low": 0, "high": math.inf},
+    {"distribution": "triangular", "low": -math.inf, "mode": 0, "high": 1},
+    {"distribution": "triangular", "low": 0, "mode": math.nan, "high": 1},
+])
+def test_non_finite_distribution_is_rejected(spec):
+    with pytest.raises(ValueError, match="finite"):
+        validate_distribution("conversion_rate", spec)
+
+
+@pytest.mark.parametrize("spec", [
+    {"distribution": "normal", "std": 0.05},
+    {"distribution": "uniform", "low": -0.1, "high": 0.1},
+    {"distribution": "triangular", "low": -0.1, "mode": 0, "high": 0.2},
+])
+def test_finite_distribution_is_accepted(spec):
+    validate_distribution("conversion_rate", spec)
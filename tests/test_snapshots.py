@@ -0,0 +1,64 @@
+# tests/test_snapshots.py
+import json
+import struct
+import zlib
+
+import pytest
+
+from app.models.database import MonthlyData
+from app.services.bulk import insert_monthly_data
+from app.services.financial import DEFAULT_PARAMETERS, calculate_projections, get_stored_months
+from app.services.snapshots import decode_snapshot, encode_snapshot, stored_projection
+
+PROJECTIONS = {
+    "default": DEFAULT_PARAMETERS,
+    "partial years": {**DEFAULT_PARAMETERS, "start_date": "2025-05-15", "forecast_months": 20},
+    "one month": {**DEFAULT_PARAMETERS, "forecast_months": 1},
+    "fractional counts": {**DEFAULT_PARAMETERS, "conversion_rate": 0.333, "client_growth_rates": [0.137] * 5},
+    # Developer and affiliate counts past 2 ** 53 fall back to exact Python ints
+    "exact counts": {
+        **DEFAULT_PARAMETERS, "forecast_months": 240, "client_growth_rates": [3.0] * 20,
+        "developer_growth_rates": [0.1] * 20, "affiliate_growth_rates": [0.1] * 20,
+    },
+}
+
+
+# Helper function to list each month's values with their types
+def typed_records(projection):
+    return [[(key, value, type(value)) for key, value in month.items()] for month in projection.to_records()]
+
+
+@pytest.mark.parametrize("params", PROJECTIONS.values(), ids=PROJECTIONS.keys())
+def test_round_trip_gives_the_stored_projection(params):
+    projection = calculate_projections(params)
+    decoded = decode_snapshot(encode_snapshot(projection, params["start_date"]))
+    assert typed_records(decoded) == typed_records(stored_projection(projection))
+
+
+@pytest.mark.parametrize("params", PROJECTIONS.values(), ids=PROJECTIONS.keys())
+def test_round_trip_reads_back_like_monthly_rows(db, params):
+    projection = calculate_projections(params)
+    insert_monthly_data(db, {1: projection})
+    decoded = decode_snapshot(encode_snapshot(projection, params["start_date"]))
+    rows = get_stored_months(db, 1)
+    assert [{key: month[key] for key in rows[0]} for month in decoded.to_records()] == rows
+
+
+def test_exact_columns_are_kept_in_the_header():
+    params = PROJECTIONS["exact counts"]
+    raw = zlib.decompress(encode_snapshot(calculate_projections(params), params["start_date"]))
+    (length,) = struct.unpack_from("<I", raw)
+    header = json.loads(raw[4:4 + length])
+    assert sorted(header["exact"]) == ["affiliate_count", "developer_count"]
+    assert "developer_count" not in [key for key, _ in header["columns"]]
+
+
+def test_other_versions_are_rejected():
+    raw = zlib.decompress(encode_snapshot(calculate_projections(DEFAULT_PARAMETERS), DEFAULT_PARAMETERS["start_date"]))
+    (length,) = struct.unpack_from("<I", raw)
+    header = json.loads(raw[4:4 + length])
+    header["version"] += 1
+    header_bytes = json.dumps(header).encode()
+    blob = zlib.compress(struct.pack("<I", len(header_bytes)) + header_bytes + raw[4 + length:])
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        decode_snapshot(blob)